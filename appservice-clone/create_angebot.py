@@ -1,18 +1,69 @@
 from __future__ import annotations
 
-from datetime import date
+import argparse
+from collections import deque
+from datetime import date, datetime
+from itertools import islice
+import json
+import os
 from pathlib import Path
 import re
-from typing import Any
-
-from docx import Document
-from docx.enum.text import WD_ALIGN_PARAGRAPH
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
-from docx.shared import Pt
-
-
-PH_RE = re.compile(r"<<[^<>]+>>")
+import time
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+from doc_model import (
+    PREVIEW_FORMATS,
+    Bullets,
+    DocModel,
+    Heading,
+    ModelBuilder,
+    ModelCache,
+    Table,
+    render_preview,
+    write_preview,
+)
+from docx_base import add_heading, add_paragraph, base_document
+from docx_fill import fill_document, fill_element, fill_text, load_values, normalize_values
+from docx_repro import build_datetime, save_document
+from docx_stream import stream_document
+from docx_verify import Findings, files_per_placeholder, verify_files
+from gen_profile import PROFILER
+from ls_resolver import Resolution, describe
+from render_cache import CACHE_ROOT, cache_key, clear, entry_path, load_entry, prune, store_entry
+from ls_catalog import (
+    RENDERED_FIELDS,
+    Catalog,
+    load_catalog,
+    load_offer_presets,
+    merge_placeholders,
+    module_placeholders,
+    scan_placeholders,
+)
+from ls_estimate import DEFAULT_SAMPLES, EffortEstimate
+from ls_schedule import DEFAULT_STAFF, Schedule
+from ls_store import STORE_PATH, CatalogStore
+
+# python-docx, lxml and multiprocessing are imported where documents are built, so selection,
+# file names, placeholder lists and --dry-run stay cheap (scripts/bench_startup.py).
+if TYPE_CHECKING:
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+    from docx.document import Document
+
+
+RUN_SPLIT_RE = re.compile(r"([\t\n\r])")
+NSDECL_RE = re.compile(rb'\sxmlns:\w+="[^"]*"')
+
+# (meta, Leistungsschein, output path, placeholder values, render cache entry or None,
+#  pinned timestamp for reproducible output or None)
+LsJob = tuple[dict[str, str], dict[str, Any], str, dict[str, str], str | None, datetime | None]
+
+# Part of the render cache key: bump whenever build_ls() or the document template changes output.
+RENDERER_VERSION = "1"
+# Meta fields that end up in a rendered Leistungsschein (header, footer, info table).
+LS_CACHE_META = ("projektname", "version", "datum")
+# Built Leistungsschein models, shared by every offer rendered in this process.
+LS_MODELS = ModelCache()
 
 
 def sanitize_file_part(value: str, fallback: str) -> str:
@@ -23,18 +74,9 @@ def sanitize_file_part(value: str, fallback: str) -> str:
     return text or fallback
 
 
-def collect_placeholders(value: Any, target: set[str]) -> None:
-    if isinstance(value, str):
-        target.update(PH_RE.findall(value))
-    elif isinstance(value, dict):
-        for v in value.values():
-            collect_placeholders(v, target)
-    elif isinstance(value, list):
-        for v in value:
-            collect_placeholders(v, target)
-
-
 def style_doc(doc: Document) -> None:
+    from docx.shared import Pt
+
     normal = doc.styles["Normal"]
     normal.font.name = "Calibri"
     normal.font.size = Pt(11)
@@ -53,6 +95,8 @@ def style_doc(doc: Document) -> None:
 
 
 def style_paragraph(paragraph, size: int = 11, bold: bool = False) -> None:
+    from docx.shared import Pt
+
     for run in paragraph.runs:
         run.font.name = "Calibri"
         run.font.size = Pt(size)
@@ -66,6 +110,9 @@ def set_cell(cell, text: str) -> None:
 
 
 def add_field(run, field_name: str) -> None:
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
     begin = OxmlElement("w:fldChar")
     begin.set(qn("w:fldCharType"), "begin")
     instr = OxmlElement("w:instrText")
@@ -81,6 +128,9 @@ def add_field(run, field_name: str) -> None:
 
 
 def add_header_footer(doc: Document, project: str, version: str) -> None:
+    from docx.enum.text import WD_ALIGN_PARAGRAPH
+    from docx.shared import Pt
+
     for section in doc.sections:
         hp = section.header.paragraphs[0] if section.header.paragraphs else section.header.add_paragraph()
         hp.text = f"Angebot - {project}"
@@ -102,28 +152,115 @@ def add_header_footer(doc: Document, project: str, version: str) -> None:
             r.font.size = Pt(9)
 
 
+def new_document(project: str, version: str) -> Document:
+    def setup(doc: Document) -> None:
+        style_doc(doc)
+        add_header_footer(doc, project, version)
+
+    return base_document(("angebot", project, version), setup)
+
+
 def heading(doc: Document, text: str, level: int = 1) -> None:
-    p = doc.add_heading(text, level=level)
+    # Top-level headings delimit the numbered offer sections in the profile.
+    if level == 1:
+        PROFILER.section(text)
+    p = add_heading(doc, text, level)
     style_paragraph(p, 17 if level == 1 else 13, bold=True)
 
 
 def text(doc: Document, value: str, style: str | None = None) -> None:
-    p = doc.add_paragraph(value, style=style)
+    p = add_paragraph(doc, value, style)
     style_paragraph(p, 11)
 
 
-def bullets(doc: Document, values: list[str]) -> None:
+def bullets(doc: Document, values: Iterable[str]) -> None:
     for item in values:
         text(doc, item, style="List Bullet")
 
 
-def build_ls(doc: Document, meta: dict[str, str], ls: dict[str, Any], with_title: bool) -> None:
+def render_docx(doc: Document, model: DocModel) -> None:
+    # DOCX backend for doc_model: the Calibri styling offers and Leistungsscheine always had.
+    for block in model.blocks:
+        if isinstance(block, Heading):
+            heading(doc, block.text, block.level)
+        elif isinstance(block, Bullets):
+            bullets(doc, block.items)
+        elif isinstance(block, Table):
+            table(doc, block.rows, block.header, block.size)
+        else:
+            p = add_paragraph(doc, block.text, block.style)
+            if block.align:
+                from docx.enum.text import WD_ALIGN_PARAGRAPH
+
+                p.alignment = getattr(WD_ALIGN_PARAGRAPH, block.align.upper())
+            style_paragraph(p, block.size, block.bold)
+
+
+def xml_escape(value: str) -> str:
+    # xml.sax.saxutils.escape() without its import cost (urllib, http, email).
+    return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def _run_content_xml(value: str) -> str:
+    # Same mapping as python-docx' run.text setter: tab -> w:tab, line breaks -> w:br.
+    out = []
+    for piece in RUN_SPLIT_RE.split(value):
+        if not piece:
+            continue
+        if piece == "\t":
+            out.append("<w:tab/>")
+        elif piece in "\r\n":
+            out.append("<w:br/>")
+        elif piece != piece.strip():
+            out.append(f'<w:t xml:space="preserve">{xml_escape(piece)}</w:t>')
+        else:
+            out.append(f"<w:t>{xml_escape(piece)}</w:t>")
+    return "".join(out)
+
+
+def table(
+    doc: Document,
+    rows: Iterable[tuple[str, ...]],
+    header: tuple[str, ...] | None = None,
+    size: int = 11,
+) -> None:
+    # Builds the whole w:tbl as one XML string and parses it once; the result matches
+    # doc.add_table() + set_cell() per cell, but scales linearly with the row count.
+    from docx.shared import Emu
+
+    all_rows = ([header] if header else []) + list(rows)
+    cols = len(all_rows[0])
+    section = doc.sections[-1]
+    col_w = Emu((section.page_width - section.left_margin - section.right_margin) // cols).twips
+    style_id = doc.styles["Table Grid"].style_id
+    rpr = (
+        '<w:rPr><w:rFonts w:ascii="Calibri" w:hAnsi="Calibri"/><w:b w:val="0"/>'
+        f'<w:sz w:val="{size * 2}"/></w:rPr>'
+    )
+    cell_open = f'<w:tc><w:tcPr><w:tcW w:type="dxa" w:w="{col_w}"/></w:tcPr><w:p><w:r>{rpr}'
+    parts = [
+        f'<w:tbl><w:tblPr><w:tblStyle w:val="{style_id}"/><w:tblW w:type="auto" w:w="0"/>'
+        '<w:tblLook w:firstColumn="1" w:firstRow="1" w:lastColumn="0" w:lastRow="0" w:noHBand="0" '
+        'w:noVBand="1" w:val="04A0"/></w:tblPr><w:tblGrid>',
+        f'<w:gridCol w:w="{col_w}"/>' * cols,
+        "</w:tblGrid>",
+    ]
+    for row in all_rows:
+        parts.append("<w:tr>")
+        for value in row:
+            parts.append(cell_open)
+            parts.append(_run_content_xml(str(value)))
+            parts.append("</w:r></w:p></w:tc>")
+        parts.append("</w:tr>")
+    parts.append("</w:tbl>")
+    append_fragments(doc, ["".join(parts)])
+
+
+def _ls_model(meta: dict[str, str], ls: dict[str, Any], with_title: bool) -> DocModel:
+    m = ModelBuilder()
     if with_title:
-        p = doc.add_paragraph(f"{ls['id']} - {ls['titel']}")
-        style_paragraph(p, 17, True)
+        m.text(f"{ls['id']} - {ls['titel']}", size=17, bold=True)
 
-    t = doc.add_table(rows=6, cols=2)
-    t.style = "Table Grid"
     rows = [
         ("LS-ID", ls["id"]),
         ("Titel", ls["titel"]),
@@ -132,30 +269,38 @@ def build_ls(doc: Document, meta: dict[str, str], ls: dict[str, Any], with_title
         ("Preis", ls["preis"]),
         ("Version / Datum", f"{meta['version']} / {meta['datum']}"),
     ]
-    for i, (k, v) in enumerate(rows):
-        set_cell(t.cell(i, 0), k)
-        set_cell(t.cell(i, 1), v)
-
-    heading(doc, "Einleitung", 2)
-    text(doc, ls["einleitung"])
-    heading(doc, "Leistungen", 2)
-    bullets(doc, ls["leistungen"])
-    heading(doc, "Annahmen", 2)
-    bullets(doc, ls["annahmen"])
-    heading(doc, "Einschraenkungen", 2)
-    bullets(doc, ls["einschraenkungen"])
-    heading(doc, "Liefergegenstaende", 2)
-    bullets(doc, ls["liefergegenstaende"])
-    heading(doc, "Nicht im Leistungsumfang", 2)
-    bullets(doc, ls["out_of_scope"])
-    heading(doc, "Aufwand & Abrechnung", 2)
-    text(doc, ls["aufwand_abrechnung"])
-    heading(doc, "Abnahmekriterien", 2)
-    text(doc, ls["abnahme"])
+    m.table(rows)
+
+    m.heading("Einleitung", 2)
+    m.text(ls["einleitung"])
+    m.heading("Leistungen", 2)
+    m.bullets(ls["leistungen"])
+    m.heading("Annahmen", 2)
+    m.bullets(ls["annahmen"])
+    m.heading("Einschraenkungen", 2)
+    m.bullets(ls["einschraenkungen"])
+    m.heading("Liefergegenstaende", 2)
+    m.bullets(ls["liefergegenstaende"])
+    m.heading("Nicht im Leistungsumfang", 2)
+    m.bullets(ls["out_of_scope"])
+    m.heading("Aufwand & Abrechnung", 2)
+    m.text(ls["aufwand_abrechnung"])
+    m.heading("Abnahmekriterien", 2)
+    m.text(ls["abnahme"])
+    return m.build()
+
+
+def ls_model(meta: dict[str, str], ls: dict[str, Any], with_title: bool = True) -> DocModel:
+    # Keyed on the fields that end up in the document, so compact records and dicts share entries.
+    key = cache_key([meta[k] for k in LS_CACHE_META], {k: ls.get(k) for k in RENDERED_FIELDS}, with_title)
+    return LS_MODELS.get(key, lambda: _ls_model(meta, ls, with_title))
 
 
-def build_offer(
-    doc: Document,
+def build_ls(doc: Document, meta: dict[str, str], ls: dict[str, Any], with_title: bool) -> None:
+    render_docx(doc, ls_model(meta, ls, with_title))
+
+
+def offer_model(
     meta: dict[str, str],
     scenario: dict[str, str],
     phases: list[dict[str, str]],
@@ -163,13 +308,11 @@ def build_offer(
     risks: list[dict[str, str]],
     ls_list: list[dict[str, Any]],
     ls_files: dict[str, str],
-) -> None:
-    p = doc.add_paragraph("Angebot - Migration Netzwerklaufwerke nach Azure Storage")
-    p.alignment = WD_ALIGN_PARAGRAPH.CENTER
-    style_paragraph(p, 18, True)
+    estimate: EffortEstimate | None = None,
+) -> DocModel:
+    m = ModelBuilder()
+    m.text("Angebot - Migration Netzwerklaufwerke nach Azure Storage", size=18, bold=True, align="center")
 
-    meta_tab = doc.add_table(rows=5, cols=2)
-    meta_tab.style = "Table Grid"
     title_rows = [
         ("Kunde", meta["kunde"]),
         ("Projektname", meta["projektname"]),
@@ -177,44 +320,46 @@ def build_offer(
         ("Datum", meta["datum"]),
         ("Anbieter", meta["dienstleister"]),
     ]
-    for i, (k, v) in enumerate(title_rows):
-        set_cell(meta_tab.cell(i, 0), k)
-        set_cell(meta_tab.cell(i, 1), v)
+    m.table(title_rows)
 
-    heading(doc, "2) Management Summary")
-    text(
-        doc,
+    m.heading("2) Management Summary")
+    m.text(
         f"Der Windows Fileserver {scenario['source']} mit ca. {scenario['volume']} und {scenario['files']} Dateien "
         f"fuer rund {scenario['users']} Nutzer wird nach Azure Files migriert.",
     )
-    text(doc, f"Zielbild: Azure Files (SMB) + Private Endpoint + Backup + Monitoring, Zugriff ueber {scenario['network']}.")
-    text(doc, "AD-basierte Berechtigungen werden uebernommen, NTFS-ACLs werden soweit moeglich gemappt.")
-    text(doc, "Abweichungen werden transparent dokumentiert und als Entscheidungspunkt vorgelegt.")
+    m.text(f"Zielbild: Azure Files (SMB) + Private Endpoint + Backup + Monitoring, Zugriff ueber {scenario['network']}.")
+    m.text("AD-basierte Berechtigungen werden uebernommen, NTFS-ACLs werden soweit moeglich gemappt.")
+    m.text("Abweichungen werden transparent dokumentiert und als Entscheidungspunkt vorgelegt.")
     total_pt = sum(int(item["pt"]) for item in ls_list)
-    text(doc, f"Gesamtaufwand: {total_pt} PT (Schaetzung). Gesamtpreis: <<Gesamtpreis in EUR>>.")
-
-    heading(doc, "3) Ausgangslage & Zielsetzung")
-    text(doc, "In-Scope:")
-    bullets(
-        doc,
+    if estimate is None:
+        m.text(f"Gesamtaufwand: {total_pt} PT (Schaetzung). Gesamtpreis: <<Gesamtpreis in EUR>>.")
+    else:
+        from ls_estimate import describe_method, format_band
+
+        m.text(
+            f"Gesamtaufwand: {format_band(estimate.total)} ({describe_method(estimate)}; "
+            f"Summe der Einzelschaetzungen {total_pt} PT). Gesamtpreis: <<Gesamtpreis in EUR>>."
+        )
+
+    m.heading("3) Ausgangslage & Zielsetzung")
+    m.text("In-Scope:")
+    m.bullets(
         [
             "Migration der Dateidaten inkl. geplanter Cutover auf Azure Files.",
             "Einrichtung von Private Endpoint, Azure Backup und Azure Monitor/Log Analytics.",
             "Nutzer- und Stakeholder-Kommunikation inkl. Pilot und Hypercare.",
         ],
     )
-    text(doc, "Out-of-Scope:")
-    bullets(
-        doc,
+    m.text("Out-of-Scope:")
+    m.bullets(
         [
             "Ablosung nicht dateibasierter Applikationen.",
             "Langfristiger Betrieb ausserhalb des Hypercare-Fensters.",
             "Grosses Re-Design historischer Berechtigungsmodelle ausserhalb Scope.",
         ],
     )
-    text(doc, "Entscheidungspunkte:")
-    bullets(
-        doc,
+    m.text("Entscheidungspunkte:")
+    m.bullets(
         [
             "Auth-Methode fuer Azure Files.",
             "Netzwerk-Anbindung (VPN, ExpressRoute, S2S-VPN).",
@@ -222,46 +367,37 @@ def build_offer(
         ],
     )
 
-    heading(doc, "4) Vorgehensmodell / Phasenuebersicht")
-    pt = doc.add_table(rows=1, cols=4)
-    pt.style = "Table Grid"
-    for i, h in enumerate(["Phase", "Inhalt", "Ergebnis", "LS-Referenzen"]):
-        set_cell(pt.cell(0, i), h)
-    for phase in phases:
-        row = pt.add_row().cells
-        set_cell(row[0], phase["phase"])
-        set_cell(row[1], phase["inhalt"])
-        set_cell(row[2], phase["ergebnis"])
-        set_cell(row[3], phase["ls"])
-
-    heading(doc, "5) Leistungsuebersicht")
-    lt = doc.add_table(rows=1, cols=6)
-    lt.style = "Table Grid"
-    for i, h in enumerate(["LS-ID", "Titel", "Pflicht/Optional", "Aufwand (PT)", "Preis", "Kurzbeschreibung"]):
-        set_cell(lt.cell(0, i), h)
-    for ls in ls_list:
-        row = lt.add_row().cells
-        set_cell(row[0], ls["id"])
-        set_cell(row[1], ls["titel"])
-        set_cell(row[2], ls["typ"])
-        set_cell(row[3], str(ls["pt"]))
-        set_cell(row[4], ls["preis"])
-        set_cell(row[5], ls["kurz"])
-
-    heading(doc, "6) Zeitplan & Meilensteine")
-    mt = doc.add_table(rows=1, cols=3)
-    mt.style = "Table Grid"
-    for i, h in enumerate(["Meilenstein", "Zieltermin", "Abhaengigkeiten"]):
-        set_cell(mt.cell(0, i), h)
-    for m in milestones:
-        row = mt.add_row().cells
-        set_cell(row[0], m["name"])
-        set_cell(row[1], m["termin"])
-        set_cell(row[2], m["deps"])
-
-    heading(doc, "7) Mitwirkungspflichten Kunde")
-    bullets(
-        doc,
+    m.heading("4) Vorgehensmodell / Phasenuebersicht")
+    header = ["Phase", "Inhalt", "Ergebnis", "LS-Referenzen"]
+    rows = [[phase["phase"], phase["inhalt"], phase["ergebnis"], phase["ls"]] for phase in phases]
+    # Optional columns, shown only when every phase has a value (--confidence, --schedule).
+    bands = [estimate.phase(phase["phase"]) for phase in phases] if estimate else []
+    if bands and all(bands):
+        from ls_estimate import format_band
+
+        header.append("Aufwand")
+        for row, band in zip(rows, bands):
+            row.append(format_band(band))
+    if phases and all(phase.get("zeitraum") for phase in phases):
+        header.append("Zeitraum")
+        for row, phase in zip(rows, phases):
+            row.append(phase["zeitraum"])
+    m.table(rows, header=tuple(header))
+
+    m.heading("5) Leistungsuebersicht")
+    m.table(
+        [(ls["id"], ls["titel"], ls["typ"], str(ls["pt"]), ls["preis"], ls["kurz"]) for ls in ls_list],
+        header=("LS-ID", "Titel", "Pflicht/Optional", "Aufwand (PT)", "Preis", "Kurzbeschreibung"),
+    )
+
+    m.heading("6) Zeitplan & Meilensteine")
+    m.table(
+        [(ms["name"], ms["termin"], ms["deps"]) for ms in milestones],
+        header=("Meilenstein", "Zieltermin", "Abhaengigkeiten"),
+    )
+
+    m.heading("7) Mitwirkungspflichten Kunde")
+    m.bullets(
         [
             "Zugaenge, Freigaben, Testnutzer und Entscheidungswege rechtzeitig bereitstellen.",
             "Nutzerkommunikation und Wartungsfenster intern freigeben.",
@@ -269,9 +405,8 @@ def build_offer(
         ],
     )
 
-    heading(doc, "8) Annahmen & Einschraenkungen")
-    bullets(
-        doc,
+    m.heading("8) Annahmen & Einschraenkungen")
+    m.bullets(
         [
             "On-Prem AD ist verfuegbar und fuer die Zielauthentifizierung nutzbar.",
             "Netzwerkverbindung nach Azure ist vor Cutover stabil getestet.",
@@ -279,26 +414,20 @@ def build_offer(
         ],
     )
 
-    heading(doc, "9) Risiken & Massnahmen")
-    rt = doc.add_table(rows=1, cols=3)
-    rt.style = "Table Grid"
-    for i, h in enumerate(["Risiko", "Auswirkung", "Massnahme"]):
-        set_cell(rt.cell(0, i), h)
-    for r in risks:
-        row = rt.add_row().cells
-        set_cell(row[0], r["risk"])
-        set_cell(row[1], r["impact"])
-        set_cell(row[2], r["mitigation"])
-
-    heading(doc, "10) Preise & Zahlungsbedingungen")
-    text(doc, f"Abrechnungsmodell: {meta['abrechnung']}")
-    text(doc, f"Stunden-/Tagessatz: {meta['satz']}")
-    text(doc, f"Reise-/Nebenkosten: {meta['reise']}")
-    text(doc, "Abrechnungsturnus: monatlich nach Leistungsnachweis bzw. gemaess Festpreis-Meilensteinen.")
-
-    heading(doc, "11) Abnahme & Uebergabe")
-    bullets(
-        doc,
+    m.heading("9) Risiken & Massnahmen")
+    m.table(
+        [(r["risk"], r["impact"], r["mitigation"]) for r in risks],
+        header=("Risiko", "Auswirkung", "Massnahme"),
+    )
+
+    m.heading("10) Preise & Zahlungsbedingungen")
+    m.text(f"Abrechnungsmodell: {meta['abrechnung']}")
+    m.text(f"Stunden-/Tagessatz: {meta['satz']}")
+    m.text(f"Reise-/Nebenkosten: {meta['reise']}")
+    m.text("Abrechnungsturnus: monatlich nach Leistungsnachweis bzw. gemaess Festpreis-Meilensteinen.")
+
+    m.heading("11) Abnahme & Uebergabe")
+    m.bullets(
         [
             "Abnahme je LS anhand der festgelegten Abnahmekriterien.",
             "Uebergabe von Betriebsdoku, Monitoring-Setup und Backup/Restore-Guide.",
@@ -306,30 +435,355 @@ def build_offer(
         ],
     )
 
-    heading(doc, "12) Vertraulichkeit / Datenschutz")
-    text(doc, "Vertrauliche Informationen werden nur zur Leistungserbringung genutzt.")
-    text(doc, "Datenschutz wird vertragsgemaess umgesetzt; dieser Abschnitt ist keine Rechtsberatung.")
-
-    heading(doc, "13) Unterschriften")
-    st = doc.add_table(rows=4, cols=2)
-    st.style = "Table Grid"
-    set_cell(st.cell(0, 0), "Fuer den Kunden")
-    set_cell(st.cell(0, 1), "Fuer den IT-Dienstleister")
-    set_cell(st.cell(1, 0), f"Name: {meta['kunde_kontakt']}")
-    set_cell(st.cell(1, 1), f"Name: {meta['dienstleister_kontakt']}")
-    set_cell(st.cell(2, 0), "Datum: <<YYYY-MM-DD>>")
-    set_cell(st.cell(2, 1), "Datum: <<YYYY-MM-DD>>")
-    set_cell(st.cell(3, 0), "Unterschrift: ____________________")
-    set_cell(st.cell(3, 1), "Unterschrift: ____________________")
-
-    heading(doc, "14) Anhaenge")
-    text(doc, "Leistungsscheine:")
+    m.heading("12) Vertraulichkeit / Datenschutz")
+    m.text("Vertrauliche Informationen werden nur zur Leistungserbringung genutzt.")
+    m.text("Datenschutz wird vertragsgemaess umgesetzt; dieser Abschnitt ist keine Rechtsberatung.")
+
+    m.heading("13) Unterschriften")
+    m.table(
+        [
+            ("Fuer den Kunden", "Fuer den IT-Dienstleister"),
+            (f"Name: {meta['kunde_kontakt']}", f"Name: {meta['dienstleister_kontakt']}"),
+            ("Datum: <<YYYY-MM-DD>>", "Datum: <<YYYY-MM-DD>>"),
+            ("Unterschrift: ____________________", "Unterschrift: ____________________"),
+        ],
+    )
+
+    m.heading("14) Anhaenge")
+    m.text("Leistungsscheine:")
     for ls in ls_list:
-        text(doc, f"{ls['id']} - {ls['titel']} ({ls_files[ls['id']]})", style="List Bullet")
+        m.text(f"{ls['id']} - {ls['titel']} ({ls_files[ls['id']]})", style="List Bullet")
+    return m.build()
 
 
-def main() -> None:
-    today = date.today().isoformat()
+def build_offer(
+    doc: Document,
+    meta: dict[str, str],
+    scenario: dict[str, str],
+    phases: list[dict[str, str]],
+    milestones: list[dict[str, str]],
+    risks: list[dict[str, str]],
+    ls_list: list[dict[str, Any]],
+    ls_files: dict[str, str],
+    estimate: EffortEstimate | None = None,
+) -> None:
+    model = offer_model(meta, scenario, phases, milestones, risks, ls_list, ls_files, estimate)
+    PROFILER.section("1) Titelblatt")
+    render_docx(doc, model)
+
+
+def _strip_nsdecls(xml: bytes) -> bytes:
+    end = xml.index(b">")
+    return NSDECL_RE.sub(b"", xml[:end]) + xml[end:]
+
+
+def body_fragments(doc: Document, skip: int = 0, remove: bool = False) -> list[bytes]:
+    from docx.oxml.ns import qn
+    from lxml import etree
+
+    body = doc.element.body
+    elements = [el for el in body if el.tag != qn("w:sectPr")][skip:]
+    # lxml repeats every in-scope namespace declaration on a serialized child; all documents
+    # share the default template's root declarations, so fragments are stored without them.
+    fragments = [_strip_nsdecls(etree.tostring(el)) for el in elements]
+    if remove:
+        for el in elements:
+            body.remove(el)
+    return fragments
+
+
+def append_fragments(doc: Document, fragments: list[bytes | str]) -> None:
+    from docx.oxml import parse_xml
+
+    body = doc.element.body
+    decls = " ".join(f'xmlns:{prefix}="{uri}"' for prefix, uri in doc.element.nsmap.items() if prefix)
+    xml = b"".join(f if isinstance(f, bytes) else f.encode("utf-8") for f in fragments)
+    wrapper = parse_xml(f"<w:body {decls}>".encode("utf-8") + xml + b"</w:body>")
+    anchor = body.sectPr
+    for el in list(wrapper):
+        if anchor is not None:
+            anchor.addprevious(el)
+        else:
+            body.append(el)
+
+
+def ls_document(meta: dict[str, str], ls: dict[str, Any], values: dict[str, str]) -> Document:
+    d = new_document(meta["projektname"], meta["version"])
+    build_ls(d, meta, ls, with_title=True)
+    fill_document(d, values)
+    return d
+
+
+def render_ls_file(
+    job: LsJob,
+) -> tuple[str, list[bytes], list[dict[str, Any]]]:
+    meta, ls, out, values, entry, when = job
+    # Profile events travel back with the result, so pool workers show up in the trace too.
+    with PROFILER.capture() as events:
+        with PROFILER.phase(f"render {ls['id']}", group="render LS", cat="ls"):
+            d = ls_document(meta, ls, values)
+            PROFILER.count_document(d.element.body)
+            save_document(d, out, when)
+    # Everything after the title paragraph is the annex body used in the combo document.
+    fragments = body_fragments(d, skip=1)
+    if entry is not None:
+        store_entry(entry, out, fragments)
+    return out, fragments, events
+
+
+def cached_ls_file(job: LsJob) -> tuple[str, list[bytes], list[dict[str, Any]]] | None:
+    _, ls, out, _, entry, _ = job
+    if entry is None:
+        return None
+    with PROFILER.phase(f"cached {ls['id']}", group="cached LS", cat="ls"):
+        blob = load_entry(entry, out)
+    return None if blob is None else (out, [blob], [])
+
+
+def iter_ls_files(
+    jobs: list[LsJob],
+    workers: int = 1,
+    pool: ProcessPoolExecutor | None = None,
+) -> Iterator[tuple[str, list[bytes], bool]]:
+    # Yields (output path, annex fragments, taken from the render cache).
+    workers = min(workers or os.cpu_count() or 1, len(jobs))
+    if workers <= 1:
+        for job in jobs:
+            cached = cached_ls_file(job)
+            out, fragments, events = cached or render_ls_file(job)
+            PROFILER.merge(events)
+            yield out, fragments, cached is not None
+        return
+    from concurrent.futures import Future, ProcessPoolExecutor
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        # Results are yielded in job order; only a small window of jobs is in flight so
+        # finished fragments do not pile up while the caller is still consuming earlier ones.
+        def submit(job: LsJob) -> tuple[Future, bool]:
+            cached = cached_ls_file(job)
+            if cached is None:
+                return pool.submit(render_ls_file, job), False
+            future: Future = Future()
+            future.set_result(cached)
+            return future, True
+
+        pending_jobs = iter(jobs)
+        pending = deque(submit(job) for job in islice(pending_jobs, workers * 2))
+        while pending:
+            future, cached = pending.popleft()
+            out, fragments, events = future.result()
+            for job in islice(pending_jobs, 1):
+                pending.append(submit(job))
+            PROFILER.merge(events)
+            yield out, fragments, cached
+    finally:
+        if own_pool:
+            pool.shutdown(cancel_futures=True)
+
+
+def render_ls_files(
+    jobs: list[LsJob],
+    workers: int = 1,
+    pool: ProcessPoolExecutor | None = None,
+) -> list[tuple[str, list[bytes], bool]]:
+    return list(iter_ls_files(jobs, workers, pool))
+
+
+def annex_fragments(
+    meta: dict[str, str],
+    ls_list: list[dict[str, Any]],
+    rendered: Iterable[tuple[str, list[bytes], bool]],
+    values: dict[str, str] | None = None,
+) -> Iterator[list[bytes]]:
+    # Headings and page breaks are built in a scratch document and taken out as XML, so the
+    # annex can be appended to a document or streamed without holding all sections at once.
+    with PROFILER.phase("annex intro", cat="ls"):
+        scratch = new_document(meta["projektname"], meta["version"])
+        scratch.add_page_break()
+        heading(scratch, "Anhang - Leistungsscheine (Volltext)")
+        intro = body_fragments(scratch, remove=True)
+    values = values or {}
+    yield intro
+    last = len(ls_list) - 1
+    rendered = iter(rendered)
+    for i, ls in enumerate(ls_list):
+        # Serially this includes rendering the Leistungsschein; with workers it is the wait for it.
+        with PROFILER.phase(f"annex {ls['id']}", group="annex LS", cat="ls"):
+            _, fragments, _ = next(rendered)
+            heading(scratch, f"{ls['id']} - {ls['titel']}", 2)
+            if i < last:
+                scratch.add_page_break()
+            if values:
+                fill_element(scratch.element.body, values)
+            head, *tail = body_fragments(scratch, remove=True)
+        yield [head, *fragments, *tail]
+
+
+def phases_from_modules(ls_list: list[dict[str, Any]]) -> list[dict[str, str]]:
+    groups: dict[str, dict[str, list[str]]] = {}
+    for ls in ls_list:
+        group = groups.setdefault(ls.get("domain") or "allgemein", {"themes": [], "ids": []})
+        if ls.get("theme") and ls["theme"] not in group["themes"]:
+            group["themes"].append(ls["theme"])
+        group["ids"].append(ls["id"])
+    return [
+        {
+            "phase": domain,
+            "inhalt": ", ".join(group["themes"]) or domain,
+            "ergebnis": "Abgenommene Leistungsscheine",
+            "ls": ", ".join(group["ids"]),
+        }
+        for domain, group in groups.items()
+    ]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Erzeugt Angebot und Leistungsscheine als DOCX.")
+    parser.add_argument(
+        "--modules",
+        help="Kommagetrennte LS-IDs aus data/leistungsscheine statt der Standardauswahl (z. B. LS-1001,LS-1002).",
+    )
+    parser.add_argument(
+        "--search",
+        metavar="SUCHE",
+        help="Module per Volltextsuche im Katalog auswaehlen (Titel, Kurzbeschreibung, Tags, Leistungen, "
+        "Liefergegenstaende); wird an --modules angehaengt.",
+    )
+    parser.add_argument(
+        "--search-limit",
+        type=int,
+        default=20,
+        help="Anzahl der besten Suchtreffer fuer --search (Default 20).",
+    )
+    parser.add_argument(
+        "--db",
+        nargs="?",
+        const=str(STORE_PATH),
+        metavar="DATEI",
+        help="Katalog aus der SQLite-Ablage lesen (python ls_store.py import) statt aus data/leistungsscheine "
+        "(Default .cache/ls-catalog.sqlite).",
+    )
+    parser.add_argument("--domain", help="Alle Module einer Domain aus der SQLite-Ablage (z. B. security).")
+    parser.add_argument("--theme", help="Alle Module eines Themas aus der SQLite-Ablage (z. B. key-vault).")
+    parser.add_argument(
+        "--tag",
+        action="append",
+        default=[],
+        help="Module mit diesem Tag aus der SQLite-Ablage (mehrfach angebbar, alle muessen passen).",
+    )
+    parser.add_argument(
+        "--max-pt", type=float, help="Nur Module bis zu diesem Aufwand in PT (estimate.likely) aus der SQLite-Ablage."
+    )
+    parser.add_argument(
+        "--no-resolve",
+        dest="resolve",
+        action="store_false",
+        help="Modulauswahl unveraendert uebernehmen (ohne requires/excludes/option_group-Aufloesung).",
+    )
+    parser.add_argument(
+        "--confidence",
+        action="store_true",
+        help="Gesamtaufwand in Management Summary und Phasenuebersicht als P50/P80/P95-Band aus estimate.min/"
+        "likely/max (PERT, Monte-Carlo mit numpy, sonst Normalapproximation). Im Batch-Modus Feld \"confidence\".",
+    )
+    parser.add_argument(
+        "--samples",
+        type=int,
+        default=DEFAULT_SAMPLES,
+        help=f"Stichproben fuer --confidence (Default {DEFAULT_SAMPLES}).",
+    )
+    parser.add_argument(
+        "--schedule",
+        action="store_true",
+        help="Meilensteine und Phasenzeitraeume aus requires-Kanten, Aufwand (PT) und --staff berechnen (kritischer "
+        "Pfad mit Kapazitaetsabgleich, Arbeitstage ohne Wochenenden/Feiertage). Im Batch-Modus Feld \"schedule\".",
+    )
+    parser.add_argument(
+        "--staff",
+        default=DEFAULT_STAFF,
+        help=f"Personen je Woche fuer --schedule, z. B. 3 oder 2,2,3 (letzter Wert gilt weiter, Default {DEFAULT_STAFF}).",
+    )
+    parser.add_argument("--start", type=date.fromisoformat, help="Projektstart fuer --schedule, YYYY-MM-DD (Default heute).")
+    parser.add_argument("--holidays", help="Feiertage fuer --schedule: YYYY-MM-DD kommagetrennt oder Datei.")
+    parser.add_argument(
+        "--batch",
+        metavar="JOBDATEI",
+        help="JSONL- oder CSV-Datei mit einem Angebot je Zeile; alle Jobs laufen in einem Prozess.",
+    )
+    parser.add_argument(
+        "--out-dir",
+        help="Zielverzeichnis (Default: aktuelles Verzeichnis bzw. ./batch im Batch-Modus).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Anzahl Prozesse fuer das Rendern der Leistungsscheine (0 = alle CPU-Kerne, Default 1).",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Kombidokument abschnittsweise in die DOCX-Datei schreiben (begrenzter Speicher bei grossen Anhaengen).",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="cache",
+        action="store_false",
+        help="Leistungsscheine immer neu rendern statt unveraenderte aus .cache/ls-render zu kopieren.",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Render-Cache (.cache/ls-render) loeschen und beenden. Sonst wird er nach jedem Lauf auf "
+        "LS_RENDER_CACHE_MB (Default 512) gekuerzt, zuletzt genutzte Eintraege bleiben.",
+    )
+    parser.add_argument(
+        "--reproducible",
+        action="store_true",
+        help="Byte-identische Ausgabe: feste ZIP-Zeitstempel, Eintragsreihenfolge und Dokumenteigenschaften; "
+        "Datum in Dateinamen aus SOURCE_DATE_EPOCH (Default 1980-01-01) statt dem heutigen Datum.",
+    )
+    parser.add_argument(
+        "--values",
+        metavar="WERTE.json",
+        help="JSON-Objekt Platzhalter -> Wert (z. B. {\"Kundenname\": \"Contoso\"}); wird in allen Dokumenten "
+        "inkl. Tabellen, Kopf- und Fusszeilen eingesetzt. Im Batch-Modus ergaenzt um das Feld \"values\" je Job.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Nur Auswahl, geplante Dateinamen und Review-Liste ausgeben; nichts rendern oder schreiben.",
+    )
+    parser.add_argument(
+        "--preview",
+        choices=PREVIEW_FORMATS,
+        help="Statt DOCX das Angebot als HTML- bzw. Markdown-Vorschau inkl. Review-Liste ausgeben (ohne python-docx, "
+        "nicht mit --batch).",
+    )
+    parser.add_argument("--preview-out", metavar="DATEI", help="Vorschau in DATEI schreiben statt auf stdout.")
+    parser.add_argument(
+        "--preview-annex", action="store_true", help="Vorschau inkl. Anhang mit allen Leistungsscheinen im Volltext."
+    )
+    parser.add_argument(
+        "--verify",
+        action="store_true",
+        help="Erzeugte Dateien danach auf offene Platzhalter pruefen (auch ueber mehrere Runs verteilte).",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        const="",
+        metavar="TRACE",
+        help="Phasen und Abschnitte messen, Trace als JSON schreiben (Default: profile-trace.json im Zielverzeichnis). "
+        "Alternativ Umgebungsvariable LS_PROFILE=1.",
+    )
+    return parser.parse_args(argv)
+
+
+def default_spec() -> dict[str, Any]:
     meta = {
         "kunde": "<<Kundenname>>",
         "kunde_kontakt": "<<Name, Rolle, E-Mail>>",
@@ -578,10 +1032,21 @@ def main() -> None:
     ]
 
     milestones = [
-        {"name": "Kickoff", "termin": "<<YYYY-MM-DD>>", "deps": "Beauftragung, Verfuegbarkeit"},
-        {"name": "Zielkonzept freigegeben", "termin": "<<YYYY-MM-DD>>", "deps": "Analyse abgeschlossen"},
-        {"name": "Cutover", "termin": "<<YYYY-MM-DD>>", "deps": "Readiness, Tests, Wartungsfenster"},
-        {"name": "Abnahme", "termin": "<<YYYY-MM-DD>>", "deps": "Pilotgruppe und Doku"},
+        # "bezug": what --schedule takes the date from (project start/end or the end of a phase).
+        {"name": "Kickoff", "termin": "<<YYYY-MM-DD>>", "deps": "Beauftragung, Verfuegbarkeit", "bezug": "start"},
+        {
+            "name": "Zielkonzept freigegeben",
+            "termin": "<<YYYY-MM-DD>>",
+            "deps": "Analyse abgeschlossen",
+            "bezug": "Konzeption",
+        },
+        {
+            "name": "Cutover",
+            "termin": "<<YYYY-MM-DD>>",
+            "deps": "Readiness, Tests, Wartungsfenster",
+            "bezug": "Migration",
+        },
+        {"name": "Abnahme", "termin": "<<YYYY-MM-DD>>", "deps": "Pilotgruppe und Doku", "bezug": "ende"},
     ]
 
     risks = [
@@ -602,62 +1067,572 @@ def main() -> None:
         },
     ]
 
-    placeholders: set[str] = set()
-    for obj in [meta, scenario, ls_list, phases, milestones, risks]:
-        collect_placeholders(obj, placeholders)
-    placeholders.add("<<Gesamtpreis in EUR>>")
+    return {
+        "meta": meta,
+        "scenario": scenario,
+        "ls_list": ls_list,
+        "phases": phases,
+        "milestones": milestones,
+        "risks": risks,
+    }
+
+
+def offer_placeholders(
+    spec: dict[str, Any], values: dict[str, str]
+) -> tuple[dict[str, list[tuple[str, str]]], list[str]]:
+    # Placeholder -> [(owner, field path)]; per-module scans come from the catalog index.
+    parts = {key: spec[key] for key in ("meta", "scenario", "phases", "milestones", "risks")}
+    placeholders = merge_placeholders(
+        [("angebot", scan_placeholders(parts))] + [(ls["id"], module_placeholders(ls)) for ls in spec["ls_list"]]
+    )
+    placeholders.setdefault("<<Gesamtpreis in EUR>>", []).append(("angebot", "Management Summary"))
+    # Placeholders with a value are filled in every document; only the rest stays on the review list.
+    filled = sorted(ph for ph in placeholders if ph in values)
+    for ph in filled:
+        del placeholders[ph]
+    return placeholders, filled
+
+
+def offer_file_names(meta: dict[str, str], today: str, values: dict[str, str]) -> tuple[str, str]:
+    kunde = sanitize_file_part(fill_text(meta["kunde"], values), "Kunde")
+    projekt = sanitize_file_part(fill_text(meta["projektname"], values), "Projekt")
+    return (
+        f"Angebot_{kunde}_{projekt}_{today}.docx",
+        f"Angebot_inkl_Leistungsscheine_{kunde}_{projekt}_{today}.docx",
+    )
+
+
+def ls_file_name(ls: dict[str, Any], today: str) -> str:
+    return f"{ls['id']}_{sanitize_file_part(ls['titel'], 'Leistungsschein')}_{today}.docx"
+
+
+def offer_document(spec: dict[str, Any], ls_files: dict[str, str], values: dict[str, str]) -> Document:
+    meta = spec["meta"]
+    with PROFILER.phase("build offer"):
+        doc = new_document(meta["projektname"], meta["version"])
+        build_offer(
+            doc,
+            meta,
+            spec["scenario"],
+            spec["phases"],
+            spec["milestones"],
+            spec["risks"],
+            spec["ls_list"],
+            ls_files,
+            spec.get("estimate"),
+        )
+        fill_document(doc, values)
+        PROFILER.count_document(doc.element.body)
+    return doc
+
+
+def generate_offer(
+    spec: dict[str, Any],
+    root: Path,
+    today: str,
+    workers: int = 1,
+    pool: ProcessPoolExecutor | None = None,
+    stream: bool = False,
+    values: dict[str, str] | None = None,
+    cache: bool = True,
+    when: datetime | None = None,
+) -> dict[str, Any]:
+    values = values or {}
+    meta = spec["meta"]
+    ls_list = spec["ls_list"]
+    placeholders, filled = offer_placeholders(spec, values)
 
-    root = Path.cwd()
     ls_dir = root / "leistungsscheine"
     ls_dir.mkdir(parents=True, exist_ok=True)
 
-    kunde = sanitize_file_part(meta["kunde"], "Kunde")
-    projekt = sanitize_file_part(meta["projektname"], "Projekt")
-    main_path = root / f"Angebot_{kunde}_{projekt}_{today}.docx"
-    combo_path = root / f"Angebot_inkl_Leistungsscheine_{kunde}_{projekt}_{today}.docx"
+    main_name, combo_name = offer_file_names(meta, today, values)
+    main_path = root / main_name
+    combo_path = root / combo_name
 
     ls_files: dict[str, str] = {}
-    ls_paths: list[str] = []
 
+    jobs: list[LsJob] = []
+    ls_meta = {key: meta[key] for key in LS_CACHE_META}
     for ls in ls_list:
-        name = f"{ls['id']}_{sanitize_file_part(ls['titel'], 'Leistungsschein')}_{today}.docx"
+        name = ls_file_name(ls, today)
         ls_files[ls["id"]] = name
-        out = ls_dir / name
-        d = Document()
-        style_doc(d)
-        add_header_footer(d, meta["projektname"], meta["version"])
-        build_ls(d, meta, ls, with_title=True)
-        d.save(out)
-        ls_paths.append(str(out))
-
-    offer_doc = Document()
-    style_doc(offer_doc)
-    add_header_footer(offer_doc, meta["projektname"], meta["version"])
-    build_offer(offer_doc, meta, scenario, phases, milestones, risks, ls_list, ls_files)
-    offer_doc.save(main_path)
-
-    combo = Document()
-    style_doc(combo)
-    add_header_footer(combo, meta["projektname"], meta["version"])
-    build_offer(combo, meta, scenario, phases, milestones, risks, ls_list, ls_files)
-    combo.add_page_break()
-    heading(combo, "Anhang - Leistungsscheine (Volltext)")
-    for i, ls in enumerate(ls_list):
-        heading(combo, f"{ls['id']} - {ls['titel']}", 2)
-        build_ls(combo, meta, ls, with_title=False)
-        if i < len(ls_list) - 1:
-            combo.add_page_break()
-    combo.save(combo_path)
+        entry = None
+        if cache:
+            # Same module content, meta, values and renderer -> same document.
+            rendered = {key: ls.get(key) for key in RENDERED_FIELDS}
+            stamp = when.isoformat() if when else None
+            entry = str(entry_path(cache_key(RENDERER_VERSION, ls_meta, rendered, values, stamp)))
+        jobs.append((meta, ls, str(ls_dir / name), values, entry, when))
+
+    offer_doc = offer_document(spec, ls_files, values)
+    with PROFILER.phase("save offer"):
+        save_document(offer_doc, main_path, when)
+
+    # The combo document is the offer plus the annex: the offer body built above is reused and
+    # each Leistungsschein contributes the fragments produced while writing its own file.
+    cache_hits: list[str] = []
+
+    def note_hits(results: Iterable[tuple[str, list[bytes], bool]]) -> Iterator[tuple[str, list[bytes], bool]]:
+        for out, fragments, cached in results:
+            if cached:
+                cache_hits.append(out)
+            yield out, fragments, cached
+
+    annex = annex_fragments(meta, ls_list, note_hits(iter_ls_files(jobs, workers, pool)), values)
+    if stream:
+        with PROFILER.phase("stream combo"):
+            stream_document(offer_doc, combo_path, annex, when)
+    else:
+        with PROFILER.phase("assemble combo"):
+            for fragments in annex:
+                append_fragments(offer_doc, fragments)
+        with PROFILER.phase("save combo"):
+            save_document(offer_doc, combo_path, when)
+    if cache and len(cache_hits) < len(jobs):
+        # New entries were written: keep the cache within its size limit.
+        with PROFILER.phase("prune cache"):
+            prune()
+
+    return {
+        "main": str(main_path),
+        "combo": str(combo_path),
+        "ls_paths": [job[2] for job in jobs],
+        "placeholders": placeholders,
+        "filled": filled,
+        "cache_hits": cache_hits,
+    }
 
-    print("Erzeugte Dateien:")
-    print(f"- {main_path}")
-    print(f"- {combo_path}")
-    for p in ls_paths:
-        print(f"- {p}")
 
+def split_ids(value: Any) -> list[str]:
+    if isinstance(value, list):
+        return [str(v).strip() for v in value if str(v).strip()]
+    return [v for v in re.split(r"[\s,;]+", str(value or "")) if v]
+
+
+def read_jobs(path: Path) -> list[dict[str, Any]]:
+    import csv
+
+    with open(path, encoding="utf-8", newline="") as fh:
+        if path.suffix.lower() == ".csv":
+            return [{k: v for k, v in row.items() if k and v not in (None, "")} for row in csv.DictReader(fh)]
+        jobs = []
+        for line_no, line in enumerate(fh, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            try:
+                jobs.append(json.loads(line))
+            except json.JSONDecodeError as exc:
+                raise ValueError(f"{path}:{line_no}: ungueltiges JSON ({exc.msg})") from exc
+        return jobs
+
+
+def store_filters(raw: dict[str, Any]) -> dict[str, Any]:
+    # Keyword arguments for CatalogStore.ids(); empty when the selection does not query the store.
+    filters: dict[str, Any] = {}
+    for key in ("domain", "theme"):
+        if raw.get(key):
+            filters[key] = str(raw[key])
+    tags = raw.get("tags")
+    tags = tags if isinstance(tags, list) else re.split(r"[,;]", str(tags or ""))
+    if any(str(t).strip() for t in tags):
+        filters["tags"] = [str(t).strip() for t in tags if str(t).strip()]
+    for key in ("min_pt", "max_pt"):
+        if raw.get(key) not in (None, ""):
+            filters[key] = float(raw[key])
+    return filters
+
+
+def select_modules(
+    catalog: Catalog, ids: list[str], resolve: bool = True
+) -> tuple[list[dict[str, Any]], Resolution | None]:
+    # Resolved selections follow requires/excludes/option_group like the web app and come in
+    # topological order, so required modules precede the ones building on them.
+    if not resolve:
+        return catalog.select(ids), None
+    resolution = catalog.resolve(ids)
+    return catalog.select(resolution.ordered), resolution
+
+
+def spec_from_job(
+    job: dict[str, Any],
+    catalog: Catalog | None,
+    presets: dict[str, dict[str, Any]],
+    resolve: bool = True,
+    store: CatalogStore | None = None,
+) -> dict[str, Any]:
+    spec = default_spec()
+    for section in ("meta", "scenario"):
+        values = spec[section]
+        overrides = job.get(section) if isinstance(job.get(section), dict) else {}
+        for key in values:
+            if key in overrides:
+                values[key] = str(overrides[key])
+            elif key in job:
+                values[key] = str(job[key])
+
+    module_ids = split_ids(job.get("modules"))
+    if not module_ids and job.get("search"):
+        hits = catalog.search(str(job["search"]), int(job.get("search_limit") or 20))
+        if not hits:
+            raise ValueError(f"Keine Treffer fuer Suche: {job['search']}")
+        module_ids = [hit.id for hit in hits]
+    filters = store_filters(job["query"]) if isinstance(job.get("query"), dict) else {}
+    if not module_ids and filters:
+        module_ids = list(store.ids(**filters))
+        if not module_ids:
+            raise ValueError(f"Keine Module fuer Abfrage: {json.dumps(job['query'], ensure_ascii=False)}")
+    if not module_ids and job.get("offer"):
+        preset = presets.get(str(job["offer"]))
+        if preset is None:
+            raise ValueError(f"Unbekannte Angebotsvorlage: {job['offer']}")
+        module_ids = preset["module_ids"]
+    if module_ids:
+        spec["ls_list"], spec["resolution"] = select_modules(catalog, module_ids, resolve)
+        spec["phases"] = phases_from_modules(spec["ls_list"])
+    if str(job.get("confidence") or "").lower() in ("1", "true", "ja"):
+        attach_estimate(spec, int(job.get("samples") or DEFAULT_SAMPLES))
+    if str(job.get("schedule") or "").lower() in ("1", "true", "ja"):
+        attach_schedule(spec, str(job.get("staff") or DEFAULT_STAFF), job.get("start"), job.get("holidays"))
+    return spec
+
+
+def print_resolution(resolution: Resolution | None) -> None:
+    if resolution is None or not (resolution.added or resolution.conflicts):
+        return
+    print("\nAbhaengigkeiten (requires/excludes/option_group):")
+    if resolution.added:
+        print(f"- Ergaenzt ueber requires: {', '.join(resolution.added)}")
+    for conflict in resolution.conflicts:
+        print(f"- {describe(conflict)}")
+
+
+def phase_groups(spec: dict[str, Any]) -> dict[str, list[str]]:
+    # Phase rows name their modules in the "ls" column (default offer and phases_from_modules alike).
+    return {phase["phase"]: split_ids(phase["ls"]) for phase in spec["phases"]}
+
+
+def attach_estimate(spec: dict[str, Any], samples: int) -> None:
+    # P50/P80/P95 effort for the Management Summary and the phase overview (ls_estimate.py).
+    from ls_estimate import estimate_effort
+
+    with PROFILER.phase("estimate effort"):
+        spec["estimate"] = estimate_effort(spec["ls_list"], samples, groups=phase_groups(spec))
+
+
+def attach_schedule(
+    spec: dict[str, Any], staff: str, start: str | date | None = None, holidays: str | list[str] | None = None
+) -> None:
+    # Milestone dates and phase windows from requires edges, effort and staffing (ls_schedule.py).
+    from ls_schedule import fill_milestones, parse_holidays, phase_windows, schedule_modules
+
+    if isinstance(start, str):
+        start = date.fromisoformat(start) if start else None
+    groups = phase_groups(spec)
+    modules = spec["ls_list"]
+    if not any(ls.get("dependencies") for ls in modules):
+        # Without requires edges (inline default modules) the phases run one after the other.
+        previous: list[str] = []
+        requires = {}
+        for ids in groups.values():
+            requires.update(dict.fromkeys(ids, previous))
+            previous = ids
+        modules = [{**ls, "dependencies": {"requires": requires.get(ls["id"], [])}} for ls in modules]
+    with PROFILER.phase("schedule"):
+        schedule = schedule_modules(modules, staff, start, parse_holidays(holidays))
+    spec["schedule"] = schedule
+    windows = phase_windows(schedule, groups)
+    for phase in spec["phases"]:
+        window = windows.get(phase["phase"])
+        if window:
+            phase["zeitraum"] = f"{window[0].isoformat()} - {window[1].isoformat()}"
+    spec["milestones"] = fill_milestones(spec["milestones"], schedule, windows)
+
+
+def print_schedule(schedule: Schedule | None) -> None:
+    if schedule is None:
+        return
+    from ls_schedule import describe_schedule
+
+    print(f"\nZeitplan: {describe_schedule(schedule)}")
+    print(f"- Kritischer Pfad: {' -> '.join(schedule.critical_path)}")
+
+
+def print_estimate(estimate: EffortEstimate | None) -> None:
+    if estimate is None:
+        return
+    from ls_estimate import describe_method, format_band
+
+    print(f"\nAufwand ({describe_method(estimate)}, {estimate.ms:.0f} ms):")
+    for band in (*estimate.phases, estimate.total):
+        print(f"- {band.label}: {format_band(band)} (Summe {band.likely:g} PT)")
+
+
+def print_verification(checked: dict[str, Findings], expected: Iterable[str]) -> None:
+    expected = set(expected)
+    counts = files_per_placeholder(checked)
+    print(f"\nPruefung der erzeugten Dateien ({len(checked)} DOCX):")
+    for ph, files in sorted(counts.items()):
+        note = "  (fehlt in Review-Liste)" if ph not in expected else ""
+        print(f"- {ph}: {files} Datei(en){note}")
+    missing = sorted(expected - set(counts))
+    if missing:
+        print(f"- Nicht in den Dateien: {', '.join(missing)}")
+
+
+def run_batch(
+    job_file: Path,
+    out_root: Path,
+    today: str,
+    workers: int = 1,
+    stream: bool = False,
+    verify: bool = False,
+    values: dict[str, str] | None = None,
+    cache: bool = True,
+    when: datetime | None = None,
+    resolve: bool = True,
+    db: Path | None = None,
+) -> int:
+    jobs = read_jobs(job_file)
+    catalog: Catalog | None = None
+    store: CatalogStore | None = None
+    presets: dict[str, dict[str, Any]] = {}
+    if any(isinstance(job.get("query"), dict) for job in jobs):
+        db = db or STORE_PATH
+    if any(job.get("modules") or job.get("offer") or job.get("search") or job.get("query") for job in jobs):
+        with PROFILER.phase("load catalog"):
+            if db is not None:
+                store = CatalogStore(db)
+                catalog = store.catalog().compact()
+            else:
+                catalog = load_catalog(compact=True)
+            presets = load_offer_presets()
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    failed = 0
+    outputs: list[str] = []
+    placeholders: set[str] = set()
+    started = time.perf_counter()
+    print(f"Batch: {len(jobs)} Jobs aus {job_file}")
+    try:
+        for n, job in enumerate(jobs, start=1):
+            job_id = str(job.get("id") or f"job-{n:04d}")
+            job_root = out_root / sanitize_file_part(job_id, f"job-{n:04d}")
+            t0 = time.perf_counter()
+            try:
+                with PROFILER.phase(f"job {job_id}", group="job"):
+                    spec = spec_from_job(job, catalog, presets, resolve, store)
+                    job_root.mkdir(parents=True, exist_ok=True)
+                    job_values = dict(values or {})
+                    if isinstance(job.get("values"), dict):
+                        job_values.update(normalize_values(job["values"]))
+                    result = generate_offer(
+                        spec, job_root, today, workers, pool, stream, job_values, cache, when
+                    )
+            except Exception as exc:  # one broken job must not stop the whole run
+                failed += 1
+                print(f"- {job_id}: FEHLER nach {time.perf_counter() - t0:.2f} s: {exc}")
+                continue
+            files = 2 + len(result["ls_paths"])
+            info = f"Cache {len(result['cache_hits'])}/{len(result['ls_paths'])}"
+            resolution = spec.get("resolution")
+            if resolution is not None and (resolution.added or resolution.conflicts):
+                info += f", +{len(resolution.added)} requires, {len(resolution.conflicts)} Konflikte"
+            print(f"- {job_id}: {time.perf_counter() - t0:.2f} s, {files} Dateien, {info} -> {job_root}")
+            outputs.extend([result["main"], result["combo"], *result["ls_paths"]])
+            placeholders.update(result["placeholders"])
+
+        if verify and outputs:
+            # All outputs of the run are checked at once, spread over the same worker pool.
+            with PROFILER.phase("verify"):
+                checked = verify_files(outputs, workers, pool)
+            print_verification(checked, placeholders)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if store is not None:
+            store.close()
+
+    total = time.perf_counter() - started
+    print(f"Gesamt: {len(jobs) - failed}/{len(jobs)} Jobs erfolgreich in {total:.2f} s")
+    return 1 if failed else 0
+
+
+def spec_from_args(
+    args: argparse.Namespace, catalog: Catalog | None = None
+) -> tuple[dict[str, Any], Resolution | None]:
+    # catalog: an already loaded catalog (ls_daemon.py); otherwise it is read from the files or --db.
+    spec = default_spec()
+    resolution = None
+    filters = store_filters({"domain": args.domain, "theme": args.theme, "tags": args.tag, "max_pt": args.max_pt})
+    db = args.db or (str(STORE_PATH) if filters else None)
+    if args.modules or args.search or filters:
+        with PROFILER.phase("load catalog"):
+            module_ids = split_ids(args.modules)
+            if db:
+                try:
+                    with CatalogStore(Path(db)) as store:
+                        catalog = store.catalog()
+                        if filters:
+                            found = list(store.ids(**filters))
+                            if not found:
+                                raise SystemExit("Keine Module fuer die Abfrage (--domain/--theme/--tag/--max-pt).")
+                            module_ids += found
+                except ValueError as exc:
+                    raise SystemExit(str(exc)) from exc
+            else:
+                catalog = catalog or load_catalog()
+            if args.search:
+                hits = catalog.search(args.search, args.search_limit)
+                if not hits:
+                    raise SystemExit(f"Keine Treffer fuer Suche: {args.search}")
+                module_ids += [hit.id for hit in hits]
+            spec["ls_list"], resolution = select_modules(catalog, list(dict.fromkeys(module_ids)), args.resolve)
+        spec["phases"] = phases_from_modules(spec["ls_list"])
+    if args.confidence:
+        attach_estimate(spec, args.samples)
+    if args.schedule:
+        try:
+            attach_schedule(spec, args.staff, args.start, args.holidays)
+        except ValueError as exc:
+            raise SystemExit(str(exc)) from exc
+    return spec, resolution
+
+
+def format_locations(locations: list[tuple[str, str]], limit: int = 3) -> str:
+    shown = ", ".join(f"{owner}/{path}" for owner, path in locations[:limit])
+    if len(locations) > limit:
+        shown += f", +{len(locations) - limit} weitere"
+    return shown
+
+
+def print_review(placeholders: dict[str, list[tuple[str, str]]], filled: list[str]) -> None:
+    if filled:
+        print(f"\nErsetzte Platzhalter: {', '.join(filled)}")
     print("\nReview-Liste (offene Platzhalter):")
-    for ph in sorted(placeholders):
-        print(f"- {ph}")
+    for ph, locations in sorted(placeholders.items()):
+        print(f"- {ph} ({format_locations(locations)})")
+
+
+def preview_offer(spec: dict[str, Any], today: str, fmt: str, values: dict[str, str], annex: bool = False) -> str:
+    # The main offer document (optionally with the annex) and its review list, without python-docx.
+    meta = spec["meta"]
+    ls_list = spec["ls_list"]
+    ls_files = {ls["id"]: ls_file_name(ls, today) for ls in ls_list}
+    model = offer_model(
+        meta,
+        spec["scenario"],
+        spec["phases"],
+        spec["milestones"],
+        spec["risks"],
+        ls_list,
+        ls_files,
+        spec.get("estimate"),
+    )
+    if annex:
+        blocks = [*model.blocks, Heading("Anhang - Leistungsscheine (Volltext)")]
+        for ls in ls_list:
+            blocks.append(Heading(f"{ls['id']} - {ls['titel']}", 2))
+            blocks += ls_model(meta, ls, with_title=False).blocks
+        model = DocModel(tuple(blocks))
+    placeholders, _ = offer_placeholders(spec, values)
+    review = [f"{ph} ({format_locations(locations)})" for ph, locations in sorted(placeholders.items())]
+    return render_preview(model.fill(values), fmt, f"Angebot - {fill_text(meta['projektname'], values)}", review)
+
+
+def print_dry_run(
+    spec: dict[str, Any], resolution: Resolution | None, root: Path, today: str, values: dict[str, str]
+) -> None:
+    # Everything the real run reports up front, without importing python-docx or writing files.
+    placeholders, filled = offer_placeholders(spec, values)
+    main_name, combo_name = offer_file_names(spec["meta"], today, values)
+    print("Geplante Dateien (--dry-run, nichts geschrieben):")
+    print(f"- {root / main_name}")
+    print(f"- {root / combo_name}")
+    for ls in spec["ls_list"]:
+        print(f"- {root / 'leistungsscheine' / ls_file_name(ls, today)}")
+    print_resolution(resolution)
+    print_estimate(spec.get("estimate"))
+    print_schedule(spec.get("schedule"))
+    print_review(placeholders, filled)
+
+
+def print_profile(out_dir: Path, explicit: str | None) -> None:
+    if not PROFILER.enabled:
+        return
+    trace = PROFILER.trace_path(out_dir, explicit)
+    PROFILER.write_trace(trace)
+    print(f"\nProfil (Trace: {trace}):")
+    for line in PROFILER.summary_lines():
+        print(f"  {line}")
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    when = build_datetime() if args.reproducible else None
+    today = when.date().isoformat() if when else date.today().isoformat()
+    if args.profile is not None:
+        PROFILER.enable()
+    values = load_values(Path(args.values)) if args.values else {}
+
+    if args.clear_cache:
+        clear()
+        print(f"Render-Cache geleert: {CACHE_ROOT}")
+        return
+    if args.batch:
+        out_root = Path(args.out_dir) if args.out_dir else Path.cwd() / "batch"
+        code = run_batch(
+            Path(args.batch),
+            out_root,
+            today,
+            args.workers,
+            args.stream,
+            args.verify,
+            values,
+            args.cache,
+            when,
+            args.resolve,
+            Path(args.db) if args.db else None,
+        )
+        print_profile(out_root, args.profile)
+        raise SystemExit(code)
+
+    spec, resolution = spec_from_args(args)
+
+    if args.preview:
+        write_preview(preview_offer(spec, today, args.preview, values, args.preview_annex), args.preview_out)
+        return
+    root = Path(args.out_dir) if args.out_dir else Path.cwd()
+    if args.dry_run:
+        print_dry_run(spec, resolution, root, today, values)
+        return
+    root.mkdir(parents=True, exist_ok=True)
+    result = generate_offer(
+        spec, root, today, args.workers, stream=args.stream, values=values, cache=args.cache, when=when
+    )
+
+    print("Erzeugte Dateien:")
+    print(f"- {result['main']}")
+    print(f"- {result['combo']}")
+    hits = set(result["cache_hits"])
+    for p in result["ls_paths"]:
+        print(f"- {p}{' (Cache)' if p in hits else ''}")
+    print(f"Leistungsscheine aus Cache: {len(hits)}, neu gerendert: {len(result['ls_paths']) - len(hits)}")
+
+    print_resolution(resolution)
+    print_estimate(spec.get("estimate"))
+    print_schedule(spec.get("schedule"))
+    print_review(result["placeholders"], result["filled"])
+
+    if args.verify:
+        with PROFILER.phase("verify"):
+            checked = verify_files([result["main"], result["combo"], *result["ls_paths"]], args.workers)
+        print_verification(checked, result["placeholders"])
+
+    print_profile(root, args.profile)
 
 
 if __name__ == "__main__":
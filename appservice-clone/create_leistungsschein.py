@@ -1,15 +1,22 @@
+import argparse
 from datetime import date
 from pathlib import Path
 import re
 
-from docx import Document
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
-from docx.oxml import OxmlElement
-from docx.oxml.ns import qn
-from docx.shared import Pt
+from doc_model import PREVIEW_FORMATS, Bullets, Heading, ModelBuilder, Rule, Table, render_preview, write_preview
+from docx_base import add_heading as styled_heading, add_paragraph as styled_paragraph, base_document
+from docx_verify import verify_docx
+from ls_catalog import PLACEHOLDER_RE
+from ls_store import STORE_PATH, CatalogStore
+
+# python-docx is imported inside the functions that build the document, so importing this
+# module (e.g. for sanitize_filename_part) does not load it.
 
 
 def add_bottom_border(paragraph):
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
     p = paragraph._p
     p_pr = p.get_or_add_pPr()
     p_bdr = OxmlElement('w:pBdr')
@@ -23,6 +30,9 @@ def add_bottom_border(paragraph):
 
 
 def add_field_code(run, field_name):
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
     begin = OxmlElement('w:fldChar')
     begin.set(qn('w:fldCharType'), 'begin')
 
@@ -57,16 +67,119 @@ def sanitize_filename_part(value, fallback):
 
 
 def apply_run_font(paragraph, size=11, bold=False):
+    from docx.shared import Pt
+
     for run in paragraph.runs:
         run.font.name = 'Calibri'
         run.font.size = Pt(size)
         run.bold = bold
 
 
-def main():
-    today_str = date.today().isoformat()
+def style_doc(doc):
+    from docx.shared import Pt
+
+    normal_style = doc.styles['Normal']
+    normal_style.font.name = 'Calibri'
+    normal_style.font.size = Pt(11)
+
+    for style_name, size in [('Heading 1', 17), ('Heading 2', 13), ('Heading 3', 12)]:
+        style = doc.styles[style_name]
+        style.font.name = 'Calibri'
+        style.font.size = Pt(size)
+        style.paragraph_format.space_before = Pt(12)
+        style.paragraph_format.space_after = Pt(6)
+
+
+def add_header_footer(doc, project, version):
+    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+    from docx.shared import Pt
+
+    section = doc.sections[0]
+    header = section.header
+    if not header.paragraphs:
+        header_p = header.add_paragraph()
+    else:
+        header_p = header.paragraphs[0]
+    header_p.text = f"Leistungsschein - {project}"
+    header_p.alignment = WD_PARAGRAPH_ALIGNMENT.RIGHT
+    for run in header_p.runs:
+        run.font.name = 'Calibri'
+        run.font.size = Pt(9)
+
+    footer = section.footer
+    if not footer.paragraphs:
+        footer_p = footer.add_paragraph()
+    else:
+        footer_p = footer.paragraphs[0]
+    footer_p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
 
-    data = {
+    run_prefix = footer_p.add_run('Seite ')
+    run_prefix.font.name = 'Calibri'
+    run_prefix.font.size = Pt(9)
+
+    run_page = footer_p.add_run()
+    run_page.font.name = 'Calibri'
+    run_page.font.size = Pt(9)
+    add_field_code(run_page, 'PAGE')
+
+    run_mid = footer_p.add_run(' von ')
+    run_mid.font.name = 'Calibri'
+    run_mid.font.size = Pt(9)
+
+    run_total = footer_p.add_run()
+    run_total.font.name = 'Calibri'
+    run_total.font.size = Pt(9)
+    add_field_code(run_total, 'NUMPAGES')
+
+    run_suffix = footer_p.add_run(f" | Version {version}")
+    run_suffix.font.name = 'Calibri'
+    run_suffix.font.size = Pt(9)
+
+
+def new_document(project, version):
+    def setup(doc):
+        style_doc(doc)
+        add_header_footer(doc, project, version)
+
+    return base_document(('leistungsschein', project, version), setup)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description='Erzeugt einen Leistungsschein als DOCX.')
+    parser.add_argument(
+        '--modules',
+        help='Kommagetrennte LS-IDs; Leistungen, Liefergegenstaende, Abgrenzungen, Annahmen und Einschraenkungen '
+        'kommen dann aus der SQLite-Ablage (python ls_store.py import) statt aus der Standardvorlage.',
+    )
+    parser.add_argument('--db', default=str(STORE_PATH), help='Katalog-Datenbank (Default .cache/ls-catalog.sqlite).')
+    parser.add_argument(
+        '--preview',
+        choices=PREVIEW_FORMATS,
+        help='Statt DOCX eine HTML- bzw. Markdown-Vorschau inkl. Review-Liste ausgeben (ohne python-docx).',
+    )
+    parser.add_argument('--preview-out', metavar='DATEI', help='Vorschau in DATEI schreiben statt auf stdout.')
+    return parser.parse_args(argv)
+
+
+def module_ids(value):
+    return [mid for mid in re.split(r'[\s,;]+', value or '') if mid]
+
+
+def load_modules(ids, db):
+    try:
+        with CatalogStore(Path(db)) as store:
+            return store.select(ids)
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+
+
+def module_lists(modules, field):
+    # Concatenated in module order; the same sentence from several modules appears once.
+    return list(dict.fromkeys(item for module in modules for item in module[field]))
+
+
+def leistungsschein_data(today_str):
+    return {
         'kunde': '<<Kundenname>>',
         'ansprechpartner_kunde': '<<Name, Rolle, E-Mail>>',
         'it_dienstleister': '<<Firmenname>>',
@@ -82,90 +195,47 @@ def main():
         'abhaengigkeiten': 'Tenant-Zugaenge, VPN, Admin-Rechte',
     }
 
-    placeholders = set()
 
-    def track(text):
-        if isinstance(text, str):
-            placeholders.update(re.findall(r'<<[^<>]+>>', text))
-
-    def add_heading(text, level=1):
-        track(text)
-        p = doc.add_heading(text, level=level)
-        apply_run_font(p, size=17 if level == 1 else 13)
-        return p
-
-    def add_text(text, style=None):
-        track(text)
-        p = doc.add_paragraph(text, style=style)
-        apply_run_font(p, size=11)
-        return p
-
-    doc = Document()
-
-    normal_style = doc.styles['Normal']
-    normal_style.font.name = 'Calibri'
-    normal_style.font.size = Pt(11)
-
-    for style_name, size in [('Heading 1', 17), ('Heading 2', 13), ('Heading 3', 12)]:
-        style = doc.styles[style_name]
-        style.font.name = 'Calibri'
-        style.font.size = Pt(size)
-        style.paragraph_format.space_before = Pt(12)
-        style.paragraph_format.space_after = Pt(6)
-
-    title = doc.add_paragraph()
-    title.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-    title_run = title.add_run('Leistungsschein')
-    title_run.bold = True
-    title_run.font.name = 'Calibri'
-    title_run.font.size = Pt(18)
-
-    project_line = doc.add_paragraph()
-    project_line.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
-    project_text = f"Projekt: {data['projektname']} | Kunde: {data['kunde']} | Version: {data['version']} | Datum: {data['datum']}"
-    track(project_text)
-    project_run = project_line.add_run(project_text)
-    project_run.font.name = 'Calibri'
-    project_run.font.size = Pt(11)
-
-    separator = doc.add_paragraph()
-    add_bottom_border(separator)
-
-    add_heading('Dokumentmetadaten', level=1)
-
-    metadata_rows = [
-        ('Kunde', data['kunde']),
-        ('Ansprechpartner Kunde', data['ansprechpartner_kunde']),
-        ('IT-Dienstleister', data['it_dienstleister']),
-        ('Ansprechpartner Dienstleister', data['ansprechpartner_dienstleister']),
-        ('Projektname', data['projektname']),
-        ('Version / Datum', f"{data['version']} / {data['datum']}"),
-        ('Gueltigkeitszeitraum', data['gueltigkeitszeitraum']),
-        ('Leistungsort', data['leistungsort']),
-        ('Abrechnungsmodell', data['abrechnungsmodell']),
-    ]
+def leistungsschein_model(data, modules=()):
+    # Content of the document (doc_model); render_docx() and --preview only decide how it looks.
+    m = ModelBuilder()
+    m.text('Leistungsschein', size=18, bold=True, align='center')
+    m.text(
+        f"Projekt: {data['projektname']} | Kunde: {data['kunde']} | Version: {data['version']} | Datum: {data['datum']}",
+        align='center',
+    )
+    m.rule()
+
+    m.heading('Dokumentmetadaten', 1)
+    m.table(
+        [
+            ('Kunde', data['kunde']),
+            ('Ansprechpartner Kunde', data['ansprechpartner_kunde']),
+            ('IT-Dienstleister', data['it_dienstleister']),
+            ('Ansprechpartner Dienstleister', data['ansprechpartner_dienstleister']),
+            ('Projektname', data['projektname']),
+            ('Version / Datum', f"{data['version']} / {data['datum']}"),
+            ('Gueltigkeitszeitraum', data['gueltigkeitszeitraum']),
+            ('Leistungsort', data['leistungsort']),
+            ('Abrechnungsmodell', data['abrechnungsmodell']),
+        ]
+    )
 
-    metadata_table = doc.add_table(rows=0, cols=2)
-    metadata_table.style = 'Table Grid'
-    for label, value in metadata_rows:
-        track(label)
-        track(value)
-        row_cells = metadata_table.add_row().cells
-        row_cells[0].text = label
-        row_cells[1].text = value
-
-    add_heading('Einleitung', level=1)
-    add_text(
+    m.heading('Einleitung', 1)
+    m.text(
         'Dieser Leistungsschein beschreibt Ziel, Inhalt und Rahmenbedingungen der beauftragten IT-Leistungen '
         'im Projektkontext und dient als verbindliche Grundlage fuer die operative Umsetzung.'
     )
-    add_text(
+    m.text(
         'Er grenzt den vereinbarten Leistungsumfang gegen nicht enthaltene Leistungen ab und wird zur '
         'Steuerung von Durchfuehrung, Nachverfolgung und Abnahme der Leistung verwendet.'
     )
 
-    add_heading('Leistungsumfang / Leistungen', level=1)
-    add_text('Die nachfolgenden Leistungen sind Bestandteil dieses Leistungsscheins:')
+    m.heading('Leistungsumfang / Leistungen', 1)
+    if modules:
+        m.text('Grundlage sind die folgenden Module aus dem Leistungskatalog:')
+        m.bullets(f"{module['id']} - {module['titel']} ({module['pt']} PT)" for module in modules)
+    m.text('Die nachfolgenden Leistungen sind Bestandteil dieses Leistungsscheins:')
 
     leistungen = [
         'Ist-Analyse, Kickoff und Anforderungsaufnahme der aktuellen Umgebung.',
@@ -178,19 +248,21 @@ def main():
         'Durchfuehrung von Tests und Unterstuetzung bei der Abnahme.',
         'Betriebsunterstuetzung (Hypercare) fuer <<X Tage>> nach Go-Live.',
     ]
-    for item in leistungen:
-        add_text(item, style='List Bullet')
+    if modules:
+        leistungen = module_lists(modules, 'leistungen')
+    m.bullets(leistungen)
 
-    add_heading('Liefergegenstaende', level=2)
+    m.heading('Liefergegenstaende', 2)
     liefergegenstaende = [
         'Aktualisierte technische Dokumentation.',
         'Konfigurations- und Umsetzungsnachweise.',
         'Uebergabeprotokoll inkl. offener Punkte.',
     ]
-    for item in liefergegenstaende:
-        add_text(item, style='List Bullet')
+    if modules:
+        liefergegenstaende = module_lists(modules, 'liefergegenstaende')
+    m.bullets(liefergegenstaende)
 
-    add_heading('Nicht im Leistungsumfang', level=1)
+    m.heading('Nicht im Leistungsumfang', 1)
     nicht_enthalten = [
         'Enduser-Support ausserhalb des definierten Scopes.',
         'Lizenzkosten und laufende Subskriptionsgebuehren von Herstellern.',
@@ -198,10 +270,11 @@ def main():
         'Leistungen von Drittanbietern ohne separate Beauftragung.',
         'Schulungen ausserhalb des vereinbarten Wissenstransfers.',
     ]
-    for item in nicht_enthalten:
-        add_text(item, style='List Bullet')
+    if modules:
+        nicht_enthalten = module_lists(modules, 'out_of_scope')
+    m.bullets(nicht_enthalten)
 
-    add_heading('Annahmen', level=1)
+    m.heading('Annahmen', 1)
     annahmen = [
         'Der Kunde stellt benoetigte Zugaenge, Rechte und Systeme rechtzeitig bereit.',
         'Benannte Ansprechpartner stehen fuer Termine, Reviews und Entscheidungen verfuegbar zur Verfuegung.',
@@ -209,59 +282,49 @@ def main():
         'Entscheidungen und Abnahmen erfolgen innerhalb von <<X Werktagen>> nach Vorlage.',
         f"Abhaengigkeiten werden aktiv adressiert: {data['abhaengigkeiten']}.",
     ]
-    for item in annahmen:
-        add_text(item, style='List Bullet')
+    if modules:
+        annahmen = module_lists(modules, 'annahmen')
+    m.bullets(annahmen)
 
-    add_heading('Einschraenkungen', level=1)
+    m.heading('Einschraenkungen', 1)
     einschraenkungen = [
         'Aenderungen am Scope erfolgen ausschliesslich ueber einen Change-Request-Prozess.',
         'Leistungserbringung kann von Drittanbieter-Verfuegbarkeiten und Provider-SLAs abhaengen.',
         'Zeitplaene sind von Freigaben, Zugaengen und Mitwirkungen des Kunden abhaengig.',
         'Fuer Legacy-Systeme ausserhalb Herstellersupport besteht keine Gewaehr fuer Fehlerbehebung.',
     ]
-    for item in einschraenkungen:
-        add_text(item, style='List Bullet')
-
-    add_heading('Mitwirkungspflichten Kunde', level=1)
-    mitwirkung = [
-        'Bereitstellung erforderlicher Daten, Informationen und Systemzugaenge.',
-        'Teilnahme an Abstimmungen, Workshops und Review-Terminen.',
-        'Fristgerechte Durchfuehrung von Tests und Rueckmeldung zu Ergebnissen.',
-        'Benennung eines entscheidungsbefugten Hauptansprechpartners.',
-    ]
-    for item in mitwirkung:
-        add_text(item, style='List Bullet')
-
-    add_heading('Termine & Meilensteine', level=1)
-    milestone_table = doc.add_table(rows=1, cols=3)
-    milestone_table.style = 'Table Grid'
-    hdr_cells = milestone_table.rows[0].cells
-    hdr_cells[0].text = 'Meilenstein'
-    hdr_cells[1].text = 'Beschreibung'
-    hdr_cells[2].text = 'Zieltermin'
-
-    milestones = [
-        ('Kickoff', 'Projektstart und Scope-Abstimmung', '<<YYYY-MM-DD>>'),
-        ('Technische Umsetzung', 'Konfiguration und Implementierung im vereinbarten Umfang', '<<YYYY-MM-DD>>'),
-        ('Abnahme', 'Abschlusstest, Uebergabe und Abnahmeprotokoll', '<<YYYY-MM-DD>>'),
-    ]
-    for milestone, description, due_date in milestones:
-        track(milestone)
-        track(description)
-        track(due_date)
-        row = milestone_table.add_row().cells
-        row[0].text = milestone
-        row[1].text = description
-        row[2].text = due_date
-
-    add_heading('Abnahme', level=1)
-    add_text(
+    if modules:
+        einschraenkungen = module_lists(modules, 'einschraenkungen')
+    m.bullets(einschraenkungen)
+
+    m.heading('Mitwirkungspflichten Kunde', 1)
+    m.bullets(
+        [
+            'Bereitstellung erforderlicher Daten, Informationen und Systemzugaenge.',
+            'Teilnahme an Abstimmungen, Workshops und Review-Terminen.',
+            'Fristgerechte Durchfuehrung von Tests und Rueckmeldung zu Ergebnissen.',
+            'Benennung eines entscheidungsbefugten Hauptansprechpartners.',
+        ]
+    )
+
+    m.heading('Termine & Meilensteine', 1)
+    m.table(
+        [
+            ('Kickoff', 'Projektstart und Scope-Abstimmung', '<<YYYY-MM-DD>>'),
+            ('Technische Umsetzung', 'Konfiguration und Implementierung im vereinbarten Umfang', '<<YYYY-MM-DD>>'),
+            ('Abnahme', 'Abschlusstest, Uebergabe und Abnahmeprotokoll', '<<YYYY-MM-DD>>'),
+        ],
+        header=('Meilenstein', 'Beschreibung', 'Zieltermin'),
+    )
+
+    m.heading('Abnahme', 1)
+    m.text(
         'Die Abnahme erfolgt anhand der dokumentierten Abnahmekriterien. Der Auftraggeber prueft die '
         'Leistungsergebnisse innerhalb einer Frist von <<X Werktagen>> und dokumentiert das Ergebnis im '
         'Abnahmeprotokoll.'
     )
 
-    add_heading('Preise & Zahlungsbedingungen', level=1)
+    m.heading('Preise & Zahlungsbedingungen', 1)
     model = data['abrechnungsmodell'].strip().lower()
     if model == 'festpreis':
         preistext = 'Festpreis: <<EUR>> netto. Zahlungsplan: 50 % bei Beauftragung, 50 % nach Abnahme.'
@@ -272,95 +335,142 @@ def main():
             f"T&M-Modell: Verrechnung nach Aufwand zum Satz von {data['tagessatz_stundensatz']} je Stunde/Tag, "
             'Abrechnung monatlich nach Leistungsnachweis.'
         )
-    add_text(preistext)
-    add_text('Reise- und Nebenkosten werden gemaess <<Regelung>> abgerechnet.')
+    m.text(preistext)
+    m.text('Reise- und Nebenkosten werden gemaess <<Regelung>> abgerechnet.')
 
-    add_heading('Vertraulichkeit & Datenschutz', level=1)
-    add_text(
+    m.heading('Vertraulichkeit & Datenschutz', 1)
+    m.text(
         'Beide Parteien behandeln alle im Rahmen dieses Leistungsscheins ausgetauschten Informationen vertraulich '
         'und verwenden sie ausschliesslich zur Vertragserfuellung.'
     )
-    add_text(
+    m.text(
         'Personenbezogene Daten werden nur im erforderlichen Umfang und auf Basis der geltenden Datenschutzvorgaben '
         'verarbeitet. Sofern vorhanden, gelten zusaetzlich bestehende NDA- und Auftragsverarbeitungsvereinbarungen.'
     )
-    add_text('Dieser Leistungsschein enthaelt keine Rechtsberatung.')
-
-    add_heading('Unterschriften', level=1)
-    sign_table = doc.add_table(rows=4, cols=2)
-    sign_table.style = 'Table Grid'
-    sign_table.cell(0, 0).text = 'Fuer Kunde'
-    sign_table.cell(0, 1).text = 'Fuer IT-Dienstleister'
-    sign_table.cell(1, 0).text = f"Name: {data['ansprechpartner_kunde']}"
-    sign_table.cell(1, 1).text = f"Name: {data['ansprechpartner_dienstleister']}"
-    sign_table.cell(2, 0).text = 'Datum: <<YYYY-MM-DD>>'
-    sign_table.cell(2, 1).text = 'Datum: <<YYYY-MM-DD>>'
-    sign_table.cell(3, 0).text = 'Unterschrift: ____________________'
-    sign_table.cell(3, 1).text = 'Unterschrift: ____________________'
-
-    for row in sign_table.rows:
-        for cell in row.cells:
-            track(cell.text)
+    m.text('Dieser Leistungsschein enthaelt keine Rechtsberatung.')
+
+    m.heading('Unterschriften', 1)
+    m.table(
+        [
+            ('Fuer Kunde', 'Fuer IT-Dienstleister'),
+            (f"Name: {data['ansprechpartner_kunde']}", f"Name: {data['ansprechpartner_dienstleister']}"),
+            ('Datum: <<YYYY-MM-DD>>', 'Datum: <<YYYY-MM-DD>>'),
+            ('Unterschrift: ____________________', 'Unterschrift: ____________________'),
+        ]
+    )
+    return m.build()
 
-    section = doc.sections[0]
-    header = section.header
-    if not header.paragraphs:
-        header_p = header.add_paragraph()
-    else:
-        header_p = header.paragraphs[0]
-    header_text = f"Leistungsschein - {data['projektname']}"
-    track(header_text)
-    header_p.text = header_text
-    header_p.alignment = WD_PARAGRAPH_ALIGNMENT.RIGHT
-    for run in header_p.runs:
-        run.font.name = 'Calibri'
-        run.font.size = Pt(9)
 
-    footer = section.footer
-    if not footer.paragraphs:
-        footer_p = footer.add_paragraph()
-    else:
-        footer_p = footer.paragraphs[0]
-    footer_p.alignment = WD_PARAGRAPH_ALIGNMENT.CENTER
+def model_placeholders(model, data):
+    # Placeholder -> sections it appears in, in document order; the page header counts as 'Titel'.
+    placeholders = {}
+    current = 'Titel'
 
-    run_prefix = footer_p.add_run('Seite ')
-    run_prefix.font.name = 'Calibri'
-    run_prefix.font.size = Pt(9)
+    def track(text):
+        if '<<' in text:
+            for ph in PLACEHOLDER_RE.findall(text):
+                placeholders.setdefault(ph, []).append(current)
+
+    track(f"Leistungsschein - {data['projektname']}")
+    for block in model.blocks:
+        if isinstance(block, Heading) and block.level == 1:
+            current = block.text
+        if isinstance(block, Bullets):
+            texts = block.items
+        elif isinstance(block, Table):
+            texts = [value for row in block.rows for value in row]
+        else:
+            texts = [getattr(block, 'text', '')]
+        for text in texts:
+            track(text)
+    return placeholders
+
+
+def render_docx(doc, model):
+    # DOCX backend for the Leistungsschein layout: centered title lines, grid tables, Calibri runs.
+    from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
+    from docx.shared import Pt
+
+    for block in model.blocks:
+        if isinstance(block, Heading):
+            apply_run_font(styled_heading(doc, block.text, block.level), size=17 if block.level == 1 else 13)
+        elif isinstance(block, Bullets):
+            for item in block.items:
+                apply_run_font(styled_paragraph(doc, item, 'List Bullet'), size=11)
+        elif isinstance(block, Rule):
+            add_bottom_border(doc.add_paragraph())
+        elif isinstance(block, Table):
+            table = doc.add_table(rows=0, cols=len(block.header or block.rows[0]))
+            table.style = 'Table Grid'
+            for values in ([block.header] if block.header else []) + list(block.rows):
+                for cell, value in zip(table.add_row().cells, values):
+                    cell.text = value
+        elif block.align:
+            p = doc.add_paragraph()
+            p.alignment = getattr(WD_PARAGRAPH_ALIGNMENT, block.align.upper())
+            run = p.add_run(block.text)
+            if block.bold:
+                run.bold = True
+            run.font.name = 'Calibri'
+            run.font.size = Pt(block.size)
+        else:
+            apply_run_font(styled_paragraph(doc, block.text, block.style), size=block.size, bold=block.bold)
+
+
+def output_name(data, today_str):
+    kunde_part = sanitize_filename_part(data['kunde'], 'Kunde')
+    projekt_part = sanitize_filename_part(data['projektname'], 'Projekt')
+    date_part = data['datum'] if re.fullmatch(r'\d{4}-\d{2}-\d{2}', data['datum']) else today_str
+    return f"Leistungsschein_{kunde_part}_{projekt_part}_{date_part}.docx"
 
-    run_page = footer_p.add_run()
-    run_page.font.name = 'Calibri'
-    run_page.font.size = Pt(9)
-    add_field_code(run_page, 'PAGE')
 
-    run_mid = footer_p.add_run(' von ')
-    run_mid.font.name = 'Calibri'
-    run_mid.font.size = Pt(9)
+def create_leistungsschein(modules=(), out_dir=None):
+    # Writes the document and returns its path plus placeholder -> sections for the review list.
+    today_str = date.today().isoformat()
+    data = leistungsschein_data(today_str)
+    model = leistungsschein_model(data, modules)
+    placeholders = model_placeholders(model, data)
 
-    run_total = footer_p.add_run()
-    run_total.font.name = 'Calibri'
-    run_total.font.size = Pt(9)
-    add_field_code(run_total, 'NUMPAGES')
+    doc = new_document(data['projektname'], data['version'])
+    render_docx(doc, model)
+    output_path = Path(out_dir or Path.cwd()) / output_name(data, today_str)
+    doc.save(output_path)
 
-    run_suffix = footer_p.add_run(f" | Version {data['version']}")
-    run_suffix.font.name = 'Calibri'
-    run_suffix.font.size = Pt(9)
+    # The model does not cover header and footer; the saved file is the reference.
+    for ph, parts in verify_docx(output_path).items():
+        if ph not in placeholders:
+            placeholders[ph] = list(parts)
+    return output_path, placeholders
 
-    kunde_part = sanitize_filename_part(data['kunde'], 'Kunde')
-    projekt_part = sanitize_filename_part(data['projektname'], 'Projekt')
-    date_part = data['datum'] if re.fullmatch(r'\d{4}-\d{2}-\d{2}', data['datum']) else today_str
 
-    filename = f"Leistungsschein_{kunde_part}_{projekt_part}_{date_part}.docx"
-    output_path = Path.cwd() / filename
-    doc.save(output_path)
+def preview(modules=(), fmt='html'):
+    # Same content and review list as the DOCX, rendered without python-docx.
+    today_str = date.today().isoformat()
+    data = leistungsschein_data(today_str)
+    model = leistungsschein_model(data, modules)
+    review = [
+        f"{ph} ({', '.join(dict.fromkeys(sections))})" for ph, sections in sorted(model_placeholders(model, data).items())
+    ]
+    return render_preview(model, fmt, f"Leistungsschein - {data['projektname']}", review)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    ids = module_ids(args.modules)
+    modules = load_modules(ids, args.db) if ids else []
+    if args.preview:
+        write_preview(preview(modules, args.preview), args.preview_out)
+        return
+    output_path, placeholders = create_leistungsschein(modules)
 
     print(f"DOCX erstellt: {output_path}")
     print('Review-Liste (offene Platzhalter):')
     if placeholders:
-        for ph in sorted(placeholders):
-            print(f"- {ph}")
+        for ph, sections in sorted(placeholders.items()):
+            print(f"- {ph} ({', '.join(dict.fromkeys(sections))})")
     else:
         print('- Keine offenen Platzhalter gefunden.')
 
 
 if __name__ == '__main__':
-    main()
+    main()
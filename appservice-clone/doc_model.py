@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+from html import escape
+from pathlib import Path
+import re
+import sys
+from typing import Any, Callable, Iterable
+
+from docx_fill import fill_text
+
+
+# Renderer-agnostic document tree: builders describe what a document contains, backends
+# (DOCX in create_angebot, Markdown/HTML below) decide how it looks. Nodes are frozen and
+# slotted, so a model is hashable and can be cached and compared without python-docx.
+
+
+@dataclass(frozen=True, slots=True)
+class Heading:
+    text: str
+    level: int = 1
+
+
+@dataclass(frozen=True, slots=True)
+class Paragraph:
+    text: str
+    style: str | None = None
+    size: int = 11
+    bold: bool = False
+    align: str | None = None
+
+
+@dataclass(frozen=True, slots=True)
+class Bullets:
+    items: tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Table:
+    rows: tuple[tuple[str, ...], ...]
+    header: tuple[str, ...] | None = None
+    size: int = 11
+
+
+@dataclass(frozen=True, slots=True)
+class Rule:
+    # Separator line (an empty paragraph with a bottom border in DOCX).
+    pass
+
+
+Block = Heading | Paragraph | Bullets | Table | Rule
+
+
+@dataclass(frozen=True, slots=True)
+class DocModel:
+    blocks: tuple[Block, ...]
+
+    def digest(self) -> str:
+        # The dataclass repr covers every field of every node and is stable across processes.
+        return hashlib.sha256(repr(self).encode("utf-8")).hexdigest()
+
+    def fill(self, values: dict[str, str]) -> DocModel:
+        if not values:
+            return self
+        return DocModel(tuple(_fill_block(block, values) for block in self.blocks))
+
+    def __add__(self, other: DocModel) -> DocModel:
+        return DocModel(self.blocks + other.blocks)
+
+
+def _fill_block(block: Block, values: dict[str, str]) -> Block:
+    if isinstance(block, Rule):
+        return block
+    if isinstance(block, Bullets):
+        return Bullets(tuple(fill_text(item, values) for item in block.items))
+    if isinstance(block, Table):
+        header = tuple(fill_text(v, values) for v in block.header) if block.header else None
+        rows = tuple(tuple(fill_text(v, values) for v in row) for row in block.rows)
+        return Table(rows, header, block.size)
+    if isinstance(block, Heading):
+        return Heading(fill_text(block.text, values), block.level)
+    return Paragraph(fill_text(block.text, values), block.style, block.size, block.bold, block.align)
+
+
+class ModelBuilder:
+    # Same calls as the python-docx helpers in create_angebot (heading, text, bullets, table),
+    # collected into a DocModel instead of a Document.
+    __slots__ = ("blocks",)
+
+    def __init__(self) -> None:
+        self.blocks: list[Block] = []
+
+    def heading(self, text: str, level: int = 1) -> None:
+        self.blocks.append(Heading(text, level))
+
+    def text(
+        self, value: str, style: str | None = None, size: int = 11, bold: bool = False, align: str | None = None
+    ) -> None:
+        self.blocks.append(Paragraph(value, style, size, bold, align))
+
+    def bullets(self, values: Iterable[str]) -> None:
+        self.blocks.append(Bullets(tuple(values)))
+
+    def table(self, rows: Iterable[Iterable[Any]], header: tuple[str, ...] | None = None, size: int = 11) -> None:
+        self.blocks.append(Table(tuple(tuple(str(v) for v in row) for row in rows), header, size))
+
+    def rule(self) -> None:
+        self.blocks.append(Rule())
+
+    def build(self) -> DocModel:
+        return DocModel(tuple(self.blocks))
+
+
+class ModelCache:
+    # Small LRU of built models keyed by a digest of their inputs, so a module rendered again
+    # in the same process (batch, daemon, render service) skips the builder.
+    __slots__ = ("size", "hits", "misses", "_models")
+
+    def __init__(self, size: int = 512) -> None:
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._models: OrderedDict[str, DocModel] = OrderedDict()
+
+    def get(self, key: str, build: Callable[[], DocModel]) -> DocModel:
+        model = self._models.get(key)
+        if model is not None:
+            self._models.move_to_end(key)
+            self.hits += 1
+            return model
+        self.misses += 1
+        model = self._models[key] = build()
+        if len(self._models) > self.size:
+            self._models.popitem(last=False)
+        return model
+
+    def clear(self) -> None:
+        self._models.clear()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+
+# Markers that start a block at the beginning of a line: headings and list items ("# ", "- ", "1. ")
+# and setext/fence lines ("===", "~~~"). Quotes and HTML blocks are covered by escaping < and >.
+_MD_LINE_START_RE = re.compile(
+    r"^([ \t]*(?:\d+(?=[.)]))?)((?:[#+\-]|(?<=\d)[.)])(?=[ \t]|$)|[=~])", re.MULTILINE
+)
+# Emphasis, code, links, table cells and escapes anywhere in the text.
+_MD_INLINE_RE = re.compile(r"([\\`*_\[\]|])")
+
+
+def _md_text(value: str) -> str:
+    # Escaped like to_html(): placeholders such as <<Kundenname>> would otherwise be parsed as HTML tags.
+    value = value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    value = _MD_INLINE_RE.sub(r"\\\1", value)
+    return _MD_LINE_START_RE.sub(r"\1\\\2", value)
+
+
+def _md_cell(value: str) -> str:
+    return _md_text(value).replace("\r", "").replace("\n", "<br>").replace("\t", " ")
+
+
+def to_markdown(model: DocModel) -> str:
+    out: list[str] = []
+    for block in model.blocks:
+        if isinstance(block, Heading):
+            out.append(f"{'#' * min(block.level, 6)} {_md_text(block.text)}")
+        elif isinstance(block, Bullets):
+            out.append("\n".join(f"- {_md_text(item)}" for item in block.items))
+        elif isinstance(block, Rule):
+            out.append("---")
+        elif isinstance(block, Table):
+            cols = len(block.header or block.rows[0]) if (block.header or block.rows) else 0
+            if not cols:
+                continue
+            # Markdown tables need a header row; key/value tables get an empty one.
+            header = block.header or ("",) * cols
+            lines = [
+                f"| {' | '.join(_md_cell(v) for v in header)} |",
+                f"|{'---|' * cols}",
+            ]
+            lines += [f"| {' | '.join(_md_cell(v) for v in row)} |" for row in block.rows]
+            out.append("\n".join(lines))
+        elif block.style == "List Bullet":
+            out.append(f"- {_md_text(block.text)}")
+        elif block.bold:
+            out.append(f"**{_md_text(block.text)}**")
+        else:
+            out.append(_md_text(block.text))
+    return "\n\n".join(out) + "\n"
+
+
+def to_html(model: DocModel) -> str:
+    # A body fragment; callers wrap it into a page or embed it.
+    out: list[str] = []
+    items: list[str] = []
+
+    def flush() -> None:
+        # Consecutive "List Bullet" paragraphs form one list, like in Word.
+        if items:
+            out.append(f"<ul>{''.join(items)}</ul>")
+            items.clear()
+
+    for block in model.blocks:
+        if isinstance(block, Paragraph) and block.style == "List Bullet":
+            items.append(f"<li>{escape(block.text, quote=False)}</li>")
+            continue
+        flush()
+        if isinstance(block, Heading):
+            level = min(block.level, 6)
+            out.append(f"<h{level}>{escape(block.text, quote=False)}</h{level}>")
+        elif isinstance(block, Bullets):
+            out.append(f"<ul>{''.join(f'<li>{escape(item, quote=False)}</li>' for item in block.items)}</ul>")
+        elif isinstance(block, Rule):
+            out.append("<hr>")
+        elif isinstance(block, Table):
+            head = ""
+            if block.header:
+                head = f"<thead><tr>{''.join(f'<th>{escape(v, quote=False)}</th>' for v in block.header)}</tr></thead>"
+            body = "".join(f"<tr>{''.join(f'<td>{escape(v, quote=False)}</td>' for v in row)}</tr>" for row in block.rows)
+            out.append(f"<table>{head}<tbody>{body}</tbody></table>")
+        else:
+            attrs = f' class="{block.align}"' if block.align else ""
+            content = f"<strong>{escape(block.text, quote=False)}</strong>" if block.bold else escape(block.text, quote=False)
+            out.append(f"<p{attrs}>{content}</p>")
+    flush()
+    return "\n".join(out) + "\n"
+
+
+# Text backends by name; the DOCX backend (create_angebot.render_docx) writes into a Document.
+BACKENDS: dict[str, Callable[[DocModel], str]] = {"markdown": to_markdown, "html": to_html}
+
+
+PREVIEW_FORMATS = ("html", "markdown")
+# Escaped placeholders (<<...>>) in the HTML body, highlighted for review.
+_HTML_PLACEHOLDER_RE = re.compile(r"&lt;&lt;.*?&gt;&gt;")
+_PAGE_STYLE = (
+    "body{font-family:Calibri,Arial,sans-serif;font-size:11pt;max-width:60em;margin:2em auto;padding:0 1em}"
+    "table{border-collapse:collapse;margin:.5em 0}td,th{border:1px solid #999;padding:.2em .5em;vertical-align:top}"
+    "th{background:#eee;text-align:left}.center{text-align:center}mark{background:#ffe58a}"
+)
+
+
+def html_page(title: str, body: str) -> str:
+    body = _HTML_PLACEHOLDER_RE.sub(r"<mark>\g<0></mark>", body)
+    return (
+        f'<!DOCTYPE html>\n<html lang="de">\n<head>\n<meta charset="utf-8">\n<title>{escape(title)}</title>\n'
+        f"<style>{_PAGE_STYLE}</style>\n</head>\n<body>\n{body}</body>\n</html>\n"
+    )
+
+
+def render_preview(model: DocModel, fmt: str, title: str, review: list[str]) -> str:
+    # The document followed by the placeholder review list, as one HTML page or Markdown text.
+    m = ModelBuilder()
+    m.heading("Review-Liste (offene Platzhalter)")
+    m.bullets(review or ["Keine offenen Platzhalter gefunden."])
+    full = model + m.build()
+    if fmt == "html":
+        return html_page(title, to_html(full))
+    return BACKENDS[fmt](full)
+
+
+def write_preview(text: str, path: str | None) -> None:
+    if path:
+        Path(path).write_text(text, encoding="utf-8")
+    else:
+        sys.stdout.write(text)
@@ -0,0 +1,52 @@
+from __future__ import annotations
+
+from io import BytesIO
+from typing import TYPE_CHECKING, Callable
+
+from gen_profile import PROFILER
+
+if TYPE_CHECKING:
+    from docx.document import Document
+    from docx.text.paragraph import Paragraph
+
+
+# Styled skeletons (styles, header, footer) per key, serialized once per process.
+_TEMPLATES: dict[tuple[str, ...], bytes] = {}
+# Paragraph style name -> style id (None for the default style). All documents start from the
+# python-docx default template, so the mapping is the same for every document.
+_STYLE_IDS: dict[str, str | None] = {}
+
+
+def base_document(key: tuple[str, ...], setup: Callable[[Document], None]) -> Document:
+    from docx import Document
+
+    blob = _TEMPLATES.get(key)
+    if blob is None:
+        with PROFILER.phase(f"base template {key[0]}", cat="template"):
+            doc = Document()
+            setup(doc)
+            buf = BytesIO()
+            doc.save(buf)
+            blob = _TEMPLATES[key] = buf.getvalue()
+    return Document(BytesIO(blob))
+
+
+def add_paragraph(doc: Document, text: str = "", style: str | None = None) -> Paragraph:
+    # doc.add_paragraph(text, style) resolves the name on every call and scans all styles to see
+    # whether it is the default one; that lookup dominated small documents.
+    p = doc.add_paragraph(text)
+    if style is not None:
+        if style not in _STYLE_IDS:
+            from docx.enum.style import WD_STYLE_TYPE
+
+            _STYLE_IDS[style] = doc.part.get_style_id(style, WD_STYLE_TYPE.PARAGRAPH)
+        p._p.style = _STYLE_IDS[style]
+    return p
+
+
+def add_heading(doc: Document, text: str, level: int = 1) -> Paragraph:
+    return add_paragraph(doc, text, "Title" if level == 0 else f"Heading {level}")
+
+
+def clear_templates() -> None:
+    _TEMPLATES.clear()
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+import json
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from ls_catalog import PLACEHOLDER_RE
+
+if TYPE_CHECKING:
+    from docx.document import Document
+
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+PARAGRAPH = f"{W_NS}p"
+TEXT = f"{W_NS}t"
+XML_SPACE = "{http://www.w3.org/XML/1998/namespace}space"
+
+
+def normalize_values(raw: dict[str, Any]) -> dict[str, str]:
+    # Keys may be given with or without the angle brackets: "Kundenname" == "<<Kundenname>>".
+    values: dict[str, str] = {}
+    for key, value in raw.items():
+        key = str(key).strip()
+        if not (key.startswith("<<") and key.endswith(">>")):
+            key = f"<<{key}>>"
+        values[key] = "" if value is None else str(value)
+    return values
+
+
+def load_values(path: Path) -> dict[str, str]:
+    with open(path, encoding="utf-8") as fh:
+        raw = json.load(fh)
+    if not isinstance(raw, dict):
+        raise ValueError(f"{path}: erwartet ein JSON-Objekt Platzhalter -> Wert")
+    return normalize_values(raw)
+
+
+def fill_text(value: str, values: dict[str, str]) -> str:
+    if "<<" not in value:
+        return value
+    return PLACEHOLDER_RE.sub(lambda m: values.get(m.group(), m.group()), value)
+
+
+def _set_text(t, value: str) -> None:
+    t.text = value
+    if value != value.strip():
+        t.set(XML_SPACE, "preserve")
+
+
+def fill_element(element, values: dict[str, str]) -> int:
+    # One pass over the paragraphs; run texts are joined per paragraph so placeholders that
+    # Word split across runs are replaced as well. The value goes into the run holding the
+    # start of the placeholder, keeping its formatting.
+    replaced = 0
+    for p in element.iter(PARAGRAPH):
+        texts = [t for t in p.iter(TEXT) if t.text]
+        if not texts:
+            continue
+        joined = "".join(t.text for t in texts)
+        if "<<" not in joined:
+            continue
+        matches = [m for m in PLACEHOLDER_RE.finditer(joined) if m.group() in values]
+        if not matches:
+            continue
+        starts = []
+        pos = 0
+        for t in texts:
+            starts.append(pos)
+            pos += len(t.text)
+        # Right to left, so the offsets of earlier matches stay valid.
+        for m in reversed(matches):
+            i = bisect_right(starts, m.start()) - 1
+            j = bisect_right(starts, m.end() - 1) - 1
+            head = texts[i].text[: m.start() - starts[i]]
+            tail = texts[j].text[m.end() - starts[j] :]
+            if i == j:
+                _set_text(texts[i], head + values[m.group()] + tail)
+            else:
+                _set_text(texts[i], head + values[m.group()])
+                for t in texts[i + 1 : j]:
+                    _set_text(t, "")
+                _set_text(texts[j], tail)
+            replaced += 1
+    return replaced
+
+
+def fill_document(doc: Document, values: dict[str, str]) -> int:
+    if not values:
+        return 0
+    from docx.opc.constants import RELATIONSHIP_TYPE as RT
+
+    replaced = fill_element(doc.element.body, values)
+    for rel in doc.part.rels.values():
+        if rel.reltype in (RT.HEADER, RT.FOOTER) and not rel.is_external:
+            replaced += fill_element(rel.target_part.element, values)
+    return replaced
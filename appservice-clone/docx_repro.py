@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from io import BytesIO
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+import zipfile
+
+if TYPE_CHECKING:
+    from docx.document import Document
+
+
+# Earliest timestamp a zip entry can carry; used when SOURCE_DATE_EPOCH is not set.
+ZIP_EPOCH = datetime(1980, 1, 1, tzinfo=timezone.utc)
+CONTENT_TYPES = "[Content_Types].xml"
+
+
+def build_datetime() -> datetime:
+    # SOURCE_DATE_EPOCH is the usual convention for reproducible builds (seconds since 1970, UTC).
+    value = os.environ.get("SOURCE_DATE_EPOCH", "").strip()
+    if not value:
+        return ZIP_EPOCH
+    try:
+        when = datetime.fromtimestamp(int(value), tz=timezone.utc)
+    except (ValueError, OverflowError, OSError) as exc:
+        raise ValueError(f"Ungueltiges SOURCE_DATE_EPOCH: {value}") from exc
+    return max(when, ZIP_EPOCH)
+
+
+def entry_order(names: Iterable[str]) -> list[str]:
+    # [Content_Types].xml first (some readers expect it there), everything else by name.
+    return sorted(names, key=lambda name: (name != CONTENT_TYPES, name))
+
+
+def zip_info(name: str, when: datetime) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, when.timetuple()[:6])
+    info.compress_type = zipfile.ZIP_DEFLATED
+    # ZipInfo defaults depend on the host OS; pin them so the bytes match across platforms.
+    info.create_system = 0
+    info.external_attr = 0
+    return info
+
+
+def pin_core_properties(doc: Document, when: datetime) -> None:
+    props = doc.core_properties
+    stamp = when.replace(tzinfo=None)
+    props.created = stamp
+    props.modified = stamp
+    props.revision = 1
+
+
+def save_document(doc: Document, out: Path | str, when: datetime | None = None) -> None:
+    if when is None:
+        doc.save(out)
+        return
+    pin_core_properties(doc, when)
+    buf = BytesIO()
+    doc.save(buf)
+    with zipfile.ZipFile(buf) as src, zipfile.ZipFile(out, "w") as dst:
+        for name in entry_order(src.namelist()):
+            dst.writestr(zip_info(name, when), src.read(name))
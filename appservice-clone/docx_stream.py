@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable
+import zipfile
+
+from docx_repro import entry_order, pin_core_properties, zip_info
+
+if TYPE_CHECKING:
+    from docx.document import Document
+
+
+DOCUMENT_PART = "word/document.xml"
+
+
+def stream_document(
+    doc: Document,
+    out_path: Path | str,
+    sections: Iterable[list[bytes]],
+    when: datetime | None = None,
+) -> None:
+    # Saves doc as usual, but word/document.xml is written through a streaming zip entry:
+    # the existing body first, then every section as it is produced, then the final sectPr.
+    # Only one section is held in memory at a time, however many are appended.
+    # With `when` set, entry timestamps, order and core properties are pinned (see docx_repro).
+    if when is not None:
+        pin_core_properties(doc, when)
+    buf = BytesIO()
+    doc.save(buf)
+    with zipfile.ZipFile(buf) as src, zipfile.ZipFile(out_path, "w", zipfile.ZIP_DEFLATED) as dst:
+        infos = src.infolist()
+        if when is not None:
+            infos = [zip_info(name, when) for name in entry_order(src.namelist())]
+        for info in infos:
+            if info.filename != DOCUMENT_PART:
+                dst.writestr(info, src.read(info.filename))
+                continue
+            xml = src.read(info.filename)
+            split = xml.rfind(b"<w:sectPr")
+            if split < 0:
+                split = xml.rindex(b"</w:body>")
+            target = zipfile.ZipInfo(info.filename, info.date_time)
+            target.compress_type = zipfile.ZIP_DEFLATED
+            if when is not None:
+                target = zip_info(info.filename, when)
+            # No ZIP64 extra field, so the entry matches doc.save() byte for byte (--stream and the
+            # assembled combo give the same file with --reproducible). Word cannot open bodies near
+            # 4 GiB anyway; zipfile raises instead of writing a broken entry if one gets that large.
+            with dst.open(target, "w") as fh:
+                fh.write(xml[:split])
+                for fragments in sections:
+                    for fragment in fragments:
+                        fh.write(fragment)
+                fh.write(xml[split:])
@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import argparse
+import os
+from pathlib import Path
+import re
+import sys
+from typing import TYPE_CHECKING, Iterable
+import zipfile
+
+from ls_catalog import PLACEHOLDER_RE
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+PARAGRAPH = f"{W_NS}p"
+TEXT = f"{W_NS}t"
+# Rows and paragraphs are dropped once read, so memory stays flat however large the body is.
+RELEASED = {PARAGRAPH, f"{W_NS}tr", f"{W_NS}tbl", f"{W_NS}sdt"}
+TEXT_PART_RE = re.compile(r"word/(document|header\d*|footer\d*)\.xml")
+CHUNK_SIZE = 64 * 1024
+
+# placeholder -> part name -> occurrences
+Findings = dict[str, dict[str, int]]
+
+
+def scan_part(stream, part: str, found: Findings) -> None:
+    from lxml import etree
+
+    parser = etree.XMLPullParser(events=("start", "end"), huge_tree=True)
+    paragraphs: list[list[str]] = []
+
+    def handle_events() -> None:
+        for event, elem in parser.read_events():
+            if event == "start":
+                if elem.tag == PARAGRAPH:
+                    paragraphs.append([])
+                continue
+            if elem.tag == TEXT and paragraphs and elem.text:
+                paragraphs[-1].append(elem.text)
+            elif elem.tag == PARAGRAPH and paragraphs:
+                # Runs are joined per paragraph, so placeholders split across runs are found too.
+                text = "".join(paragraphs.pop())
+                if "<<" in text:
+                    for ph in PLACEHOLDER_RE.findall(text):
+                        counts = found.setdefault(ph, {})
+                        counts[part] = counts.get(part, 0) + 1
+            if elem.tag in RELEASED:
+                elem.clear()
+                while elem.getprevious() is not None:
+                    del elem.getparent()[0]
+
+    while True:
+        chunk = stream.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        parser.feed(chunk)
+        handle_events()
+    parser.close()
+    handle_events()
+
+
+def verify_docx(path: Path | str) -> Findings:
+    found: Findings = {}
+    with zipfile.ZipFile(path) as zf:
+        for name in zf.namelist():
+            if TEXT_PART_RE.fullmatch(name):
+                with zf.open(name) as fh:
+                    scan_part(fh, name, found)
+    return found
+
+
+def verify_files(
+    paths: Iterable[Path | str],
+    workers: int = 1,
+    pool: ProcessPoolExecutor | None = None,
+) -> dict[str, Findings]:
+    paths = [str(p) for p in paths]
+    workers = min(workers or os.cpu_count() or 1, len(paths))
+    if workers <= 1 and pool is None:
+        return {p: verify_docx(p) for p in paths}
+    own_pool = pool is None
+    if own_pool:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = ProcessPoolExecutor(max_workers=workers)
+    try:
+        return dict(zip(paths, pool.map(verify_docx, paths, chunksize=4)))
+    finally:
+        if own_pool:
+            pool.shutdown()
+
+
+def files_per_placeholder(results: dict[str, Findings]) -> dict[str, int]:
+    counts: dict[str, int] = {}
+    for found in results.values():
+        for ph in found:
+            counts[ph] = counts.get(ph, 0) + 1
+    return counts
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Sucht offene Platzhalter (<<...>>) in erzeugten DOCX-Dateien.")
+    parser.add_argument("files", nargs="+", help="DOCX-Dateien oder Verzeichnisse (rekursiv).")
+    parser.add_argument("--workers", type=int, default=1, help="Anzahl Prozesse (0 = alle CPU-Kerne, Default 1).")
+    parser.add_argument("--strict", action="store_true", help="Exit-Code 1, falls Platzhalter gefunden werden.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    paths: list[Path] = []
+    for value in args.files:
+        path = Path(value)
+        paths.extend(sorted(path.rglob("*.docx")) if path.is_dir() else [path])
+
+    results = verify_files(paths, args.workers)
+    for path, found in results.items():
+        print(f"{path}: {len(found)} Platzhalter")
+        for ph, parts in sorted(found.items()):
+            print(f"- {ph} ({', '.join(f'{part} x{n}' for part, n in parts.items())})")
+    if args.strict and any(results.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from contextlib import contextmanager, nullcontext
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any, ContextManager, Iterator
+
+
+# LS_PROFILE=1 enables profiling, LS_PROFILE=<datei.json> additionally sets the trace path.
+# The variable is inherited by pool workers, so their spans are recorded as well.
+PROFILE_ENV = "LS_PROFILE"
+TRACE_NAME = "profile-trace.json"
+
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+COUNTED = {"paragraphs": f"{W_NS}p", "tables": f"{W_NS}tbl", "runs": f"{W_NS}r"}
+
+
+class Profiler:
+    def __init__(self) -> None:
+        self.enabled = os.environ.get(PROFILE_ENV, "") not in ("", "0")
+        self.events: list[dict[str, Any]] = []
+        self._stack: list[dict[str, Any]] = []
+
+    def enable(self) -> None:
+        self.enabled = True
+        if os.environ.get(PROFILE_ENV, "") in ("", "0"):
+            os.environ[PROFILE_ENV] = "1"
+
+    def phase(self, name: str, group: str | None = None, cat: str = "phase") -> ContextManager[None]:
+        if not self.enabled:
+            return nullcontext()
+        return self._span(name, group or name, cat)
+
+    @contextmanager
+    def _span(self, name: str, group: str, cat: str) -> Iterator[None]:
+        span = {"name": name, "group": group, "cat": cat, "args": {}, "section": None}
+        span["ts"] = time.time()
+        span["t0"] = time.perf_counter()
+        self._stack.append(span)
+        try:
+            yield
+        finally:
+            self._close_section(span)
+            self._stack.pop()
+            self._record(span)
+
+    def section(self, name: str) -> None:
+        # Sections split the innermost active phase, e.g. the numbered headings of build_offer().
+        if not self.enabled or not self._stack:
+            return
+        span = self._stack[-1]
+        self._close_section(span)
+        span["section"] = {
+            "name": name,
+            "group": name,
+            "cat": "section",
+            "args": {},
+            "ts": time.time(),
+            "t0": time.perf_counter(),
+        }
+
+    def _close_section(self, span: dict[str, Any]) -> None:
+        if span["section"] is not None:
+            self._record(span["section"])
+            span["section"] = None
+
+    def _record(self, span: dict[str, Any]) -> None:
+        self.events.append(
+            {
+                "name": span["name"],
+                "group": span["group"],
+                "cat": span["cat"],
+                "ts": span["ts"],
+                "dur": time.perf_counter() - span["t0"],
+                "pid": os.getpid(),
+                "args": span["args"],
+            }
+        )
+
+    def count_document(self, element: Any) -> None:
+        if not self.enabled or not self._stack:
+            return
+        args = self._stack[-1]["args"]
+        for key, tag in COUNTED.items():
+            args[key] = args.get(key, 0) + sum(1 for _ in element.iter(tag))
+        args["documents"] = args.get("documents", 0) + 1
+
+    @contextmanager
+    def capture(self) -> Iterator[list[dict[str, Any]]]:
+        # Moves the events recorded inside the block into the yielded list, so worker results
+        # can carry them back to the parent process (see merge()).
+        captured: list[dict[str, Any]] = []
+        start = len(self.events)
+        try:
+            yield captured
+        finally:
+            captured.extend(self.events[start:])
+            del self.events[start:]
+
+    def merge(self, events: list[dict[str, Any]]) -> None:
+        if self.enabled:
+            self.events.extend(events)
+
+    def trace_path(self, default_dir: Path, explicit: str | None = None) -> Path:
+        if explicit:
+            return Path(explicit)
+        env = os.environ.get(PROFILE_ENV, "")
+        if env.lower().endswith(".json"):
+            return Path(env)
+        return default_dir / TRACE_NAME
+
+    def write_trace(self, path: Path) -> None:
+        # Chrome trace event format; opens in chrome://tracing or ui.perfetto.dev.
+        events = [
+            {
+                "name": e["name"],
+                "cat": e["cat"],
+                "ph": "X",
+                "ts": round(e["ts"] * 1_000_000),
+                "dur": round(e["dur"] * 1_000_000),
+                "pid": e["pid"],
+                "tid": 0,
+                "args": e["args"],
+            }
+            for e in self.events
+        ]
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, fh)
+
+    def summary_lines(self, limit: int = 25) -> list[str]:
+        if not self.events:
+            return []
+        start = min(e["ts"] for e in self.events)
+        end = max(e["ts"] + e["dur"] for e in self.events)
+        wall = max(end - start, 1e-9)
+        groups: dict[str, dict[str, float]] = defaultdict(lambda: {"count": 0, "total": 0.0})
+        totals: dict[str, int] = defaultdict(int)
+        for e in self.events:
+            group = groups[e["group"]]
+            group["count"] += 1
+            group["total"] += e["dur"]
+            for key, value in e["args"].items():
+                totals[key] += value
+
+        lines = [f"{'Phase/Abschnitt':<40} {'Anzahl':>7} {'Summe [ms]':>12} {'Anteil':>8}"]
+        ranked = sorted(groups.items(), key=lambda item: item[1]["total"], reverse=True)
+        for name, group in ranked[:limit]:
+            lines.append(
+                f"{name[:40]:<40} {group['count']:>7} {group['total'] * 1000:>12.1f} "
+                f"{group['total'] / wall * 100:>7.1f}%"
+            )
+        lines.append(f"Laufzeit gesamt: {wall:.2f} s (Anteile verschachtelter Phasen ueberlappen)")
+        if totals:
+            lines.append(
+                f"Dokumente: {totals['documents']}, Absaetze: {totals['paragraphs']}, "
+                f"Tabellen: {totals['tables']}, Runs: {totals['runs']}"
+            )
+        return lines
+
+
+PROFILER = Profiler()
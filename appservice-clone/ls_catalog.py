@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import cached_property
+import json
+import os
+from pathlib import Path
+import re
+import sys
+from typing import Any, Iterable
+
+from ls_compact import StringPool, compact_module
+from ls_resolver import DependencyGraph, Resolution
+from ls_search import Hit, SearchIndex, module_terms
+
+
+APP_ROOT = Path(__file__).resolve().parent
+CATALOG_ROOT = APP_ROOT / "data" / "leistungsscheine"
+OFFERS_ROOT = APP_ROOT / "data" / "offers"
+INDEX_PATH = APP_ROOT / ".cache" / "ls-catalog-index.json"
+
+# Bump whenever normalize_module() changes shape, so stale index entries are re-read.
+INDEX_VERSION = 3
+
+PLACEHOLDER_RE = re.compile(r"<<[^<>]+>>")
+# Module fields that end up in the rendered documents; only these are scanned for placeholders.
+RENDERED_FIELDS = (
+    "id",
+    "titel",
+    "typ",
+    "pt",
+    "preis",
+    "kurz",
+    "einleitung",
+    "leistungen",
+    "annahmen",
+    "einschraenkungen",
+    "liefergegenstaende",
+    "out_of_scope",
+    "aufwand_abrechnung",
+    "abnahme",
+)
+
+
+@dataclass
+class Catalog:
+    root: Path
+    modules: list[dict[str, Any]]
+    by_id: dict[str, dict[str, Any]]
+    entries: dict[str, dict[str, Any]] = field(repr=False)
+    reparsed: int = 0
+
+    def select(self, ids: list[str]) -> list[dict[str, Any]]:
+        missing = [mid for mid in ids if mid not in self.by_id]
+        if missing:
+            raise ValueError(f"Unbekannte Leistungsscheine: {', '.join(missing)}")
+        return [self.by_id[mid] for mid in ids]
+
+    @cached_property
+    def graph(self) -> DependencyGraph:
+        return DependencyGraph(self.modules)
+
+    def resolve(self, ids: list[str]) -> Resolution:
+        resolution = self.graph.resolve(ids)
+        if resolution.unknown:
+            raise ValueError(f"Unbekannte Leistungsscheine: {', '.join(resolution.unknown)}")
+        return resolution
+
+    @cached_property
+    def search_index(self) -> SearchIndex:
+        return SearchIndex(
+            (e["module"]["id"], e.get("terms") or {}) for e in self.entries.values() if e["module"]["id"] in self.by_id
+        )
+
+    def search(self, query: str, limit: int | None = 20) -> list[Hit]:
+        return self.search_index.search(query, limit)
+
+    def compact(self) -> Catalog:
+        # Slotted records with pooled strings and tuples; index entries are cut down to what the
+        # search index needs. Meant for long-running processes that keep the catalog around.
+        pool = StringPool()
+        modules = [compact_module(m, pool) for m in self.modules]
+        by_id = {m.id: m for m in modules}
+        entries = {
+            rel_path: {
+                "module": {"id": e["module"]["id"]},
+                "terms": {pool(term): weight for term, weight in (e.get("terms") or {}).items()},
+            }
+            for rel_path, e in self.entries.items()
+            if e["module"]["id"] in by_id
+        }
+        return Catalog(root=self.root, modules=modules, by_id=by_id, entries=entries, reparsed=self.reparsed)
+
+
+def scan_placeholders(value: Any, path: str = "") -> dict[str, list[str]]:
+    # Placeholder -> field paths ("leistungen[2]", "meta.kunde"), in document order.
+    found: dict[str, list[str]] = {}
+    stack: list[tuple[str, Any]] = [(path, value)]
+    while stack:
+        where, item = stack.pop()
+        if isinstance(item, str):
+            if "<<" in item:
+                for ph in PLACEHOLDER_RE.findall(item):
+                    found.setdefault(ph, []).append(where)
+        elif isinstance(item, dict):
+            stack.extend((f"{where}.{k}" if where else str(k), v) for k, v in reversed(item.items()))
+        elif isinstance(item, (list, tuple)):
+            stack.extend((f"{where}[{i}]", v) for i, v in reversed(list(enumerate(item))))
+    return found
+
+
+def module_placeholders(module: dict[str, Any]) -> dict[str, list[str]]:
+    # Catalog modules carry their scan in the index; hand-written modules are scanned on demand.
+    cached = module.get("placeholders")
+    if isinstance(cached, dict):
+        return cached
+    return scan_placeholders({key: module[key] for key in RENDERED_FIELDS if key in module})
+
+
+def merge_placeholders(
+    sources: Iterable[tuple[str, dict[str, list[str]]]],
+) -> dict[str, list[tuple[str, str]]]:
+    merged: dict[str, list[tuple[str, str]]] = {}
+    for owner, found in sources:
+        for ph, paths in found.items():
+            merged.setdefault(ph, []).extend((owner, path) for path in paths)
+    return merged
+
+
+def walk_json_files(root: Path) -> list[tuple[str, os.stat_result]]:
+    found: list[tuple[str, os.stat_result]] = []
+    stack = [str(root)]
+    while stack:
+        current = stack.pop()
+        try:
+            entries = list(os.scandir(current))
+        except FileNotFoundError:
+            continue
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                stack.append(entry.path)
+            elif entry.is_file() and entry.name.lower().endswith(".json"):
+                found.append((entry.path, entry.stat()))
+    found.sort()
+    return found
+
+
+def _str_list(value: Any) -> list[str]:
+    if not isinstance(value, list):
+        return []
+    return [str(v) for v in value]
+
+
+def _number(value: Any) -> float | int:
+    try:
+        num = float(value or 0)
+    except (TypeError, ValueError):
+        return 0
+    return int(num) if num.is_integer() else num
+
+
+def normalize_module(raw: dict[str, Any], rel_path: str) -> dict[str, Any]:
+    mid = str(raw.get("id") or "").strip()
+    estimate = raw.get("estimate") if isinstance(raw.get("estimate"), dict) else {}
+    deps = raw.get("dependencies") if isinstance(raw.get("dependencies"), dict) else {}
+    est = {
+        "unit": str(estimate.get("unit") or "PT"),
+        "min": _number(estimate.get("min")),
+        "likely": _number(estimate.get("likely")),
+        "max": _number(estimate.get("max")),
+    }
+    module = {
+        # Fields consumed by create_angebot.build_ls().
+        "id": mid,
+        "titel": str(raw.get("title") or "").strip(),
+        "typ": "Optional" if raw.get("optional") else "Pflicht",
+        "pt": est["likely"],
+        "preis": f"<<Preis {mid} in EUR>>",
+        "kurz": str(raw.get("summary") or "").strip(),
+        "einleitung": str(raw.get("intro") or "").strip(),
+        "leistungen": _str_list(raw.get("services")),
+        "annahmen": _str_list(raw.get("assumptions")),
+        "einschraenkungen": _str_list(raw.get("constraints")),
+        "liefergegenstaende": _str_list(raw.get("deliverables")),
+        "out_of_scope": _str_list(raw.get("out_of_scope")),
+        "aufwand_abrechnung": (
+            f"{est['likely']} PT (Spanne {est['min']}-{est['max']} PT), "
+            "Abrechnung gemaess <<Festpreis / T&M>>."
+        ),
+        "abnahme": " ".join(_str_list(raw.get("acceptance"))),
+        # Catalog metadata for selection and ordering.
+        "domain": str(raw.get("domain") or "unknown").strip(),
+        "theme": str(raw.get("theme") or "general").strip(),
+        "tags": _str_list(raw.get("tags")),
+        "estimate": est,
+        "dependencies": {
+            "requires": _str_list(deps.get("requires")),
+            "excludes": _str_list(deps.get("excludes")),
+        },
+        "option_group": str(raw.get("option_group") or ""),
+        "path": rel_path,
+    }
+    module["placeholders"] = scan_placeholders({key: module[key] for key in RENDERED_FIELDS})
+    return module
+
+
+def _read_entry(path: str, rel_path: str, stat: os.stat_result) -> dict[str, Any]:
+    try:
+        with open(path, encoding="utf-8") as fh:
+            raw = json.load(fh)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"Ungueltiges JSON in {rel_path}: {exc}") from exc
+    module = normalize_module(raw if isinstance(raw, dict) else {}, rel_path)
+    return {
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "module": module,
+        # Term weights for the full-text search (ls_search.py), kept next to the module.
+        "terms": module_terms(module),
+    }
+
+
+def _load_index(index_path: Path | None, root: Path) -> dict[str, dict[str, Any]]:
+    if index_path is None or not index_path.is_file():
+        return {}
+    try:
+        with open(index_path, encoding="utf-8") as fh:
+            data = json.load(fh)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if data.get("version") != INDEX_VERSION or data.get("root") != str(root):
+        return {}
+    entries = data.get("entries")
+    return entries if isinstance(entries, dict) else {}
+
+
+def _write_index(index_path: Path, root: Path, entries: dict[str, dict[str, Any]]) -> None:
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(
+            {"version": INDEX_VERSION, "root": str(root), "entries": entries},
+            fh,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+    os.replace(tmp, index_path)
+
+
+def load_catalog(root: Path = CATALOG_ROOT, index_path: Path | None = INDEX_PATH, compact: bool = False) -> Catalog:
+    root = Path(root).resolve()
+    cached = _load_index(index_path, root)
+    entries: dict[str, dict[str, Any]] = {}
+    reparsed = 0
+
+    for path, stat in walk_json_files(root):
+        rel_path = Path(path).relative_to(root).as_posix()
+        entry = cached.get(rel_path)
+        if entry is None or entry.get("mtime_ns") != stat.st_mtime_ns or entry.get("size") != stat.st_size:
+            entry = _read_entry(path, rel_path, stat)
+            reparsed += 1
+        entries[rel_path] = entry
+
+    if index_path is not None and (reparsed or len(entries) != len(cached)):
+        _write_index(index_path, root, entries)
+
+    modules = sorted(
+        (e["module"] for e in entries.values() if e["module"]["id"] and e["module"]["titel"]),
+        key=lambda m: m["id"],
+    )
+    by_id = {m["id"]: m for m in modules}
+    catalog = Catalog(root=root, modules=modules, by_id=by_id, entries=entries, reparsed=reparsed)
+    return catalog.compact() if compact else catalog
+
+
+def load_offer_presets(root: Path = OFFERS_ROOT) -> dict[str, dict[str, Any]]:
+    presets: dict[str, dict[str, Any]] = {}
+    for path, _stat in walk_json_files(root):
+        if Path(path).name == "categories.json":
+            continue
+        with open(path, encoding="utf-8") as fh:
+            raw = json.load(fh)
+        module_ids = raw.get("module_ids") or raw.get("defaultSelected") or []
+        if not raw.get("id") or not module_ids:
+            continue
+        presets[str(raw["id"])] = {
+            "id": str(raw["id"]),
+            "title": str(raw.get("title") or raw.get("name") or raw["id"]),
+            "module_ids": [str(mid) for mid in module_ids],
+        }
+    return presets
+
+
+def main() -> None:
+    catalog = load_catalog()
+    print(f"Katalog: {catalog.root}")
+    print(f"- Module: {len(catalog.modules)}")
+    print(f"- Neu eingelesen: {catalog.reparsed}")
+    print(f"- Index: {INDEX_PATH}")
+    for mid in sys.argv[1:]:
+        module = catalog.by_id.get(mid)
+        print(f"- {mid}: {module['titel'] if module else 'nicht gefunden'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, fields
+import gc
+from typing import Any, Callable, Iterable
+
+
+class Record:
+    # Read-only mapping access on top of slotted dataclasses, so compact modules can be passed
+    # wherever the normalized module dicts are used (ls["id"], ls.get("domain")).
+    __slots__ = ()
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return hasattr(self, key)
+
+    def keys(self) -> list[str]:
+        return [f.name for f in fields(self)]
+
+
+@dataclass(frozen=True, slots=True)
+class Estimate(Record):
+    unit: str
+    min: float | int
+    likely: float | int
+    max: float | int
+
+
+@dataclass(frozen=True, slots=True)
+class Dependencies(Record):
+    requires: tuple[str, ...]
+    excludes: tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class CompactModule(Record):
+    id: str
+    titel: str
+    typ: str
+    pt: float | int
+    preis: str
+    kurz: str
+    einleitung: str
+    leistungen: tuple[str, ...]
+    annahmen: tuple[str, ...]
+    einschraenkungen: tuple[str, ...]
+    liefergegenstaende: tuple[str, ...]
+    out_of_scope: tuple[str, ...]
+    aufwand_abrechnung: str
+    abnahme: str
+    domain: str
+    theme: str
+    tags: tuple[str, ...]
+    estimate: Estimate
+    dependencies: Dependencies
+    option_group: str
+    path: str
+    placeholders: dict[str, tuple[str, ...]]
+
+
+class StringPool:
+    # One shared instance per distinct string. Unlike sys.intern the pool goes away with the
+    # catalog that owns it.
+
+    def __init__(self) -> None:
+        self._strings: dict[str, str] = {}
+
+    def __call__(self, value: str) -> str:
+        return self._strings.setdefault(value, value)
+
+    def many(self, values: Iterable[str]) -> tuple[str, ...]:
+        return tuple(self(v) for v in values)
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+
+def compact_module(module: dict[str, Any], pool: StringPool) -> CompactModule:
+    many = pool.many
+    est = module["estimate"]
+    deps = module["dependencies"]
+    return CompactModule(
+        id=pool(module["id"]),
+        titel=pool(module["titel"]),
+        typ=pool(module["typ"]),
+        pt=module["pt"],
+        preis=pool(module["preis"]),
+        kurz=pool(module["kurz"]),
+        einleitung=pool(module["einleitung"]),
+        leistungen=many(module["leistungen"]),
+        annahmen=many(module["annahmen"]),
+        einschraenkungen=many(module["einschraenkungen"]),
+        liefergegenstaende=many(module["liefergegenstaende"]),
+        out_of_scope=many(module["out_of_scope"]),
+        aufwand_abrechnung=pool(module["aufwand_abrechnung"]),
+        abnahme=pool(module["abnahme"]),
+        domain=pool(module["domain"]),
+        theme=pool(module["theme"]),
+        tags=many(module["tags"]),
+        estimate=Estimate(pool(est["unit"]), est["min"], est["likely"], est["max"]),
+        dependencies=Dependencies(many(deps["requires"]), many(deps["excludes"])),
+        option_group=pool(module["option_group"]),
+        path=module["path"],
+        placeholders={pool(ph): many(paths) for ph, paths in (module.get("placeholders") or {}).items()},
+    )
+
+
+def traced_bytes(build: Callable[[], Any]) -> tuple[Any, int]:
+    # Bytes still allocated by build()'s result once temporaries are collected.
+    import tracemalloc
+
+    gc.collect()
+    started = not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        result = build()
+        gc.collect()
+        return result, tracemalloc.get_traced_memory()[0] - before
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+def main() -> None:
+    from ls_catalog import load_catalog
+
+    plain, plain_bytes = traced_bytes(load_catalog)
+    count = len(plain.modules)
+    del plain
+    compact, compact_bytes = traced_bytes(lambda: load_catalog(compact=True))
+    print(f"Module: {count}")
+    print(f"- Dicts:   {plain_bytes / 1e6:7.2f} MB ({plain_bytes / count / 1024:5.1f} KiB je Modul)")
+    print(f"- Kompakt: {compact_bytes / 1e6:7.2f} MB ({compact_bytes / count / 1024:5.1f} KiB je Modul)")
+    print(f"- Anteil:  {compact_bytes / plain_bytes:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+import argparse
+from contextlib import redirect_stderr, redirect_stdout
+from datetime import date
+from io import StringIO
+import json
+import os
+from pathlib import Path
+import socket
+import socketserver
+import sys
+import threading
+import time
+from typing import Any
+
+
+APP_ROOT = Path(__file__).resolve().parent
+SOCKET_ENV = "LS_DAEMON_SOCKET"
+SOCKET_PATH = APP_ROOT / ".cache" / "ls-daemon.sock"
+COMMANDS = ("leistungsschein", "angebot", "status", "reload", "stop")
+# Options the daemon passes on. Anything else given on the command line (--batch, --profile: own
+# process, own trace) is rejected, so a new generator option is never silently ignored here.
+HANDLED = {
+    "leistungsschein": frozenset({"modules", "db", "preview", "preview_out"}),
+    "angebot": frozenset(
+        {
+            "modules", "search", "search_limit", "db", "domain", "theme", "tag", "max_pt", "resolve",
+            "confidence", "samples", "schedule", "staff", "start", "holidays", "out_dir", "workers", "stream",
+            "cache", "reproducible", "values", "dry_run", "preview", "preview_out", "preview_annex", "verify",
+        }
+    ),
+}
+
+
+def socket_path(explicit: str | None = None) -> Path:
+    return Path(explicit or os.environ.get(SOCKET_ENV) or SOCKET_PATH)
+
+
+class Generator:
+    # Everything a cold start pays for, loaded once: python-docx/lxml, the generator modules,
+    # the compact catalog and the styled base documents.
+
+    def __init__(self) -> None:
+        import create_angebot
+        import create_leistungsschein
+
+        self.angebot = create_angebot
+        self.leistungsschein = create_leistungsschein
+        self.started = time.time()
+        self.served = 0
+        self.reload()
+
+    def reload(self) -> None:
+        from ls_catalog import load_catalog
+
+        self.catalog = load_catalog(compact=True)
+        meta = self.angebot.default_spec()["meta"]
+        self.angebot.new_document(meta["projektname"], meta["version"])
+        self.leistungsschein.new_document("<<Projektname>>", "1.0")
+
+    def run(self, request: dict[str, Any]) -> dict[str, Any]:
+        cmd = request.get("cmd")
+        if cmd == "status":
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "uptime_s": round(time.time() - self.started, 1),
+                "served": self.served,
+                "modules": len(self.catalog.modules),
+            }
+        if cmd == "reload":
+            self.reload()
+            return {"ok": True, "modules": len(self.catalog.modules)}
+        if cmd == "stop":
+            return {"ok": True, "stopped": os.getpid()}
+        if cmd not in ("leistungsschein", "angebot"):
+            return {"ok": False, "error": f"Unbekannter Befehl: {cmd}"}
+
+        argv = [str(arg) for arg in request.get("args") or []]
+        t0 = time.perf_counter()
+        out, err = StringIO(), StringIO()
+        try:
+            # Jobs run one at a time, so relative paths and Path.cwd() defaults follow the client.
+            os.chdir(request.get("cwd") or APP_ROOT)
+            with redirect_stdout(out), redirect_stderr(err):
+                result = self.render(cmd, argv)
+        except SystemExit as exc:
+            message = exc.code if isinstance(exc.code, str) else err.getvalue().strip() or f"Exit-Code {exc.code}"
+            return {"ok": False, "error": message}
+        except Exception as exc:  # reported to the client, the daemon keeps running
+            return {"ok": False, "error": f"{type(exc).__name__}: {exc}"}
+        self.served += 1
+        if "paths" in result:
+            result["paths"] = [str(Path(p).resolve()) for p in result["paths"]]
+        return {"ok": True, **result, "ms": round((time.perf_counter() - t0) * 1000, 1)}
+
+    @staticmethod
+    def check_options(cmd: str, parse_args: Any, args: argparse.Namespace) -> None:
+        defaults = vars(parse_args([]))
+        unhandled = [
+            dest for dest, value in vars(args).items() if dest not in HANDLED[cmd] and value != defaults[dest]
+        ]
+        if unhandled:
+            flags = ", ".join(f"--{dest.replace('_', '-')}" for dest in unhandled)
+            verb = "werden" if len(unhandled) > 1 else "wird"
+            raise SystemExit(f"{flags} {verb} vom Daemon nicht unterstuetzt, bitte create_{cmd}.py direkt aufrufen.")
+
+    def render(self, cmd: str, argv: list[str]) -> dict[str, Any]:
+        # {"paths", "placeholders"} for documents; {"preview"} for --preview without --preview-out;
+        # {"report"} for --dry-run.
+        if cmd == "leistungsschein":
+            cl = self.leistungsschein
+            args = cl.parse_args(argv)
+            self.check_options(cmd, cl.parse_args, args)
+            ids = cl.module_ids(args.modules)
+            modules = cl.load_modules(ids, args.db) if ids else []
+            if args.preview:
+                return self.preview(cl.preview(modules, args.preview), args.preview_out)
+            path, placeholders = cl.create_leistungsschein(modules)
+            return {"paths": [path], "placeholders": sorted(placeholders)}
+
+        ca = self.angebot
+        args = ca.parse_args(argv)
+        self.check_options(cmd, ca.parse_args, args)
+        when = ca.build_datetime() if args.reproducible else None
+        today = when.date().isoformat() if when else date.today().isoformat()
+        values = ca.load_values(Path(args.values)) if args.values else {}
+        spec, resolution = ca.spec_from_args(args, self.catalog)
+        if args.preview:
+            text = ca.preview_offer(spec, today, args.preview, values, args.preview_annex)
+            return self.preview(text, args.preview_out)
+        root = Path(args.out_dir) if args.out_dir else Path.cwd()
+        if args.dry_run:
+            report = StringIO()
+            with redirect_stdout(report):
+                ca.print_dry_run(spec, resolution, root, today, values)
+            return {"report": report.getvalue()}
+        root.mkdir(parents=True, exist_ok=True)
+        result = ca.generate_offer(
+            spec, root, today, args.workers, stream=args.stream, values=values, cache=args.cache, when=when
+        )
+        paths = [result["main"], result["combo"], *result["ls_paths"]]
+        if args.verify:
+            checked = ca.verify_files(paths, args.workers)
+            return {"paths": paths, "placeholders": sorted({ph for found in checked.values() for ph in found})}
+        return {"paths": paths, "placeholders": sorted(result["placeholders"])}
+
+    @staticmethod
+    def preview(text: str, out: str | None) -> dict[str, Any]:
+        if not out:
+            return {"preview": text}
+        Path(out).write_text(text, encoding="utf-8")
+        return {"paths": [out]}
+
+
+class DaemonServer(socketserver.UnixStreamServer):
+    def __init__(self, path: Path, generator: Generator) -> None:
+        self.generator = generator
+        super().__init__(str(path), Handler)
+
+
+class Handler(socketserver.StreamRequestHandler):
+    # One JSON request line in, one JSON response line out.
+
+    def handle(self) -> None:
+        line = self.rfile.readline()
+        try:
+            request = json.loads(line)
+        except json.JSONDecodeError as exc:
+            request = {}
+            response = {"ok": False, "error": f"Ungueltige Anfrage: {exc}"}
+        else:
+            response = self.server.generator.run(request)
+        self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+        if request.get("cmd") == "stop":
+            # shutdown() waits for serve_forever() to return, so it cannot run on this thread.
+            threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+
+def send(path: Path, request: dict[str, Any]) -> dict[str, Any]:
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.connect(str(path))
+        sock.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as fh:
+            line = fh.readline()
+    if not line:
+        raise ConnectionError("Keine Antwort vom Daemon")
+    return json.loads(line)
+
+
+def serve(path: Path) -> None:
+    if path.exists():
+        try:
+            send(path, {"cmd": "status"})
+        except OSError:
+            path.unlink()  # left over from a daemon that did not shut down cleanly
+        else:
+            raise SystemExit(f"Daemon laeuft bereits: {path}")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+    generator = Generator()
+    with DaemonServer(path, generator) as server:
+        print(f"Daemon bereit nach {time.perf_counter() - t0:.2f} s: {path} (PID {os.getpid()})", flush=True)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            path.unlink(missing_ok=True)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Warmer Generator-Prozess und Client: 'serve' startet den Daemon, 'leistungsschein'/'angebot' "
+        "uebergeben die restlichen Argumente an create_leistungsschein.py bzw. create_angebot.py.",
+    )
+    parser.add_argument("--socket", help=f"UNIX-Socket (Default {SOCKET_PATH}, alternativ ${SOCKET_ENV}).")
+    parser.add_argument("--json", action="store_true", help="Antwort des Daemons unveraendert als JSON ausgeben.")
+    parser.add_argument("command", choices=("serve", *COMMANDS))
+    parser.add_argument("args", nargs=argparse.REMAINDER)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    path = socket_path(args.socket)
+    if args.command == "serve":
+        serve(path)
+        return
+    try:
+        response = send(path, {"cmd": args.command, "args": args.args, "cwd": os.getcwd()})
+    except OSError as exc:
+        raise SystemExit(f"Daemon nicht erreichbar ({path}): {exc}. Start: python ls_daemon.py serve") from exc
+    if args.json:
+        print(json.dumps(response, ensure_ascii=False, indent=2))
+    elif not response.get("ok"):
+        print(response.get("error"), file=sys.stderr)
+    elif "preview" in response:
+        sys.stdout.write(response["preview"])
+    elif "report" in response:
+        sys.stdout.write(response["report"])
+    elif "paths" in response:
+        for p in response["paths"]:
+            print(p)
+    else:
+        print(", ".join(f"{key}: {value}" for key, value in response.items() if key != "ok"))
+    if not response.get("ok"):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
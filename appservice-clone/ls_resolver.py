@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import argparse
+from collections import deque
+from dataclasses import asdict, dataclass, field
+import heapq
+import json
+import sys
+import time
+from typing import Any, Iterable
+
+
+@dataclass
+class Conflict:
+    kind: str  # "excludes", "option_group", "requires" (requirement dropped) or "cycle"
+    kept: str
+    dropped: str
+    detail: str = ""
+
+
+@dataclass
+class Resolution:
+    ids: list[str]  # rank order, same as resolveSelection() in server.js
+    ordered: list[str]  # topological: required modules before the modules requiring them
+    added: list[str] = field(default_factory=list)
+    unknown: list[str] = field(default_factory=list)
+    conflicts: list[Conflict] = field(default_factory=list)
+
+
+class DependencyGraph:
+    # Built once per catalog; resolve() then only touches the selected modules and their edges.
+
+    def __init__(self, modules: Iterable[dict[str, Any]]) -> None:
+        modules = list(modules)
+        known = {m["id"] for m in modules}
+        self.requires: dict[str, tuple[str, ...]] = {}
+        self.excludes: dict[str, tuple[str, ...]] = {}
+        self.option_group: dict[str, str] = {}
+        for m in modules:
+            deps = m.get("dependencies") or {}
+            # Unknown ids are ignored, as in server.js (moduleById.has(requiredId)).
+            self.requires[m["id"]] = tuple(r for r in deps.get("requires", []) if r in known)
+            self.excludes[m["id"]] = tuple(deps.get("excludes", []))
+            if m.get("option_group"):
+                self.option_group[m["id"]] = m["option_group"]
+
+    def resolve(self, selected_ids: Iterable[str]) -> Resolution:
+        ids = list(selected_ids)
+        unknown = list(dict.fromkeys(mid for mid in ids if mid not in self.requires))
+        # Earlier rank wins; duplicates keep their last index and their first position,
+        # like the Map/Set pair in resolveSelection().
+        order: dict[str, int] = {}
+        selected: dict[str, None] = {}
+        for index, mid in enumerate(mid for mid in ids if mid in self.requires):
+            order[mid] = index
+            selected[mid] = None
+
+        # Requires closure: one breadth-first traversal. Ranks follow discovery order, which is
+        # what the repeated "while changed" rounds in server.js produce as well.
+        added: list[str] = []
+        queue = deque(selected)
+        while queue:
+            for req in self.requires[queue.popleft()]:
+                if req not in selected:
+                    order[req] = len(order) + 1000
+                    selected[req] = None
+                    added.append(req)
+                    queue.append(req)
+
+        conflicts: list[Conflict] = []
+        for mid in sorted(selected, key=order.__getitem__):
+            if mid not in selected:
+                continue
+            for ex in self.excludes[mid]:
+                if ex not in selected:
+                    continue
+                if order[mid] <= order[ex]:
+                    del selected[ex]
+                    conflicts.append(Conflict("excludes", kept=mid, dropped=ex))
+                elif mid in selected:
+                    del selected[mid]
+                    conflicts.append(Conflict("excludes", kept=ex, dropped=mid))
+
+        keep: dict[str, str] = {}
+        for mid in list(selected):
+            group = self.option_group.get(mid)
+            if not group:
+                continue
+            current = keep.get(group)
+            if current is None:
+                keep[group] = mid
+            elif order[mid] < order[current]:
+                del selected[current]
+                keep[group] = mid
+                conflicts.append(Conflict("option_group", kept=mid, dropped=current, detail=group))
+            else:
+                del selected[mid]
+                conflicts.append(Conflict("option_group", kept=current, dropped=mid, detail=group))
+
+        resolved = sorted(selected, key=order.__getitem__)
+        for mid in resolved:
+            for req in self.requires[mid]:
+                if req not in selected:
+                    conflicts.append(Conflict("requires", kept=mid, dropped=req))
+
+        ordered = self._topological(resolved, order, conflicts)
+        return Resolution(ids=resolved, ordered=ordered, added=added, unknown=unknown, conflicts=conflicts)
+
+    def _topological(self, ids: list[str], order: dict[str, int], conflicts: list[Conflict]) -> list[str]:
+        # Kahn's algorithm; among ready modules the lowest rank goes first.
+        indegree = dict.fromkeys(ids, 0)
+        dependents: dict[str, list[str]] = {}
+        for mid in ids:
+            for req in self.requires[mid]:
+                if req in indegree:
+                    indegree[mid] += 1
+                    dependents.setdefault(req, []).append(mid)
+        ready = [(order[mid], mid) for mid, n in indegree.items() if n == 0]
+        heapq.heapify(ready)
+        result: list[str] = []
+        while ready:
+            _, mid = heapq.heappop(ready)
+            result.append(mid)
+            for dep in dependents.get(mid, ()):
+                indegree[dep] -= 1
+                if indegree[dep] == 0:
+                    heapq.heappush(ready, (order[dep], dep))
+        if len(result) < len(ids):
+            cyclic = [mid for mid in ids if indegree[mid] > 0]
+            conflicts.append(Conflict("cycle", kept=cyclic[0], dropped="", detail=", ".join(cyclic)))
+            result.extend(cyclic)
+        return result
+
+
+def describe(conflict: Conflict) -> str:
+    if conflict.kind == "excludes":
+        return f"{conflict.kept} schliesst {conflict.dropped} aus -> {conflict.dropped} entfernt"
+    if conflict.kind == "option_group":
+        return f"Optionsgruppe {conflict.detail}: {conflict.kept} behalten, {conflict.dropped} entfernt"
+    if conflict.kind == "requires":
+        return f"{conflict.kept} benoetigt {conflict.dropped}, das wegen eines Konflikts entfernt wurde"
+    return f"Zyklische requires-Abhaengigkeit: {conflict.detail}"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Loest requires/excludes/option_group fuer eine Modulauswahl auf.")
+    parser.add_argument("ids", nargs="*", help="LS-IDs in Rangfolge (frueher = hoeher priorisiert).")
+    parser.add_argument("--offer", help="Angebotsvorlage aus data/offers aufloesen.")
+    parser.add_argument("--all-offers", action="store_true", help="Alle Angebotsvorlagen aufloesen.")
+    parser.add_argument(
+        "--selections",
+        metavar="DATEI",
+        help="JSON-Datei {Name: [LS-IDs]} mit weiteren Auswahlen ('-' = stdin).",
+    )
+    parser.add_argument("--json", action="store_true", help="Ergebnis je Auswahl als JSON ausgeben.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    from ls_catalog import load_catalog, load_offer_presets
+
+    args = parse_args(argv)
+    catalog = load_catalog()
+    presets = load_offer_presets()
+    t0 = time.perf_counter()
+    graph = catalog.graph
+    build_s = time.perf_counter() - t0
+
+    selections: dict[str, list[str]] = {}
+    if args.ids:
+        selections["Auswahl"] = args.ids
+    if args.offer:
+        if args.offer not in presets:
+            raise SystemExit(f"Unbekannte Angebotsvorlage: {args.offer}")
+        selections[args.offer] = presets[args.offer]["module_ids"]
+    if args.all_offers:
+        selections.update({pid: preset["module_ids"] for pid, preset in presets.items()})
+    if args.selections:
+        if args.selections == "-":
+            selections.update(json.load(sys.stdin))
+        else:
+            with open(args.selections, encoding="utf-8") as fh:
+                selections.update(json.load(fh))
+
+    t0 = time.perf_counter()
+    results = {name: graph.resolve(ids) for name, ids in selections.items()}
+    resolve_s = time.perf_counter() - t0
+    if args.json:
+        print(json.dumps({name: asdict(res) for name, res in results.items()}, ensure_ascii=False))
+        return
+    for name, res in results.items():
+        print(f"{name}: {len(res.ordered)} Module (+{len(res.added)} ueber requires), {len(res.conflicts)} Konflikte")
+        print(f"  Reihenfolge: {', '.join(res.ordered)}")
+        if res.unknown:
+            print(f"  Unbekannt: {', '.join(res.unknown)}")
+        for conflict in res.conflicts:
+            print(f"  - {describe(conflict)}")
+    print(f"Graph: {len(graph.requires)} Module in {build_s * 1000:.1f} ms, Aufloesung: {resolve_s * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
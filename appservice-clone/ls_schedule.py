@@ -0,0 +1,313 @@
+from __future__ import annotations
+
+import argparse
+from dataclasses import dataclass
+from datetime import date, timedelta
+import heapq
+from math import ceil
+from pathlib import Path
+import re
+import time
+from typing import Any, Iterable
+
+DEFAULT_STAFF = "2"
+# Working days per capacity period: --staff 2,3,4 means 2 people in the first week, 3 in the second, ...
+WEEK = 5
+
+
+class WorkCalendar:
+    # Maps working-day offsets (0 = first working day) to dates: Monday to Friday without holidays.
+
+    def __init__(self, start: date, holidays: Iterable[date] = ()) -> None:
+        self.holidays = frozenset(holidays)
+        self._days: list[date] = []
+        day = start
+        while not self.is_workday(day):
+            day += timedelta(days=1)
+        self._next = day
+
+    def is_workday(self, day: date) -> bool:
+        return day.weekday() < 5 and day not in self.holidays
+
+    def day(self, offset: int) -> date:
+        # Extended on demand; a schedule of a few hundred modules needs a few hundred entries.
+        while len(self._days) <= offset:
+            self._days.append(self._next)
+            self._next += timedelta(days=1)
+            while not self.is_workday(self._next):
+                self._next += timedelta(days=1)
+        return self._days[offset]
+
+    @property
+    def start(self) -> date:
+        return self.day(0)
+
+
+@dataclass(frozen=True, slots=True)
+class Task:
+    id: str
+    phase: str
+    days: int
+    requires: tuple[str, ...]
+    # Levelled schedule: working-day offsets, finish exclusive.
+    start: int
+    finish: int
+    # Critical path method without the staffing limit.
+    earliest: int
+    latest: int
+
+    @property
+    def slack(self) -> int:
+        return self.latest - self.earliest
+
+    @property
+    def critical(self) -> bool:
+        return self.slack == 0
+
+
+@dataclass(frozen=True, slots=True)
+class Schedule:
+    tasks: tuple[Task, ...]
+    calendar: WorkCalendar
+    staff: tuple[int, ...]
+    # Working days with the staffing limit and without it (length of the critical path).
+    days: int
+    cpm_days: int
+    critical_path: tuple[str, ...]
+
+    def start_date(self, task: Task) -> date:
+        return self.calendar.day(task.start)
+
+    def end_date(self, task: Task) -> date:
+        # Last working day of the task.
+        return self.calendar.day(task.finish - 1)
+
+    @property
+    def finish(self) -> date:
+        return self.calendar.day(max(self.days - 1, 0))
+
+
+def parse_staff(value: str | int | Iterable[int]) -> tuple[int, ...]:
+    # "3" or "2,2,3,4" (people per week, the last value continues).
+    if isinstance(value, int):
+        parts = [value]
+    elif isinstance(value, str):
+        parts = [int(v) for v in re.split(r"[\s,;]+", value.strip()) if v]
+    else:
+        parts = [int(v) for v in value]
+    if not parts or any(p < 0 for p in parts) or not parts[-1]:
+        raise ValueError(f"Ungueltige Kapazitaet: {value!r} (Personen je Woche, z. B. 3 oder 2,2,3)")
+    return tuple(parts)
+
+
+def parse_holidays(value: str | Iterable[str] | None) -> list[date]:
+    # Comma-separated dates or a file with one date per line (or separated by commas/whitespace).
+    if not value:
+        return []
+    if isinstance(value, str):
+        path = Path(value)
+        text = path.read_text(encoding="utf-8") if path.is_file() else value
+        value = re.split(r"[\s,;]+", text)
+    try:
+        return [date.fromisoformat(v.strip()) for v in value if v.strip()]
+    except ValueError as exc:
+        raise ValueError(f"Ungueltiger Feiertag: {exc} (Format YYYY-MM-DD)") from exc
+
+
+def task_days(module: dict[str, Any]) -> int:
+    # One person per module, so the effort in PT is its duration in working days.
+    return max(1, ceil(float(module.get("pt") or 0)))
+
+
+def _requires(module: dict[str, Any], known: set[str]) -> tuple[str, ...]:
+    deps = module.get("dependencies") or {}
+    # Requirements outside the selection (e.g. --no-resolve) do not constrain the plan.
+    return tuple(dict.fromkeys(r for r in deps.get("requires", ()) if r in known and r != module["id"]))
+
+
+def schedule_modules(
+    modules: list[dict[str, Any]],
+    staff: str | int | Iterable[int] = DEFAULT_STAFF,
+    start: date | None = None,
+    holidays: Iterable[date] = (),
+) -> Schedule:
+    staff = parse_staff(staff)
+    ids = [m["id"] for m in modules]
+    known = set(ids)
+    rank = {mid: i for i, mid in enumerate(ids)}
+    days = {m["id"]: task_days(m) for m in modules}
+    phase = {m["id"]: m.get("domain") or "allgemein" for m in modules}
+    requires = {m["id"]: _requires(m, known) for m in modules}
+    successors: dict[str, list[str]] = {mid: [] for mid in ids}
+    for mid, reqs in requires.items():
+        for r in reqs:
+            successors[r].append(mid)
+
+    # Topological order (Kahn, selection order among ready modules).
+    indegree = {mid: len(reqs) for mid, reqs in requires.items()}
+    heap = [(rank[mid], mid) for mid, d in indegree.items() if d == 0]
+    heapq.heapify(heap)
+    order: list[str] = []
+    remaining = dict(indegree)
+    while heap:
+        _, mid = heapq.heappop(heap)
+        order.append(mid)
+        for s in successors[mid]:
+            remaining[s] -= 1
+            if not remaining[s]:
+                heapq.heappush(heap, (rank[s], s))
+    if len(order) < len(ids):
+        cycle = [mid for mid in ids if remaining[mid]]
+        raise ValueError(f"Zyklische Abhaengigkeiten, kein Zeitplan moeglich: {', '.join(cycle)}")
+
+    # Critical path method: forward and backward pass over the topological order.
+    earliest: dict[str, int] = {}
+    for mid in order:
+        earliest[mid] = max((earliest[r] + days[r] for r in requires[mid]), default=0)
+    cpm_days = max((earliest[mid] + days[mid] for mid in ids), default=0)
+    latest: dict[str, int] = {}
+    for mid in reversed(order):
+        latest[mid] = min((latest[s] for s in successors[mid]), default=cpm_days) - days[mid]
+
+    # Resource levelling: serial list scheduling over time. Ready modules wait in a heap ordered by
+    # latest start (least slack first), running ones in a heap ordered by finish; every step starts
+    # as many modules as the week's staff allows and then jumps to the next finish or week.
+    def capacity(day: int) -> int:
+        return staff[min(day // WEEK, len(staff) - 1)]
+
+    ready = [(latest[mid], rank[mid], mid) for mid in ids if not indegree[mid]]
+    heapq.heapify(ready)
+    running: list[tuple[int, str]] = []
+    started: dict[str, int] = {}
+    waiting = dict(indegree)
+    now = 0
+    while ready or running:
+        while ready and len(running) < capacity(now):
+            _, _, mid = heapq.heappop(ready)
+            started[mid] = now
+            heapq.heappush(running, (now + days[mid], mid))
+        next_week = (now // WEEK + 1) * WEEK
+        if running and (not ready or running[0][0] <= next_week):
+            now = running[0][0]
+        elif ready:
+            # Nobody finishes before the next capacity period (or nobody is working at all).
+            now = next_week
+        while running and running[0][0] <= now:
+            _, mid = heapq.heappop(running)
+            for s in successors[mid]:
+                waiting[s] -= 1
+                if not waiting[s]:
+                    heapq.heappush(ready, (latest[s], rank[s], s))
+
+    tasks = sorted(
+        (
+            Task(mid, phase[mid], days[mid], requires[mid], s, s + days[mid], earliest[mid], latest[mid])
+            for mid, s in started.items()
+        ),
+        key=lambda t: (t.start, rank[t.id]),
+    )
+    total = max((t.finish for t in tasks), default=0)
+
+    # One critical chain: from the module that ends the CPM plan back through zero-slack requirements.
+    path: list[str] = []
+    if ids:
+        current = max(ids, key=lambda mid: (earliest[mid] + days[mid], -rank[mid]))
+        while current:
+            path.append(current)
+            current = next((r for r in requires[current] if earliest[r] + days[r] == earliest[current]), None)
+    calendar = WorkCalendar(start or date.today(), holidays)
+    return Schedule(tuple(tasks), calendar, staff, total, cpm_days, tuple(reversed(path)))
+
+
+def phase_windows(
+    schedule: Schedule, groups: dict[str, Iterable[str]] | None = None
+) -> dict[str, tuple[date, date]]:
+    # First and last working day per group of modules: the offer's phase rows (label -> LS-IDs of
+    # its "ls" column), otherwise the modules' domains. Groups without scheduled modules are left out.
+    if groups is None:
+        groups = {}
+        for t in schedule.tasks:
+            groups.setdefault(t.phase, []).append(t.id)
+    by_id = {t.id: t for t in schedule.tasks}
+    windows = {}
+    for label, ids in groups.items():
+        tasks = [by_id[mid] for mid in ids if mid in by_id]
+        if tasks:
+            first = min(t.start for t in tasks)
+            last = max(t.finish for t in tasks)
+            windows[label] = (schedule.calendar.day(first), schedule.calendar.day(last - 1))
+    return windows
+
+
+def fill_milestones(
+    milestones: list[dict[str, str]], schedule: Schedule, windows: dict[str, tuple[date, date]]
+) -> list[dict[str, str]]:
+    # Dates for the offer's named milestones by their "bezug": "start" (first working day), "ende"
+    # (last working day) or a phase (its last working day, phase names compared case-insensitively).
+    # Milestones without a scheduled reference keep their date, e.g. the <<YYYY-MM-DD>> placeholder.
+    ends = {label.casefold(): end for label, (_, end) in windows.items()}
+    filled = []
+    for milestone in milestones:
+        ref = milestone.get("bezug", "").casefold()
+        if ref == "start" and schedule.tasks:
+            day = schedule.calendar.start
+        elif ref == "ende" and schedule.tasks:
+            day = schedule.finish
+        else:
+            day = ends.get(ref) if ref else None
+        filled.append({**milestone, "termin": day.isoformat()} if day else dict(milestone))
+    return filled
+
+
+def describe_schedule(schedule: Schedule) -> str:
+    staff = ",".join(str(s) for s in schedule.staff)
+    return (
+        f"{schedule.calendar.start.isoformat()} bis {schedule.finish.isoformat()}, {schedule.days} Arbeitstage "
+        f"mit {staff} Person(en)/Woche (kritischer Pfad ohne Kapazitaetsgrenze: {schedule.cpm_days})"
+    )
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Zeitplan aus requires-Kanten, Aufwand (PT) und Kapazitaet: kritischer Pfad, Kapazitaetsabgleich, "
+        "Arbeitstage ohne Wochenenden und Feiertage."
+    )
+    parser.add_argument("--modules", help="Kommagetrennte LS-IDs (Default: gesamter Katalog).")
+    parser.add_argument("--staff", default=DEFAULT_STAFF, help=f"Personen je Woche, z. B. 3 oder 2,2,3 (Default {DEFAULT_STAFF}).")
+    parser.add_argument("--start", type=date.fromisoformat, help="Projektstart YYYY-MM-DD (Default heute).")
+    parser.add_argument("--holidays", help="Feiertage YYYY-MM-DD, kommagetrennt oder als Datei.")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    from ls_catalog import load_catalog
+
+    args = parse_args(argv)
+    catalog = load_catalog()
+    ids = [mid.strip() for mid in (args.modules or "").split(",") if mid.strip()]
+    missing = [mid for mid in ids if mid not in catalog.by_id]
+    if missing:
+        raise SystemExit(f"Unbekannte Leistungsscheine: {', '.join(missing)}")
+    modules = [catalog.by_id[mid] for mid in ids] if ids else catalog.modules
+    t0 = time.perf_counter()
+    try:
+        schedule = schedule_modules(modules, args.staff, args.start, parse_holidays(args.holidays))
+    except ValueError as exc:
+        raise SystemExit(str(exc)) from exc
+    ms = (time.perf_counter() - t0) * 1000
+    for t in schedule.tasks:
+        flag = "*" if t.critical else " "
+        print(
+            f"{flag} {t.id:<10} {t.phase:<20} {t.days:>3} AT  {schedule.start_date(t)} - {schedule.end_date(t)}"
+            f"  Puffer {t.slack}"
+        )
+    print()
+    for label, (first, last) in phase_windows(schedule).items():
+        print(f"{label:<24} {first} - {last}")
+    print(f"\nZeitplan: {describe_schedule(schedule)}")
+    print(f"Kritischer Pfad: {' -> '.join(schedule.critical_path)}")
+    print(f"{len(schedule.tasks)} Module in {ms:.1f} ms (* = kritisch)")
+
+
+if __name__ == "__main__":
+    main()
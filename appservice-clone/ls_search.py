@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import argparse
+from bisect import bisect_left
+from dataclasses import dataclass
+import math
+import re
+import time
+from typing import Any, Iterable
+
+
+# Normalized module field -> weight of a term occurrence in that field.
+FIELD_WEIGHTS = {
+    "titel": 3.0,
+    "tags": 2.5,
+    "kurz": 1.5,
+    "leistungen": 1.0,
+    "liefergegenstaende": 1.0,
+}
+# The catalog writes umlauts as ae/oe/ue; queries with real umlauts are folded to match.
+FOLD = str.maketrans({"ä": "ae", "ö": "oe", "ü": "ue", "ß": "ss", "é": "e", "è": "e"})
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+SUFFIXES = ("en", "er", "es", "e", "n", "s")
+STOPWORDS = frozenset(
+    """
+    aber als am an auf aus bei bis das dass dem den der des die ein eine einem einen einer eines
+    es fuer im in inkl ist mit nach nicht oder sowie ueber um und unter vom von vor wie zu zum zur
+    and for of or the to
+    """.split()
+)
+
+
+def stem(token: str) -> str:
+    # Light German stemming: one plural/inflection ending, so "Konzepte"/"Konzept" and
+    # "Freigaben"/"Freigabe" meet. Short tokens and numbers stay as they are.
+    if len(token) > 4 and not token.isdigit():
+        for suffix in SUFFIXES:
+            if token.endswith(suffix) and len(token) - len(suffix) >= 4:
+                return token[: -len(suffix)]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    folded = text.lower().translate(FOLD)
+    return [stem(t) for t in TOKEN_RE.findall(folded) if t not in STOPWORDS]
+
+
+def module_terms(module: dict[str, Any]) -> dict[str, float]:
+    terms: dict[str, float] = {}
+    for name, weight in FIELD_WEIGHTS.items():
+        value = module.get(name) or ""
+        for text in value if isinstance(value, list) else [value]:
+            for token in tokenize(str(text)):
+                terms[token] = terms.get(token, 0.0) + weight
+    return terms
+
+
+@dataclass
+class Hit:
+    id: str
+    score: float
+    matched: int
+
+
+class SearchIndex:
+    # Inverted index term -> {module id: weighted term frequency}, built from the per-module
+    # term weights stored in the catalog index.
+
+    def __init__(self, documents: Iterable[tuple[str, dict[str, float]]]) -> None:
+        self.postings: dict[str, dict[str, float]] = {}
+        self.size = 0
+        for mid, terms in documents:
+            self.size += 1
+            for term, weight in terms.items():
+                self.postings.setdefault(term, {})[mid] = weight
+        self.vocabulary = sorted(self.postings)
+
+    def _expand(self, token: str) -> list[str]:
+        # "migr*" matches every term with that prefix.
+        if not token.endswith("*"):
+            return [token] if token in self.postings else []
+        prefix = token[:-1]
+        start = bisect_left(self.vocabulary, prefix)
+        terms = []
+        for term in self.vocabulary[start:]:
+            if not term.startswith(prefix):
+                break
+            terms.append(term)
+        return terms
+
+    def search(self, query: str, limit: int | None = 20) -> list[Hit]:
+        folded = query.lower().translate(FOLD)
+        tokens = []
+        for raw in re.findall(r"[a-z0-9]+\*?", folded):
+            if raw in STOPWORDS:
+                continue
+            # Prefixes are stemmed like the indexed terms: "migrationen*" looks for "migration*". The
+            # stemmed prefix is a prefix of the typed one, so every term the typed prefix reaches still matches.
+            tokens.append(stem(raw[:-1]) + "*" if raw.endswith("*") else stem(raw))
+        scores: dict[str, float] = {}
+        matched: dict[str, int] = {}
+        for token in dict.fromkeys(tokens):
+            seen: set[str] = set()
+            for term in self._expand(token):
+                posting = self.postings[term]
+                idf = math.log(1 + self.size / len(posting))
+                for mid, weight in posting.items():
+                    # Saturating tf: repeating a term in long service lists adds little.
+                    scores[mid] = scores.get(mid, 0.0) + idf * weight / (weight + 1.5)
+                    seen.add(mid)
+            for mid in seen:
+                matched[mid] = matched.get(mid, 0) + 1
+        # Modules matching more query terms rank first, then by score, then by id.
+        ranked = sorted(scores, key=lambda mid: (-matched[mid], -scores[mid], mid))
+        if limit is not None:
+            ranked = ranked[:limit]
+        return [Hit(mid, round(scores[mid], 4), matched[mid]) for mid in ranked]
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Volltextsuche im Leistungsschein-Katalog.")
+    parser.add_argument("query", nargs="+", help='Suchbegriffe, Praefixsuche mit "*" (z. B. migr*).')
+    parser.add_argument("--limit", type=int, default=20, help="Maximale Trefferzahl (Default 20).")
+    parser.add_argument(
+        "--ids", action="store_true", help="Nur kommagetrennte IDs ausgeben (fuer create_angebot.py --modules)."
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    from ls_catalog import load_catalog
+
+    args = parse_args(argv)
+    catalog = load_catalog()
+    t0 = time.perf_counter()
+    index = catalog.search_index
+    build_ms = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    hits = index.search(" ".join(args.query), args.limit)
+    query_ms = (time.perf_counter() - t0) * 1000
+    if args.ids:
+        print(",".join(hit.id for hit in hits))
+        return
+    for hit in hits:
+        print(f"{hit.score:7.2f}  {hit.matched}  {hit.id:<40} {catalog.by_id[hit.id]['titel']}")
+    print(f"{len(hits)} Treffer, Suche {query_ms:.1f} ms (Index aufgebaut in {build_ms:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
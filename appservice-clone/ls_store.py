@@ -0,0 +1,301 @@
+from __future__ import annotations
+
+import argparse
+import json
+import os
+from pathlib import Path
+import time
+from typing import Any, Iterable, Iterator
+
+from ls_catalog import APP_ROOT, CATALOG_ROOT, INDEX_PATH, INDEX_VERSION, Catalog, load_catalog
+
+
+STORE_PATH = APP_ROOT / ".cache" / "ls-catalog.sqlite"
+# Bump whenever the schema changes; older files are rejected and have to be imported again.
+STORE_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE modules (
+    id TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    titel TEXT NOT NULL,
+    typ TEXT NOT NULL,
+    domain TEXT NOT NULL,
+    theme TEXT NOT NULL,
+    option_group TEXT NOT NULL,
+    est_unit TEXT NOT NULL,
+    est_min REAL NOT NULL,
+    est_likely REAL NOT NULL,
+    est_max REAL NOT NULL,
+    data TEXT NOT NULL,
+    terms TEXT NOT NULL
+);
+CREATE INDEX modules_domain_theme ON modules (domain, theme);
+CREATE INDEX modules_theme ON modules (theme);
+CREATE INDEX modules_option_group ON modules (option_group) WHERE option_group <> '';
+CREATE INDEX modules_est_min ON modules (est_min);
+CREATE INDEX modules_est_likely ON modules (est_likely);
+CREATE INDEX modules_est_max ON modules (est_max);
+CREATE TABLE tags (
+    tag TEXT NOT NULL COLLATE NOCASE,
+    module_id TEXT NOT NULL REFERENCES modules (id),
+    PRIMARY KEY (tag, module_id)
+) WITHOUT ROWID;
+CREATE INDEX tags_module ON tags (module_id);
+CREATE TABLE dependencies (
+    kind TEXT NOT NULL CHECK (kind IN ('requires', 'excludes')),
+    target_id TEXT NOT NULL,
+    module_id TEXT NOT NULL REFERENCES modules (id),
+    position INTEGER NOT NULL,
+    PRIMARY KEY (kind, target_id, module_id)
+) WITHOUT ROWID;
+CREATE INDEX dependencies_module ON dependencies (module_id, kind, position);
+"""
+
+
+def import_catalog(catalog: Catalog, path: Path = STORE_PATH) -> int:
+    # Written to a temporary file and moved into place, so open readers keep a consistent view.
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    terms = {e["module"]["id"]: e.get("terms") or {} for e in catalog.entries.values()}
+    # sqlite3 is imported here and in CatalogStore: only --db runs need it, not every importer of this module.
+    import sqlite3
+
+    conn = sqlite3.connect(tmp)
+    try:
+        with conn:
+            conn.executescript(SCHEMA)
+            conn.executemany(
+                "INSERT INTO meta VALUES (?, ?)",
+                [
+                    ("store_version", str(STORE_VERSION)),
+                    ("index_version", str(INDEX_VERSION)),
+                    ("root", str(catalog.root)),
+                    ("modules", str(len(catalog.modules))),
+                    ("imported", str(int(time.time()))),
+                ],
+            )
+            conn.executemany(
+                "INSERT INTO modules VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    (
+                        m["id"],
+                        m["path"],
+                        m["titel"],
+                        m["typ"],
+                        m["domain"],
+                        m["theme"],
+                        m["option_group"],
+                        m["estimate"]["unit"],
+                        m["estimate"]["min"],
+                        m["estimate"]["likely"],
+                        m["estimate"]["max"],
+                        json.dumps(m, ensure_ascii=False, separators=(",", ":")),
+                        json.dumps(terms.get(m["id"], {}), ensure_ascii=False, separators=(",", ":")),
+                    )
+                    for m in catalog.modules
+                ),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO tags VALUES (?, ?)",
+                ((tag, m["id"]) for m in catalog.modules for tag in m["tags"]),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO dependencies VALUES (?, ?, ?, ?)",
+                (
+                    (kind, target, m["id"], position)
+                    for m in catalog.modules
+                    for kind in ("requires", "excludes")
+                    for position, target in enumerate(m["dependencies"][kind])
+                ),
+            )
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    os.replace(tmp, path)
+    return len(catalog.modules)
+
+
+class CatalogStore:
+    # Read-only query API over an imported catalog. Query methods are generators: rows are
+    # decoded one at a time while the caller iterates.
+
+    def __init__(self, path: Path = STORE_PATH) -> None:
+        self.path = Path(path)
+        if not self.path.is_file():
+            raise ValueError(f"Katalog-Datenbank fehlt: {self.path} (zuerst: python ls_store.py import)")
+        import sqlite3
+
+        self.conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True)
+        version = self.meta().get("store_version")
+        if version != str(STORE_VERSION):
+            self.conn.close()
+            raise ValueError(f"Katalog-Datenbank {self.path} ist veraltet (zuerst: python ls_store.py import)")
+
+    def __enter__(self) -> CatalogStore:
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT count(*) FROM modules").fetchone()[0]
+
+    def meta(self) -> dict[str, str]:
+        return dict(self.conn.execute("SELECT key, value FROM meta"))
+
+    def _where(
+        self,
+        ids: Iterable[str] | None,
+        domain: str | None,
+        theme: str | None,
+        tags: Iterable[str],
+        min_pt: float | None,
+        max_pt: float | None,
+        requires: str | None,
+        required_by: str | None,
+    ) -> tuple[str, list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+        if ids is not None:
+            ids = list(ids)
+            clauses.append(f"id IN ({', '.join('?' * len(ids))})" if ids else "0")
+            params += ids
+        if domain:
+            clauses.append("domain = ?")
+            params.append(domain)
+        if theme:
+            clauses.append("theme = ?")
+            params.append(theme)
+        for tag in tags:
+            # Every tag has to match (case-insensitive, via the tags primary key).
+            clauses.append("id IN (SELECT module_id FROM tags WHERE tag = ?)")
+            params.append(tag)
+        if min_pt is not None:
+            clauses.append("est_likely >= ?")
+            params.append(min_pt)
+        if max_pt is not None:
+            clauses.append("est_likely <= ?")
+            params.append(max_pt)
+        if requires:
+            clauses.append("id IN (SELECT module_id FROM dependencies WHERE kind = 'requires' AND target_id = ?)")
+            params.append(requires)
+        if required_by:
+            clauses.append("id IN (SELECT target_id FROM dependencies WHERE kind = 'requires' AND module_id = ?)")
+            params.append(required_by)
+        return (f" WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def modules(
+        self,
+        ids: Iterable[str] | None = None,
+        domain: str | None = None,
+        theme: str | None = None,
+        tags: Iterable[str] = (),
+        min_pt: float | None = None,
+        max_pt: float | None = None,
+        requires: str | None = None,
+        required_by: str | None = None,
+    ) -> Iterator[dict[str, Any]]:
+        # Normalized module dicts, as in Catalog.modules, ordered by id. PT bounds apply to
+        # estimate.likely; requires/required_by follow dependencies.requires in either direction.
+        where, params = self._where(ids, domain, theme, tags, min_pt, max_pt, requires, required_by)
+        for (data,) in self.conn.execute(f"SELECT data FROM modules{where} ORDER BY id", params):
+            yield json.loads(data)
+
+    def ids(
+        self,
+        ids: Iterable[str] | None = None,
+        domain: str | None = None,
+        theme: str | None = None,
+        tags: Iterable[str] = (),
+        min_pt: float | None = None,
+        max_pt: float | None = None,
+        requires: str | None = None,
+        required_by: str | None = None,
+    ) -> Iterator[str]:
+        where, params = self._where(ids, domain, theme, tags, min_pt, max_pt, requires, required_by)
+        for (mid,) in self.conn.execute(f"SELECT id FROM modules{where} ORDER BY id", params):
+            yield mid
+
+    def get(self, mid: str) -> dict[str, Any] | None:
+        row = self.conn.execute("SELECT data FROM modules WHERE id = ?", (mid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def select(self, ids: list[str]) -> list[dict[str, Any]]:
+        found = {m["id"]: m for m in self.modules(ids=dict.fromkeys(ids))}
+        missing = [mid for mid in ids if mid not in found]
+        if missing:
+            raise ValueError(f"Unbekannte Leistungsscheine: {', '.join(missing)}")
+        return [found[mid] for mid in ids]
+
+    def catalog(self) -> Catalog:
+        # The full catalog without walking data/leistungsscheine; resolution and search work as usual.
+        entries: dict[str, dict[str, Any]] = {}
+        for data, terms in self.conn.execute("SELECT data, terms FROM modules ORDER BY id"):
+            module = json.loads(data)
+            entries[module["path"]] = {"module": module, "terms": json.loads(terms)}
+        modules = [e["module"] for e in entries.values()]
+        by_id = {m["id"]: m for m in modules}
+        return Catalog(root=Path(self.meta().get("root", CATALOG_ROOT)), modules=modules, by_id=by_id, entries=entries)
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="SQLite-Ablage des Leistungsschein-Katalogs.")
+    parser.add_argument("--db", default=str(STORE_PATH), help=f"Datenbankdatei (Default {STORE_PATH}).")
+    sub = parser.add_subparsers(dest="command", required=True)
+    imp = sub.add_parser("import", help="Katalog aus data/leistungsscheine einlesen und die Datenbank neu schreiben.")
+    imp.add_argument("--root", default=str(CATALOG_ROOT), help="Katalogverzeichnis.")
+    query = sub.add_parser("query", help="Module nach Domain, Theme, Tags und Aufwand abfragen.")
+    query.add_argument("--domain")
+    query.add_argument("--theme")
+    query.add_argument("--tag", action="append", default=[], help="Mehrfach angebbar, alle muessen passen.")
+    query.add_argument("--min-pt", type=float)
+    query.add_argument("--max-pt", type=float, help="Obergrenze fuer estimate.likely.")
+    query.add_argument("--requires", metavar="ID", help="Module, die ID voraussetzen.")
+    query.add_argument("--required-by", metavar="ID", help="Module, die ID voraussetzt.")
+    query.add_argument("--ids", action="store_true", help="Nur kommagetrennte IDs ausgeben (fuer --modules).")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.command == "import":
+        t0 = time.perf_counter()
+        catalog = load_catalog(Path(args.root), INDEX_PATH if Path(args.root) == CATALOG_ROOT else None)
+        count = import_catalog(catalog, Path(args.db))
+        print(f"{count} Module nach {args.db} importiert in {time.perf_counter() - t0:.2f} s")
+        return
+
+    with CatalogStore(Path(args.db)) as store:
+        t0 = time.perf_counter()
+        modules = list(
+            store.modules(
+                domain=args.domain,
+                theme=args.theme,
+                tags=args.tag,
+                min_pt=args.min_pt,
+                max_pt=args.max_pt,
+                requires=args.requires,
+                required_by=args.required_by,
+            )
+        )
+        query_ms = (time.perf_counter() - t0) * 1000
+    if args.ids:
+        print(",".join(m["id"] for m in modules))
+        return
+    for m in modules:
+        print(f"{m['id']:<10} {m['pt']:>5} PT  {m['domain']}/{m['theme']}  {m['titel']}")
+    print(f"{len(modules)} Module, Abfrage {query_ms:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
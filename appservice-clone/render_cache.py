@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import time
+from typing import Any
+
+
+APP_ROOT = Path(__file__).resolve().parent
+CACHE_ROOT = APP_ROOT / ".cache" / "ls-render"
+# Size limit for prune(), in MB (LS_RENDER_CACHE_MB); least recently used entries are removed first.
+MAX_MB = int(os.environ.get("LS_RENDER_CACHE_MB") or 512)
+# Temporary files and half-written entries older than this are left over from crashed writers.
+STALE_SECONDS = 3600
+
+
+def cache_key(*parts: Any) -> str:
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def entry_path(key: str, root: Path = CACHE_ROOT) -> Path:
+    # <root>/ab/abcdef...; the entry consists of <key>.docx and <key>.xml (annex body fragments).
+    return Path(root) / key[:2] / key
+
+
+def load_entry(entry: Path | str, out: Path | str) -> bytes | None:
+    entry = Path(entry)
+    docx = entry.with_suffix(".docx")
+    fragments = entry.with_suffix(".xml")
+    try:
+        blob = fragments.read_bytes()
+        # A copy, not a hard link: output files are edited in Word and must not write through.
+        shutil.copyfile(docx, out)
+    except FileNotFoundError:
+        return None
+    try:
+        # The .xml mtime is the entry's last use for prune().
+        os.utime(fragments)
+    except OSError:
+        pass
+    return blob
+
+
+def store_entry(entry: Path | str, out: Path | str, fragments: list[bytes]) -> None:
+    entry = Path(entry)
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    suffix = f".{os.getpid()}.tmp"
+    docx_tmp = entry.with_name(entry.name + ".docx" + suffix)
+    xml_tmp = entry.with_name(entry.name + ".xml" + suffix)
+    shutil.copyfile(out, docx_tmp)
+    xml_tmp.write_bytes(b"".join(fragments))
+    # The .xml file marks a complete entry, so it is moved into place last.
+    os.replace(docx_tmp, entry.with_suffix(".docx"))
+    os.replace(xml_tmp, entry.with_suffix(".xml"))
+
+
+def clear(root: Path = CACHE_ROOT) -> None:
+    shutil.rmtree(root, ignore_errors=True)
+
+
+def prune(root: Path = CACHE_ROOT, max_mb: int = MAX_MB) -> tuple[int, int]:
+    # Removes least recently used entries until the cache fits into max_mb, plus stale temporary
+    # files. Returns (removed entries, remaining bytes).
+    root = Path(root)
+    now = time.time()
+    entries: list[tuple[float, int, Path]] = []
+    total = 0
+    for path in root.glob("??/*"):
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            continue
+        if path.suffix == ".xml":
+            docx = path.with_suffix(".docx")
+            try:
+                size = stat.st_size + docx.stat().st_size
+            except FileNotFoundError:
+                size = stat.st_size
+            entries.append((stat.st_mtime, size, path.with_suffix("")))
+            total += size
+        elif path.suffix != ".docx" or not path.with_suffix(".xml").exists():
+            # *.tmp or a .docx whose .xml never arrived.
+            if now - stat.st_mtime > STALE_SECONDS:
+                path.unlink(missing_ok=True)
+    removed = 0
+    limit = max_mb * 1024 * 1024
+    for _, size, entry in sorted(entries):
+        if total <= limit:
+            break
+        # .xml first: without it the entry counts as missing even if the .docx delete fails.
+        entry.with_suffix(".xml").unlink(missing_ok=True)
+        entry.with_suffix(".docx").unlink(missing_ok=True)
+        total -= size
+        removed += 1
+    return removed, total
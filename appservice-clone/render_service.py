@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import argparse
+import asyncio
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from http import HTTPStatus
+from io import BytesIO
+import json
+import os
+from pathlib import Path
+import tempfile
+import time
+from typing import Any
+
+from create_angebot import (
+    generate_offer,
+    ls_document,
+    ls_file_name,
+    offer_document,
+    offer_file_names,
+    spec_from_job,
+)
+from docx_fill import normalize_values
+from docx_repro import build_datetime, save_document
+from ls_catalog import load_catalog, load_offer_presets
+from ls_store import STORE_PATH, CatalogStore
+
+
+DOCX_TYPE = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+DOCUMENT_KINDS = ("angebot", "kombi", "leistungsschein")
+MAX_HEADER = 16 * 1024
+MAX_BODY = 1024 * 1024
+# Latencies kept for the percentiles in /metrics.
+LATENCY_WINDOW = 1000
+
+# Per worker process: catalog, presets and (if used) the SQLite store, loaded once and kept warm.
+_WORKER: dict[str, Any] = {}
+
+
+def init_worker(db: str | None) -> None:
+    if db:
+        _WORKER["store"] = CatalogStore(Path(db))
+        _WORKER["catalog"] = _WORKER["store"].catalog().compact()
+    else:
+        _WORKER["catalog"] = load_catalog(compact=True)
+    _WORKER["presets"] = load_offer_presets()
+
+
+def worker_ready() -> int:
+    return os.getpid()
+
+
+def render_request(job: dict[str, Any]) -> tuple[str, bytes, float]:
+    # Runs in a pool worker. job is a batch job line (meta/scenario, modules/offer/search/query,
+    # values) plus "document" and, for a single Leistungsschein, "ls".
+    t0 = time.perf_counter()
+    kind = str(job.get("document") or "angebot")
+    if kind not in DOCUMENT_KINDS:
+        raise ValueError(f"Unbekannter Dokumenttyp: {kind} (erlaubt: {', '.join(DOCUMENT_KINDS)})")
+    when = build_datetime() if job.get("reproducible") else None
+    today = when.date().isoformat() if when else date.today().isoformat()
+    values = normalize_values(job["values"]) if isinstance(job.get("values"), dict) else {}
+    if isinstance(job.get("query"), dict) and "store" not in _WORKER:
+        _WORKER["store"] = CatalogStore(STORE_PATH)
+    catalog = _WORKER["catalog"]
+    spec = spec_from_job(job, catalog, _WORKER["presets"], job.get("resolve") is not False, _WORKER.get("store"))
+
+    if kind == "kombi":
+        # The combo document reuses the render cache, so repeated selections only assemble the annex.
+        with tempfile.TemporaryDirectory(prefix="ls-service-") as tmp:
+            result = generate_offer(spec, Path(tmp), today, values=values, when=when)
+            combo = Path(result["combo"])
+            return combo.name, combo.read_bytes(), time.perf_counter() - t0
+
+    if kind == "leistungsschein":
+        mid = str(job.get("ls") or "")
+        if not mid:
+            raise ValueError('Feld "ls" fehlt (LS-ID fuer document=leistungsschein)')
+        ls = next((ls for ls in spec["ls_list"] if ls["id"] == mid), None) or catalog.select([mid])[0]
+        doc = ls_document(spec["meta"], ls, values)
+        name = ls_file_name(ls, today)
+    else:
+        ls_files = {ls["id"]: ls_file_name(ls, today) for ls in spec["ls_list"]}
+        doc = offer_document(spec, ls_files, values)
+        name = offer_file_names(spec["meta"], today, values)[0]
+    buf = BytesIO()
+    save_document(doc, buf, when)
+    return name, buf.getvalue(), time.perf_counter() - t0
+
+
+class Saturated(Exception):
+    pass
+
+
+def percentiles(samples: deque[float]) -> dict[str, float]:
+    if not samples:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+    ordered = sorted(samples)
+
+    def ms(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 1)
+
+    return {"p50_ms": ms(0.50), "p95_ms": ms(0.95), "max_ms": ms(1.0)}
+
+
+class RenderService:
+    # At most `workers` renders run at once; up to `max_queue` further requests wait for a slot.
+    # Anything beyond that is rejected with 503 and Retry-After instead of piling up.
+
+    def __init__(self, workers: int, max_queue: int, db: str | None = None) -> None:
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pool = ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(db,))
+        self.slots = asyncio.Semaphore(workers)
+        self.waiting = 0
+        self.running = 0
+        self.started = time.time()
+        self.counts = {"ok": 0, "rejected": 0, "client_error": 0, "failed": 0}
+        self.queue_latency: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.render_latency: deque[float] = deque(maxlen=LATENCY_WINDOW)
+        self.total_latency: deque[float] = deque(maxlen=LATENCY_WINDOW)
+
+    async def warm_up(self) -> None:
+        # Starts every worker (and runs init_worker) before the first request arrives.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self.pool, worker_ready) for _ in range(self.workers)))
+
+    def close(self) -> None:
+        self.pool.shutdown(cancel_futures=True)
+
+    async def render(self, job: dict[str, Any]) -> tuple[str, bytes, float, float]:
+        if self.running >= self.workers and self.waiting >= self.max_queue:
+            raise Saturated()
+        t0 = time.perf_counter()
+        self.waiting += 1
+        try:
+            await self.slots.acquire()
+        finally:
+            self.waiting -= 1
+        queued = time.perf_counter() - t0
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            name, blob, rendered = await loop.run_in_executor(self.pool, render_request, job)
+        finally:
+            self.running -= 1
+            self.slots.release()
+        self.queue_latency.append(queued)
+        self.render_latency.append(rendered)
+        self.total_latency.append(time.perf_counter() - t0)
+        return name, blob, queued, rendered
+
+    def metrics(self) -> dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "running": self.running,
+            "queue_depth": self.waiting,
+            "max_queue": self.max_queue,
+            "uptime_s": round(time.time() - self.started, 1),
+            "requests": dict(self.counts),
+            "latency": {
+                "queue": percentiles(self.queue_latency),
+                "render": percentiles(self.render_latency),
+                "total": percentiles(self.total_latency),
+            },
+        }
+
+    async def dispatch(self, method: str, target: str, body: bytes) -> tuple[int, dict[str, str], bytes]:
+        path = target.split("?", 1)[0]
+        if path == "/health" and method == "GET":
+            return json_response(HTTPStatus.OK, {"status": "ok"})
+        if path == "/metrics" and method == "GET":
+            return json_response(HTTPStatus.OK, self.metrics())
+        if path != "/render":
+            return json_response(HTTPStatus.NOT_FOUND, {"error": f"Unbekannter Pfad: {path}"})
+        if method != "POST":
+            return json_response(HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Nur POST erlaubt"})
+        try:
+            job = json.loads(body or b"{}")
+        except (json.JSONDecodeError, UnicodeDecodeError) as exc:
+            self.counts["client_error"] += 1
+            return json_response(HTTPStatus.BAD_REQUEST, {"error": f"Ungueltiges JSON: {exc}"})
+        if not isinstance(job, dict):
+            self.counts["client_error"] += 1
+            return json_response(HTTPStatus.BAD_REQUEST, {"error": "Erwartet wird ein JSON-Objekt"})
+        try:
+            name, blob, queued, rendered = await self.render(job)
+        except Saturated:
+            self.counts["rejected"] += 1
+            status, headers, payload = json_response(
+                HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Ausgelastet", "queue_depth": self.waiting}
+            )
+            headers["Retry-After"] = "1"
+            return status, headers, payload
+        except ValueError as exc:
+            self.counts["client_error"] += 1
+            return json_response(HTTPStatus.BAD_REQUEST, {"error": str(exc)})
+        except Exception as exc:  # a failed render must not take the service down
+            self.counts["failed"] += 1
+            return json_response(HTTPStatus.INTERNAL_SERVER_ERROR, {"error": f"{type(exc).__name__}: {exc}"})
+        self.counts["ok"] += 1
+        return (
+            HTTPStatus.OK,
+            {
+                "Content-Type": DOCX_TYPE,
+                "Content-Disposition": f'attachment; filename="{name}"',
+                "X-Queue-Ms": f"{queued * 1000:.1f}",
+                "X-Render-Ms": f"{rendered * 1000:.1f}",
+                "X-Queue-Depth": str(self.waiting),
+            },
+            blob,
+        )
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        # Minimal HTTP/1.1: Content-Length bodies, keep-alive unless the client asks to close.
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await write_response(writer, *json_response(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, {}), False)
+                    break
+                request_line, *header_lines = head.decode("latin-1").rstrip("\r\n").split("\r\n")
+                parts = request_line.split(" ")
+                headers = {}
+                for line in header_lines:
+                    key, _, value = line.partition(":")
+                    headers[key.strip().lower()] = value.strip()
+                try:
+                    method, target, version = parts
+                    length = content_length(headers.get("content-length"))
+                except ValueError:
+                    await write_response(writer, *json_response(HTTPStatus.BAD_REQUEST, {}), False)
+                    break
+                if length > MAX_BODY:
+                    await write_response(writer, *json_response(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {}), False)
+                    break
+                try:
+                    body = await reader.readexactly(length) if length else b""
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                status, extra, payload = await self.dispatch(method, target, body)
+                await write_response(writer, status, extra, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def content_length(value: str | None) -> int:
+    # Plain ASCII digits only: int() would also take "-1", "+5" or "1_000", and readexactly(-1) raises.
+    if value is None:
+        return 0
+    if not (value.isascii() and value.isdigit()):
+        raise ValueError(f"invalid Content-Length: {value!r}")
+    return int(value)
+
+
+def json_response(status: int, data: dict[str, Any]) -> tuple[int, dict[str, str], bytes]:
+    return status, {"Content-Type": "application/json; charset=utf-8"}, json.dumps(data, ensure_ascii=False).encode()
+
+
+async def write_response(
+    writer: asyncio.StreamWriter, status: int, headers: dict[str, str], payload: bytes, keep_alive: bool
+) -> None:
+    lines = [f"HTTP/1.1 {status} {HTTPStatus(status).phrase}", f"Content-Length: {len(payload)}"]
+    lines += [f"{key}: {value}" for key, value in headers.items()]
+    lines.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+    await writer.drain()
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Lokaler HTTP-Dienst: Angebotsspezifikation (JSON) -> DOCX.")
+    parser.add_argument("--host", default="127.0.0.1", help="Adresse (Default 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8765, help="Port (Default 8765).")
+    parser.add_argument(
+        "--workers", type=int, default=0, help="Render-Prozesse (0 = alle CPU-Kerne, Default 0)."
+    )
+    parser.add_argument(
+        "--max-queue", type=int, default=16, help="Wartende Anfragen, bevor mit 503 abgelehnt wird (Default 16)."
+    )
+    parser.add_argument("--db", nargs="?", const=str(STORE_PATH), help="Katalog aus der SQLite-Ablage laden.")
+    return parser.parse_args(argv)
+
+
+async def serve(args: argparse.Namespace) -> None:
+    service = RenderService(args.workers or os.cpu_count() or 1, args.max_queue, args.db)
+    try:
+        t0 = time.perf_counter()
+        await service.warm_up()
+        server = await asyncio.start_server(service.handle, args.host, args.port, limit=MAX_HEADER)
+        print(
+            f"Render-Service auf http://{args.host}:{args.port} ({service.workers} Worker, "
+            f"Warteschlange {service.max_queue}, bereit nach {time.perf_counter() - t0:.2f} s)",
+            flush=True,
+        )
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv: list[str] | None = None) -> None:
+    try:
+        asyncio.run(serve(parse_args(argv)))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+import argparse
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+import io
+import json
+import os
+from pathlib import Path
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_ROOT))
+
+DEFAULT_SIZES = "10,100,1000,full"
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux and bytes on macOS.
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+
+def measure(phases: list[dict[str, Any]], name: str, fn: Callable[[], int | None]) -> None:
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    output_bytes = fn()
+    phases.append(
+        {
+            "phase": name,
+            "wall_s": round(time.perf_counter() - wall, 4),
+            "cpu_s": round(time.process_time() - cpu, 4),
+            # High-water mark of the case process at the end of the phase.
+            "peak_rss_mb": peak_rss_mb(),
+            "output_bytes": output_bytes,
+        }
+    )
+
+
+def synthetic_modules(count: int) -> list[dict[str, Any]]:
+    modules = []
+    for i in range(count):
+        mid = f"LS-S{i:05d}"
+        modules.append(
+            {
+                "id": mid,
+                "titel": f"Synthetischer Baustein {i}",
+                "typ": "Optional" if i % 7 == 0 else "Pflicht",
+                "pt": 1 + i % 9,
+                "preis": f"<<Preis {mid} in EUR>>",
+                "kurz": f"Kurzbeschreibung fuer Baustein {i} mit typischer Laenge fuer die Uebersicht.",
+                "einleitung": "Dieser Leistungsschein beschreibt einen abgegrenzten Teilleistungsumfang. " * 4,
+                "leistungen": [f"Leistung {j} fuer Baustein {i} im abgestimmten Scope umsetzen." for j in range(6)],
+                "annahmen": [f"Annahme {j}: Zugaenge und Ansprechpartner stehen bereit." for j in range(4)],
+                "einschraenkungen": [f"Einschraenkung {j}: Aenderungen nur ueber Change Request." for j in range(3)],
+                "liefergegenstaende": [f"Liefergegenstand {j} fuer Baustein {i}." for j in range(5)],
+                "out_of_scope": [f"Nicht enthalten {j}: Betrieb ausserhalb Hypercare." for j in range(3)],
+                "aufwand_abrechnung": f"{1 + i % 9} PT, Abrechnung gemaess <<Festpreis / T&M>>.",
+                "abnahme": "Alle Deliverables sind uebergeben und abgenommen.",
+                "domain": f"domain-{i % 12:02d}",
+                "theme": f"theme-{i % 5}",
+            }
+        )
+    return modules
+
+
+def select_modules(source: str, size: str) -> list[dict[str, Any]]:
+    from ls_catalog import load_catalog
+
+    if source == "synthetic":
+        count = len(load_catalog().modules) if size == "full" else int(size)
+        return synthetic_modules(count)
+    modules = load_catalog().modules
+    return modules if size == "full" else modules[: int(size)]
+
+
+def run_case(source: str, size: str) -> dict[str, Any]:
+    phases: list[dict[str, Any]] = []
+    holder: dict[str, Any] = {}
+
+    def load_modules() -> None:
+        import create_angebot  # noqa: F401  (import cost is part of this phase)
+
+        holder["modules"] = select_modules(source, size)
+
+    measure(phases, "load", load_modules)
+
+    import create_angebot as ca
+
+    modules = holder["modules"]
+    spec = ca.default_spec()
+    spec["ls_list"] = modules
+    spec["phases"] = ca.phases_from_modules(modules)
+    meta = spec["meta"]
+    ls_files = {ls["id"]: f"{ls['id']}.docx" for ls in modules}
+
+    def build_offer() -> None:
+        doc = ca.new_document(meta["projektname"], meta["version"])
+        ca.build_offer(
+            doc, meta, spec["scenario"], spec["phases"], spec["milestones"], spec["risks"], modules, ls_files
+        )
+        holder["offer"] = doc
+
+    def save_offer() -> int:
+        buf = io.BytesIO()
+        holder.pop("offer").save(buf)
+        return len(buf.getvalue())
+
+    def build_ls() -> None:
+        for ls in modules:
+            doc = ca.new_document(meta["projektname"], meta["version"])
+            ca.build_ls(doc, meta, ls, with_title=True)
+
+    measure(phases, "build_offer", build_offer)
+    measure(phases, "save_offer", save_offer)
+    measure(phases, "build_ls", build_ls)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        out = Path(tmp)
+
+        def generate_offer() -> int:
+            ca.generate_offer(spec, out, "bench", cache=False)
+            return dir_size(out)
+
+        measure(phases, "generate_offer", generate_offer)
+
+    return {"case": f"{source}-{size}", "source": source, "size": size, "modules": len(modules), "phases": phases}
+
+
+def run_leistungsschein_case() -> dict[str, Any]:
+    phases: list[dict[str, Any]] = []
+    holder: dict[str, Any] = {}
+
+    def load() -> None:
+        import create_leistungsschein
+
+        holder["module"] = create_leistungsschein
+
+    measure(phases, "load", load)
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            def generate() -> int:
+                with redirect_stdout(io.StringIO()):
+                    holder["module"].main([])
+                return dir_size(Path(tmp))
+
+            measure(phases, "main", generate)
+        finally:
+            os.chdir(cwd)
+    return {"case": "leistungsschein", "source": "default", "size": "1", "modules": 1, "phases": phases}
+
+
+def run_isolated(source: str, size: str) -> dict[str, Any]:
+    # Every case runs in a fresh interpreter so import cost and peak RSS are not shared.
+    cmd = [sys.executable, __file__, "--case", source, size]
+    proc = subprocess.run(cmd, capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout)
+
+
+def git_revision() -> str:
+    try:
+        proc = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_ROOT, capture_output=True, text=True, check=True
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+    return proc.stdout.strip()
+
+
+def compare(results: dict[str, Any], baseline_path: Path, max_regression: float) -> int:
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = json.load(fh)
+    base = {
+        (case["case"], phase["phase"]): phase["wall_s"]
+        for case in baseline.get("results", [])
+        for phase in case["phases"]
+    }
+    regressions = 0
+    print(f"\nVergleich mit {baseline_path} (Grenze +{max_regression:.0%}):")
+    for case in results["results"]:
+        for phase in case["phases"]:
+            before = base.get((case["case"], phase["phase"]))
+            if not before:
+                continue
+            ratio = phase["wall_s"] / before
+            flag = ""
+            if ratio > 1 + max_regression and phase["wall_s"] - before > 0.05:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"- {case['case']:<18} {phase['phase']:<15} {before:8.3f}s -> {phase['wall_s']:8.3f}s ({ratio:5.2f}x){flag}")
+    return 1 if regressions else 0
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Skalierungs-Benchmark fuer create_angebot/create_leistungsschein.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help=f"Auswahlgroessen (Default {DEFAULT_SIZES}).")
+    parser.add_argument("--sources", default="real,synthetic", help="Modulquellen: real, synthetic.")
+    parser.add_argument("--out", default="bench-results.json", help="Ergebnisdatei (JSON).")
+    parser.add_argument("--compare", help="Frueheres Ergebnis-JSON fuer den Regressionsvergleich.")
+    parser.add_argument(
+        "--max-regression", type=float, default=0.2, help="Erlaubte Verlangsamung je Phase (Default 0.2 = 20 %%)."
+    )
+    parser.add_argument("--case", nargs=2, metavar=("SOURCE", "SIZE"), help=argparse.SUPPRESS)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    if args.case:
+        source, size = args.case
+        result = run_leistungsschein_case() if source == "leistungsschein" else run_case(source, size)
+        print(json.dumps(result))
+        return
+
+    cases = [("leistungsschein", "1")]
+    for source in [s.strip() for s in args.sources.split(",") if s.strip()]:
+        for size in [s.strip() for s in args.sizes.split(",") if s.strip()]:
+            cases.append((source, size))
+
+    results = []
+    for source, size in cases:
+        result = run_isolated(source, size)
+        results.append(result)
+        total = sum(phase["wall_s"] for phase in result["phases"])
+        print(f"- {result['case']:<18} {result['modules']:>5} Module  {total:8.2f}s")
+        for phase in result["phases"]:
+            size_info = f"  {phase['output_bytes'] / 1024:9.1f} KiB" if phase["output_bytes"] else ""
+            print(
+                f"    {phase['phase']:<15} wall {phase['wall_s']:8.3f}s  cpu {phase['cpu_s']:8.3f}s"
+                f"  rss {phase['peak_rss_mb']} MB{size_info}"
+            )
+
+    report = {
+        "meta": {
+            "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as fh:
+        json.dump(report, fh, indent=2)
+    print(f"\nErgebnis: {args.out}")
+
+    if args.compare:
+        raise SystemExit(compare(report, Path(args.compare), args.max_regression))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+
+# Paths that never build a document and therefore must not load python-docx or lxml.
+CASES = {
+    "import_angebot": ["-c", "import create_angebot"],
+    "import_leistungsschein": ["-c", "import create_leistungsschein"],
+    "dry_run": [str(APP_ROOT / "create_angebot.py"), "--dry-run"],
+    "preview_angebot": [str(APP_ROOT / "create_angebot.py"), "--preview", "html"],
+    "preview_leistungsschein": [str(APP_ROOT / "create_leistungsschein.py"), "--preview", "html"],
+}
+HEAVY = ("docx", "lxml")
+DEFAULT_BUDGET_MS = 250.0
+IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$")
+
+
+def parse_importtime(stderr: str) -> list[dict[str, Any]]:
+    imports = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            imports.append(
+                {"module": name, "self_us": int(self_us), "cumulative_us": int(cumulative_us), "depth": len(indent) // 2}
+            )
+    return imports
+
+
+def run_case(args: list[str], cwd: Path) -> dict[str, Any]:
+    # A fresh interpreter per run, so nothing is cached in sys.modules.
+    t0 = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", *args], cwd=cwd, capture_output=True, text=True, check=True
+    )
+    wall_ms = (time.perf_counter() - t0) * 1000
+    return {"wall_ms": round(wall_ms, 1), "imports": parse_importtime(proc.stderr)}
+
+
+def heavy_imports(imports: list[dict[str, Any]]) -> list[str]:
+    return sorted({i["module"] for i in imports if i["module"].split(".")[0] in HEAVY})
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Startzeit-Benchmark: Importe, --dry-run und --preview ohne python-docx/lxml "
+        "(python -X importtime)."
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="Laeufe je Fall, gewertet wird der schnellste (Default 5).")
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=DEFAULT_BUDGET_MS,
+        help=f"Obergrenze je Fall in ms, inkl. Interpreterstart (Default {DEFAULT_BUDGET_MS:g}).",
+    )
+    parser.add_argument("--top", type=int, default=8, help="Anzahl der teuersten Importe je Fall (Default 8).")
+    parser.add_argument("--out", help="Ergebnisdatei (JSON).")
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    failures = 0
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        scratch = Path(tmp)
+        # Imports resolve against APP_ROOT; the script cases run in a scratch directory.
+        for name, case_args in CASES.items():
+            cwd = APP_ROOT if case_args[0] == "-c" else scratch
+            runs = [run_case(case_args, cwd) for _ in range(max(args.repeat, 1))]
+            best = min(runs, key=lambda run: run["wall_ms"])
+            heavy = heavy_imports(best["imports"])
+            top = sorted(best["imports"], key=lambda i: i["cumulative_us"], reverse=True)[: args.top]
+            over = best["wall_ms"] > args.budget_ms
+            status = "OK"
+            if heavy or over:
+                status = "FEHLER"
+                failures += 1
+            print(f"- {name:<24} {best['wall_ms']:7.1f} ms  (Budget {args.budget_ms:g} ms)  {status}")
+            if heavy:
+                print(f"    python-docx/lxml geladen: {', '.join(heavy)}")
+            for i in top:
+                print(f"    {i['cumulative_us'] / 1000:7.1f} ms  {'  ' * i['depth']}{i['module']}")
+            results.append(
+                {
+                    "case": name,
+                    "wall_ms": best["wall_ms"],
+                    "runs_ms": [run["wall_ms"] for run in runs],
+                    "heavy_imports": heavy,
+                    "top_imports": top,
+                }
+            )
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as fh:
+            json.dump({"budget_ms": args.budget_ms, "results": results}, fh, indent=2)
+        print(f"\nErgebnis: {args.out}")
+    if failures:
+        print(f"\n{failures} Fall/Faelle ueber Budget oder mit python-docx/lxml.", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
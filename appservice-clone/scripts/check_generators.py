@@ -0,0 +1,286 @@
+from __future__ import annotations
+
+import argparse
+from datetime import date
+import os
+from pathlib import Path
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_ROOT))
+
+# End-to-end checks for the Python generators: each check runs the real command lines in a scratch
+# directory (fresh interpreters, like a user would) and fails on the first broken expectation.
+
+
+class CheckError(Exception):
+    pass
+
+
+def expect(condition: bool, message: str) -> None:
+    if not condition:
+        raise CheckError(message)
+
+
+def run(script: str, *args: str, cwd: Path) -> str:
+    proc = subprocess.run([sys.executable, str(APP_ROOT / script), *args], cwd=cwd, capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise CheckError(f"{script} {' '.join(args)}: Exit-Code {proc.returncode}\n{proc.stderr.strip()}")
+    return proc.stdout
+
+
+def docx_files(root: Path) -> dict[str, bytes]:
+    return {str(p.relative_to(root)): p.read_bytes() for p in sorted(root.rglob("*.docx"))}
+
+
+def check_offer(tmp: Path) -> None:
+    out = tmp / "angebot"
+    run("create_angebot.py", "--out-dir", str(out), "--no-cache", cwd=tmp)
+    files = docx_files(out)
+    expect(len(files) == 12, f"12 DOCX erwartet (Angebot, Kombi, 10 LS), gefunden: {len(files)}")
+
+
+def check_reproducible(tmp: Path) -> None:
+    # Same bytes for repeated runs and with/without --stream.
+    outputs = []
+    for name, extra in (("a", ()), ("b", ()), ("stream", ("--stream",))):
+        out = tmp / f"repro-{name}"
+        args = ("--modules", "LS-1005", "--reproducible", "--no-cache", "--out-dir", str(out), *extra)
+        run("create_angebot.py", *args, cwd=tmp)
+        outputs.append(docx_files(out))
+    expect(outputs[0] == outputs[1], "--reproducible: zwei Laeufe unterscheiden sich")
+    expect(outputs[0] == outputs[2], "--reproducible: --stream weicht vom normalen Kombidokument ab")
+
+
+def check_render_cache(tmp: Path) -> None:
+    from render_cache import entry_path, load_entry, prune, store_entry
+
+    root = tmp / "cache"
+    source = tmp / "source.docx"
+    source.write_bytes(b"x" * 400 * 1024)
+    entries = [entry_path(f"{i:02d}" * 32, root) for i in range(3)]
+    for age, entry in zip((300, 200, 100), entries):
+        store_entry(entry, source, [b"<w:p/>"])
+        os.utime(entry.with_suffix(".xml"), (time.time() - age,) * 2)
+    stale = entries[0].with_name(entries[0].name + ".docx.123.tmp")
+    stale.write_bytes(b"")
+    os.utime(stale, (time.time() - 7200,) * 2)
+    # A hit makes the oldest entry the most recently used one.
+    expect(load_entry(entries[0], tmp / "hit.docx") == b"<w:p/>", "Render-Cache: Eintrag nicht geladen")
+    removed, remaining = prune(root, max_mb=1)
+    expect(removed == 1 and remaining <= 1024 * 1024, f"Render-Cache: {removed} Eintraege entfernt, erwartet 1")
+    expect(load_entry(entries[1], tmp / "gone.docx") is None, "Render-Cache: nicht den aeltesten Eintrag entfernt")
+    expect(load_entry(entries[0], tmp / "kept.docx") is not None, "Render-Cache: genutzten Eintrag entfernt")
+    expect(not stale.exists(), "Render-Cache: verwaiste Temp-Datei nicht entfernt")
+    expect(prune(root, max_mb=0) == (2, 0), "Render-Cache: nicht vollstaendig geleert")
+
+
+def check_dry_run(tmp: Path) -> None:
+    out = tmp / "dry"
+    text = run("create_angebot.py", "--modules", "LS-1005", "--dry-run", "--out-dir", str(out), cwd=tmp)
+    expect(not out.exists(), "--dry-run hat Dateien geschrieben")
+    expect("Review-Liste" in text and "<<Kundenname>>" in text, "--dry-run ohne Review-Liste")
+
+
+def check_preview(tmp: Path) -> None:
+    html = run("create_angebot.py", "--modules", "LS-1005", "--preview", "html", cwd=tmp)
+    expect("<mark>&lt;&lt;Kundenname&gt;&gt;</mark>" in html, "HTML-Vorschau: Platzhalter nicht markiert")
+    markdown = run("create_angebot.py", "--modules", "LS-1005", "--preview", "markdown", cwd=tmp)
+    # Unescaped <<...>> would be parsed as HTML tags and disappear when rendered.
+    expect("<<" not in markdown, "Markdown-Vorschau: Platzhalter nicht maskiert")
+    expect("&lt;&lt;Kundenname&gt;&gt;" in markdown, "Markdown-Vorschau: Platzhalter fehlt")
+    ls = run("create_leistungsschein.py", "--preview", "markdown", cwd=tmp)
+    expect("&lt;&lt;Projektname&gt;&gt;" in ls, "Leistungsschein-Vorschau: Platzhalter fehlt")
+
+
+def check_leistungsschein(tmp: Path) -> None:
+    out = tmp / "ls"
+    out.mkdir()
+    run("create_leistungsschein.py", cwd=out)
+    expect(len(docx_files(out)) == 1, "create_leistungsschein.py: kein DOCX erzeugt")
+
+
+def check_estimate(tmp: Path) -> None:
+    from ls_catalog import load_catalog
+    from ls_estimate import estimate_effort
+
+    modules = load_catalog().modules[:200]
+    for samples in (20_000, 0):  # Monte-Carlo (with numpy) and the normal approximation
+        estimate = estimate_effort(modules, samples)
+        for band in (*estimate.phases, estimate.total):
+            expect(band.p50 <= band.p80 <= band.p95, f"{estimate.method}: Band {band.label} nicht monoton")
+        expect(estimate.total.modules == len(modules), f"{estimate.method}: Modulanzahl falsch")
+        expect(sum(b.modules for b in estimate.phases) == len(modules), f"{estimate.method}: Phasen unvollstaendig")
+
+    # Default offer: the bands follow the phase rows (their "ls" column), so every row gets one.
+    preview = run("create_angebot.py", "--confidence", "--preview", "markdown", cwd=tmp)
+    table = preview.split("Vorgehensmodell", 1)[1].split("Leistungsuebersicht", 1)[0]
+    rows = [line for line in table.splitlines() if line.startswith("| ")]
+    expect(bool(rows) and "Aufwand" in rows[0], "Aufwandsschaetzung: Phasenuebersicht ohne Spalte Aufwand")
+    expect(len(rows) == 9 and all("P50" in row for row in rows[1:]), "Aufwandsschaetzung: Phase ohne Band")
+
+
+def check_search(tmp: Path) -> None:
+    from ls_catalog import load_catalog
+
+    index = load_catalog().search_index
+
+    def ids(query: str) -> set[str]:
+        return {hit.id for hit in index.search(query, None)}
+
+    # Indexed terms are stemmed ("Migrationen" -> "migration"), so a prefix has to be stemmed as well:
+    # "word*" finds at least everything "word" finds.
+    for word in ("migrationen", "dateien", "freigaben", "konzepte", "migration"):
+        expect(bool(ids(word)), f"Suche: {word} ohne Treffer")
+        expect(ids(word) <= ids(f"{word}*"), f"Suche: {word}* findet weniger als {word}")
+    expect(ids("migrationen") <= ids("migr*"), "Suche: migr* findet nicht alle Migrationen")
+
+
+def check_schedule(tmp: Path) -> None:
+    from ls_catalog import load_catalog
+    from ls_schedule import WEEK, schedule_modules
+
+    modules = load_catalog().modules[:400]
+    staff = (2, 3, 5)
+    schedule = schedule_modules(modules, staff, date(2026, 12, 21), [date(2026, 12, 24), date(2026, 12, 25)])
+    by_id = {t.id: t for t in schedule.tasks}
+    expect(len(by_id) == len(modules), "Zeitplan: nicht alle Module eingeplant")
+    for t in schedule.tasks:
+        for req in t.requires:
+            expect(by_id[req].finish <= t.start, f"Zeitplan: {t.id} startet vor Ende von {req}")
+    for day in range(schedule.days):
+        busy = sum(1 for t in schedule.tasks if t.start <= day < t.finish)
+        expect(busy <= staff[min(day // WEEK, len(staff) - 1)], f"Zeitplan: Kapazitaet an Tag {day} ueberschritten")
+    expect(schedule.days >= schedule.cpm_days, "Zeitplan: kuerzer als der kritische Pfad")
+    expect(date(2026, 12, 24) not in {schedule.start_date(t) for t in schedule.tasks}, "Zeitplan: Start an Feiertag")
+
+    # Default offer: every phase gets a window, every milestone a date, in phase order.
+    preview = run("create_angebot.py", "--schedule", "--start", "2026-11-02", "--preview", "markdown", cwd=tmp)
+    table = preview.split("Vorgehensmodell", 1)[1].split("Leistungsuebersicht", 1)[0]
+    rows = [line for line in table.splitlines() if line.startswith("| ") and "Zeitraum" not in line]
+    windows = [row.rstrip(" |").rsplit("| ", 1)[-1] for row in rows]
+    expect(len(windows) == 8 and all(" - " in w for w in windows), "Zeitplan: Phase ohne Zeitraum")
+    expect(windows == sorted(windows), "Zeitplan: Phasen nicht in Reihenfolge")
+    milestones = preview.split("Meilensteine", 1)[1].split("Mitwirkungspflichten", 1)[0]
+    expect("YYYY-MM-DD" not in milestones, "Zeitplan: Meilenstein ohne Termin")
+    expect("Zielkonzept freigegeben" in milestones and "Cutover" in milestones, "Zeitplan: Meilensteine ersetzt")
+
+
+def check_daemon(tmp: Path) -> None:
+    sock = tmp / "daemon.sock"
+    server = subprocess.Popen(
+        [sys.executable, str(APP_ROOT / "ls_daemon.py"), "--socket", str(sock), "serve"],
+        cwd=tmp,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while not sock.exists():
+            expect(server.poll() is None and time.monotonic() < deadline, "Daemon startet nicht")
+            time.sleep(0.1)
+        work = tmp / "daemon-out"
+        work.mkdir()
+        report = run("ls_daemon.py", "--socket", str(sock), "angebot", "--modules", "LS-1005", "--dry-run", cwd=work)
+        expect("Review-Liste" in report and not docx_files(work), "Daemon: --dry-run hat Dateien geschrieben")
+        proc = subprocess.run(
+            [sys.executable, str(APP_ROOT / "ls_daemon.py"), "--socket", str(sock), "angebot", "--profile"],
+            cwd=work,
+            capture_output=True,
+            text=True,
+        )
+        expect(proc.returncode == 1 and "--profile" in proc.stderr, "Daemon: --profile nicht abgelehnt")
+        paths = run("ls_daemon.py", "--socket", str(sock), "angebot", "--modules", "LS-1005", "--no-resolve", cwd=work)
+        expect(len(paths.split()) == 3, "Daemon: Angebot nicht erzeugt")
+    finally:
+        if sock.exists():
+            run("ls_daemon.py", "--socket", str(sock), "stop", cwd=tmp)
+        server.wait(timeout=30)
+
+
+def check_render_service(tmp: Path) -> None:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = subprocess.Popen(
+        [sys.executable, str(APP_ROOT / "render_service.py"), "--port", str(port), "--workers", "1"],
+        cwd=tmp,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+    def status(length: str) -> str:
+        with socket.create_connection(("127.0.0.1", port), timeout=10) as conn:
+            conn.sendall(f"POST /render HTTP/1.1\r\nContent-Length: {length}\r\n\r\n{{}}".encode())
+            # "" when the service drops the connection without an answer.
+            return (conn.recv(64).decode("latin-1").split(" ", 2) + ["", ""])[1]
+
+    try:
+        deadline = time.monotonic() + 60
+        while True:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=1).close()
+                break
+            except OSError:
+                expect(server.poll() is None and time.monotonic() < deadline, "Render-Service startet nicht")
+                time.sleep(0.1)
+        for length in ("-1", "abc", "+2", "1_0", ""):
+            expect(status(length) == "400", f"Render-Service: Content-Length {length!r} nicht abgelehnt")
+        expect(status(str(2 * 1024 * 1024)) == "413", "Render-Service: zu grosser Rumpf nicht abgelehnt")
+    finally:
+        # Ctrl+C, so the service shuts its worker pool down instead of orphaning it.
+        server.send_signal(signal.SIGINT)
+        server.wait(timeout=30)
+
+
+CHECKS: dict[str, Callable[[Path], None]] = {
+    "angebot": check_offer,
+    "reproducible": check_reproducible,
+    "render_cache": check_render_cache,
+    "dry_run": check_dry_run,
+    "preview": check_preview,
+    "leistungsschein": check_leistungsschein,
+    "search": check_search,
+    "estimate": check_estimate,
+    "schedule": check_schedule,
+    "daemon": check_daemon,
+    "render_service": check_render_service,
+}
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="End-to-End-Pruefung der Python-Generatoren (Temp-Verzeichnis).")
+    parser.add_argument("checks", nargs="*", help=f"Nur diese Pruefungen (Default alle: {', '.join(CHECKS)}).")
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.checks if name not in CHECKS]
+    if unknown:
+        parser.error(f"Unbekannte Pruefung: {', '.join(unknown)}")
+    return args
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = parse_args(argv)
+    failures = 0
+    for name in args.checks or CHECKS:
+        t0 = time.perf_counter()
+        with tempfile.TemporaryDirectory() as tmp:
+            try:
+                CHECKS[name](Path(tmp))
+            except CheckError as exc:
+                failures += 1
+                print(f"- {name:<16} FEHLER: {exc}")
+                continue
+        print(f"- {name:<16} OK ({time.perf_counter() - t0:.1f} s)")
+    if failures:
+        print(f"\n{failures} Pruefung(en) fehlgeschlagen.", file=sys.stderr)
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
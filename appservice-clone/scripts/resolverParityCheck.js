@@ -0,0 +1,143 @@
+const { spawnSync } = require("child_process");
+const path = require("path");
+const { resolveSelection } = require("../lib/resolveSelection");
+const { getModules, getOffers } = require("../lib/dataLoader");
+
+const appRoot = path.join(__dirname, "..");
+const python = process.env.PYTHON || "python3";
+
+function presetIds(offer) {
+  if (Array.isArray(offer.module_ids) && offer.module_ids.length > 0) {
+    return offer.module_ids;
+  }
+  return Array.isArray(offer.defaultSelected) ? offer.defaultSelected : [];
+}
+
+function buildCases(modules, offers) {
+  // Every shipped preset in both priority orders, plus all modules with excludes/option_group
+  // selected together, so the rank-based conflict rules are exercised as well.
+  const cases = {};
+  offers.forEach((offer) => {
+    // Same de-duplication as /api/generate.
+    const ids = Array.from(new Set(presetIds(offer).map((id) => String(id))));
+    if (ids.length === 0) {
+      return;
+    }
+    cases[offer.id] = ids;
+    cases[`${offer.id} (umgekehrt)`] = ids.slice().reverse();
+  });
+  const conflicting = modules
+    .filter((module) => module.option_group || (module.dependencies?.excludes || []).length > 0)
+    .map((module) => module.id);
+  if (conflicting.length > 0) {
+    cases["excludes/option_group"] = conflicting;
+    cases["excludes/option_group (umgekehrt)"] = conflicting.slice().reverse();
+  }
+  return cases;
+}
+
+function resolvePython(cases) {
+  const proc = spawnSync(python, ["ls_resolver.py", "--selections", "-", "--json"], {
+    cwd: appRoot,
+    input: JSON.stringify(cases),
+    encoding: "utf8",
+    maxBuffer: 64 * 1024 * 1024,
+  });
+  if (proc.error) {
+    throw new Error(`${python} nicht ausfuehrbar: ${proc.error.message}`);
+  }
+  if (proc.status !== 0) {
+    throw new Error(`ls_resolver.py fehlgeschlagen: ${proc.stderr.trim()}`);
+  }
+  return JSON.parse(proc.stdout);
+}
+
+function sameList(a, b) {
+  return a.length === b.length && a.every((value, index) => value === b[index]);
+}
+
+function sorted(values) {
+  return Array.from(values).sort();
+}
+
+function compareCase(name, input, jsIds, py, moduleById) {
+  // resolveSelection() only returns the resolved ids; added and dropped modules are derived from them.
+  const errors = [];
+  if (!sameList(jsIds, py.ids)) {
+    errors.push(`ids: JS [${jsIds.join(", ")}] / Python [${py.ids.join(", ")}]`);
+  }
+
+  const inputSet = new Set(input.filter((id) => moduleById.has(id)));
+  const resolved = new Set(jsIds);
+  const jsAdded = sorted(jsIds.filter((id) => !inputSet.has(id)));
+  const pyAdded = sorted(py.added.filter((id) => py.ids.includes(id)));
+  if (!sameList(jsAdded, pyAdded)) {
+    errors.push(`added: JS [${jsAdded.join(", ")}] / Python [${pyAdded.join(", ")}]`);
+  }
+
+  const jsDropped = sorted(Array.from(inputSet).filter((id) => !resolved.has(id)));
+  const pyDropped = sorted(
+    new Set(
+      py.conflicts
+        .filter((conflict) => conflict.kind === "excludes" || conflict.kind === "option_group")
+        .map((conflict) => conflict.dropped)
+        .filter((id) => inputSet.has(id))
+    )
+  );
+  if (!sameList(jsDropped, pyDropped)) {
+    errors.push(`conflicts: JS entfernt [${jsDropped.join(", ")}] / Python [${pyDropped.join(", ")}]`);
+  }
+
+  // ordered: the same modules, every required module before the module requiring it
+  // (unless Python reports a cycle).
+  if (!sameList(sorted(py.ordered), sorted(py.ids))) {
+    errors.push("ordered: andere Module als ids");
+  }
+  if (!py.conflicts.some((conflict) => conflict.kind === "cycle")) {
+    const position = new Map(py.ordered.map((id, index) => [id, index]));
+    py.ordered.forEach((id) => {
+      const requires = moduleById.get(id)?.dependencies?.requires || [];
+      requires.forEach((requiredId) => {
+        if (position.has(requiredId) && position.get(requiredId) > position.get(id)) {
+          errors.push(`ordered: ${requiredId} steht nach ${id}`);
+        }
+      });
+    });
+  }
+  return errors.map((error) => `${name}: ${error}`);
+}
+
+function main() {
+  const { modules } = getModules();
+  const offers = getOffers();
+  const moduleById = new Map(modules.map((module) => [module.id, module]));
+  const cases = buildCases(modules, offers);
+  const names = Object.keys(cases);
+  if (names.length === 0) {
+    throw new Error("Keine Angebotsvorlagen gefunden.");
+  }
+
+  const pyResults = resolvePython(cases);
+  const errors = [];
+  names.forEach((name) => {
+    const jsIds = resolveSelection(cases[name], moduleById);
+    if (!pyResults[name]) {
+      errors.push(`${name}: fehlt im Python-Ergebnis`);
+      return;
+    }
+    errors.push(...compareCase(name, cases[name], jsIds, pyResults[name], moduleById));
+  });
+
+  if (errors.length > 0) {
+    errors.slice(0, 20).forEach((error) => console.error(`- ${error}`));
+    throw new Error(`${errors.length} Abweichung(en) in ${names.length} Auswahlen.`);
+  }
+  console.log(`RESOLVER_PARITY_OK cases=${names.length} modules=${modules.length}`);
+}
+
+try {
+  main();
+} catch (error) {
+  console.error(`RESOLVER_PARITY_FAIL ${error.message}`);
+  process.exit(1);
+}
@@ -2,6 +2,7 @@ const express = require("express");
 const path = require("path");
 const { buildOfferDocx } = require("./offerDocx");
 const { getModules, getOffers } = require("./lib/dataLoader");
+const { resolveSelection } = require("./lib/resolveSelection");
 
 const app = express();
 const PORT = process.env.PORT || 3000;
@@ -22,91 +23,6 @@ function normalizeEstimate(estimate) {
   };
 }
 
-function resolveSelection(selectedIds, moduleById) {
-  const orderedInput = selectedIds.filter((id) => moduleById.has(id));
-  const order = new Map();
-  orderedInput.forEach((id, index) => order.set(id, index));
-
-  const selected = new Set(orderedInput);
-
-  let changed = true;
-  while (changed) {
-    changed = false;
-    Array.from(selected).forEach((id) => {
-      const module = moduleById.get(id);
-      const requires = Array.isArray(module?.dependencies?.requires) ? module.dependencies.requires : [];
-      requires.forEach((requiredId) => {
-        if (moduleById.has(requiredId) && !selected.has(requiredId)) {
-          selected.add(requiredId);
-          order.set(requiredId, order.size + 1000);
-          changed = true;
-        }
-      });
-    });
-  }
-
-  const selectedOrdered = Array.from(selected).sort((a, b) => {
-    const aRank = order.has(a) ? order.get(a) : Number.MAX_SAFE_INTEGER;
-    const bRank = order.has(b) ? order.get(b) : Number.MAX_SAFE_INTEGER;
-    if (aRank !== bRank) {
-      return aRank - bRank;
-    }
-    return a.localeCompare(b);
-  });
-
-  // Resolve excludes by keeping the earlier-ranked element.
-  selectedOrdered.forEach((id) => {
-    if (!selected.has(id)) {
-      return;
-    }
-    const module = moduleById.get(id);
-    const excludes = Array.isArray(module?.dependencies?.excludes) ? module.dependencies.excludes : [];
-    excludes.forEach((excludedId) => {
-      if (!selected.has(excludedId)) {
-        return;
-      }
-      const idRank = order.get(id) ?? Number.MAX_SAFE_INTEGER;
-      const excludedRank = order.get(excludedId) ?? Number.MAX_SAFE_INTEGER;
-      if (idRank <= excludedRank) {
-        selected.delete(excludedId);
-      } else {
-        selected.delete(id);
-      }
-    });
-  });
-
-  // Resolve option groups by keeping the earliest-ranked module.
-  const groupKeep = new Map();
-  Array.from(selected).forEach((id) => {
-    const module = moduleById.get(id);
-    if (!module?.option_group) {
-      return;
-    }
-    const current = groupKeep.get(module.option_group);
-    if (!current) {
-      groupKeep.set(module.option_group, id);
-      return;
-    }
-    const currentRank = order.get(current) ?? Number.MAX_SAFE_INTEGER;
-    const candidateRank = order.get(id) ?? Number.MAX_SAFE_INTEGER;
-    if (candidateRank < currentRank) {
-      selected.delete(current);
-      groupKeep.set(module.option_group, id);
-    } else {
-      selected.delete(id);
-    }
-  });
-
-  return Array.from(selected).sort((a, b) => {
-    const aRank = order.has(a) ? order.get(a) : Number.MAX_SAFE_INTEGER;
-    const bRank = order.has(b) ? order.get(b) : Number.MAX_SAFE_INTEGER;
-    if (aRank !== bRank) {
-      return aRank - bRank;
-    }
-    return a.localeCompare(b);
-  });
-}
-
 app.get("/health", (_req, res) => {
   res.json({ status: "ok" });
 });